@@ -67,16 +67,18 @@ class BitLinear(nn.Linear):
         self.Qp = 2**(self.input_bits - 1) - 1
 
     def _get_or_create_bitblas_operator(self, config, enable_tuning):
-        if global_operator_cache.size() == 0:
+        if not global_operator_cache.is_attached(BITBLAS_DATABASE_PATH):
             global_operator_cache.load_from_database(BITBLAS_DATABASE_PATH, BITBLAS_TARGET)
-            logger.info(f"Loaded {global_operator_cache.size()} operators from database.")
+            logger.info(f"Attached operator database {BITBLAS_DATABASE_PATH}.")
 
         bitblas_matmul = global_operator_cache.get(config)
         if bitblas_matmul is None:
             # should disable tuning for the first time because we may require loading bitblas operator from database.
-            bitblas_matmul = Matmul(config, target=BITBLAS_TARGET, enable_tuning=False)
+            with global_operator_cache.timer("compile_fallback", config):
+                bitblas_matmul = Matmul(config, target=BITBLAS_TARGET, enable_tuning=False)
             if enable_tuning:
-                bitblas_matmul.hardware_aware_finetune(topk=20)
+                with global_operator_cache.timer("tune", config):
+                    bitblas_matmul.hardware_aware_finetune(topk=20)
                 global_operator_cache.add(config, bitblas_matmul)
                 global_operator_cache.save_into_database(BITBLAS_DATABASE_PATH, BITBLAS_TARGET)
                 print("BitBLAS Tuning done, appended operator to global_operator_cache.")
@@ -0,0 +1,6 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+from bitblas.cli import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,4 +15,16 @@ from .common_schedules import get_block, get_output_blocks, try_inline, try_inli
 from .schedule_rule import ScheduleRule
 from .transform import ApplyDefaultSchedule, ApplyFastTuning
 from .utils import fast_tune, fast_tune_with_dynamic_range
+from .utils import tune_dynamic_range_buckets, apply_tuned_hints  # noqa: F401
+from .dispatch import ShapeTrace, select_dynamic_buckets  # noqa: F401
+from .budget import TuningBudget  # noqa: F401
+from .measure import MeasurementPolicy  # noqa: F401
+from .journal import TuningJournal  # noqa: F401
+from .measure_log import MeasurementLog  # noqa: F401
+from .tuning_options import TuningOptions  # noqa: F401
+from .build_pool import get_build_pool, set_build_pool_size, shutdown_build_pool  # noqa: F401
+from .compile_cache import get_compile_cache_dir, set_compile_cache_dir, clear_compile_cache  # noqa: F401
+from .compile_cache import get_compile_cache_max_bytes, set_compile_cache_max_bytes  # noqa: F401
+from .policy_cache import get_policy_cache_dir, set_policy_cache_dir, clear_policy_cache  # noqa: F401
+from .policy_cache import get_policy_cache_max_bytes, set_policy_cache_max_bytes  # noqa: F401
 from .roller import *
@@ -0,0 +1,82 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Budget of a tuning run: a deadline, a number of builds and early stopping"""
+import threading
+import time
+from typing import Optional
+
+
+class TuningBudget:
+    """
+    Limits of the tuning calls it is passed to.
+
+    - ``max_seconds``: wall-clock time, counted from the first tuning call.
+    - ``max_builds``: number of candidates built, modules found in the compile
+      cache are free.
+    - ``priority_ratio``: skip measuring the candidates not expected to come
+      within ``priority_ratio`` times the best measured latency. The
+      latency of a candidate is extrapolated from its roller priority (the
+      traffic and wave score of its tile, lower is better) with the most
+      favourable latency to priority ratio measured so far.
+
+    A budget is stateful, sharing one budget between calls (e.g. the buckets
+    of a dynamic range, or the layers of a model) shares its limits. Every
+    tuning call still measures at least one candidate, so that an exhausted
+    budget returns the best result found so far rather than nothing. Builds
+    already running when the budget runs out are waited for.
+    """
+
+    def __init__(
+        self,
+        max_seconds: Optional[float] = None,
+        max_builds: Optional[int] = None,
+        priority_ratio: Optional[float] = None,
+    ):
+        if priority_ratio is not None and priority_ratio < 1.0:
+            raise ValueError(f"priority_ratio must be at least 1, got {priority_ratio}")
+        self.max_seconds = max_seconds
+        self.max_builds = max_builds
+        self.priority_ratio = priority_ratio
+        self.deadline: Optional[float] = None
+        self.builds = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the clock, later calls keep the first deadline."""
+        with self._lock:
+            if self.deadline is None and self.max_seconds is not None:
+                self.deadline = time.monotonic() + self.max_seconds
+
+    def time_exhausted(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def reserve_build(self, force: bool = False) -> bool:
+        """Count a build, returns False if no build is left unless ``force``."""
+        with self._lock:
+            if not force:
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    return False
+                if self.max_builds is not None and self.builds >= self.max_builds:
+                    return False
+            self.builds += 1
+            return True
+
+    def exhausted(self) -> bool:
+        return self.time_exhausted() or (self.max_builds is not None and
+                                         self.builds >= self.max_builds)
+
+    def is_promising(self, priority: Optional[float], latency_per_priority: Optional[float],
+                     best_latency: Optional[float]) -> bool:
+        """
+        Whether a candidate of the given roller ``priority`` may come within
+        ``priority_ratio`` of ``best_latency``, candidates without a priority
+        (e.g. seeds) always are.
+        """
+        if (self.priority_ratio is None or priority is None or latency_per_priority is None or
+                best_latency is None):
+            return True
+        return priority * latency_per_priority <= self.priority_ratio * best_latency
+
+    def __repr__(self) -> str:
+        return (f"TuningBudget(max_seconds={self.max_seconds}, max_builds={self.max_builds}, "
+                f"priority_ratio={self.priority_ratio}, builds={self.builds})")
@@ -0,0 +1,74 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Process-wide pool of build workers shared by all tuning calls"""
+import atexit
+import os
+import threading
+from typing import Optional
+from tvm.contrib.popen_pool import PopenPoolExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# the number of build workers can be overridden from the environment
+BUILD_POOL_SIZE_ENV = "BITBLAS_BUILD_WORKERS"
+
+_build_pool: Optional[PopenPoolExecutor] = None
+_build_pool_size: Optional[int] = None
+_build_pool_lock = threading.Lock()
+
+
+def get_default_build_pool_size() -> int:
+    if os.environ.get(BUILD_POOL_SIZE_ENV):
+        return max(1, int(os.environ[BUILD_POOL_SIZE_ENV]))
+    return os.cpu_count() or 1
+
+
+def get_build_pool() -> PopenPoolExecutor:
+    """
+    The shared build pool, created on first use.
+
+    Its workers import TVM once and are reused by every tuning call of the
+    process, instead of spawning a pool per call.
+    """
+    global _build_pool, _build_pool_size
+    with _build_pool_lock:
+        if _build_pool is None:
+            if _build_pool_size is None:
+                _build_pool_size = get_default_build_pool_size()
+            logger.debug(f"Starting the build pool with {_build_pool_size} workers")
+            _build_pool = PopenPoolExecutor(max_workers=_build_pool_size)
+        return _build_pool
+
+
+def set_build_pool_size(max_workers: Optional[int] = None):
+    """
+    Set the number of build workers, ``None`` restores the default. A
+    running pool of another size is shut down and restarted on next use.
+    """
+    global _build_pool_size
+    with _build_pool_lock:
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"The build pool needs at least one worker, got {max_workers}")
+        if max_workers != _build_pool_size:
+            _shutdown_locked()
+        _build_pool_size = max_workers
+
+
+def shutdown_build_pool():
+    """Stop the workers of the shared build pool, if it is running."""
+    with _build_pool_lock:
+        _shutdown_locked()
+
+
+def _shutdown_locked():
+    global _build_pool
+    if _build_pool is None:
+        return
+    pool, _build_pool = _build_pool, None
+    # PopenPoolExecutor kills its workers when it is deleted, builds
+    # in flight hold a reference and finish first.
+    del pool
+
+
+atexit.register(shutdown_build_pool)
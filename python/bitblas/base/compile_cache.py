@@ -0,0 +1,162 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+On-disk cache of the modules built while tuning.
+
+The cache lives in ``~/.cache/bitblas_compile``, or in the directory set by
+``BITBLAS_COMPILE_CACHE_DIR``. An empty value disables it.
+
+The cache is bounded by ``BITBLAS_COMPILE_CACHE_MAX_BYTES``, 4 GiB by
+default and unbounded if empty. The least recently used entries are removed
+first. ``clear_compile_cache`` empties it.
+"""
+import contextlib
+import functools
+import os
+import shutil
+import tempfile
+import threading
+from hashlib import sha256
+from typing import Dict, Optional, Tuple
+import tvm
+from tvm import IRModule
+from tvm.contrib.tar import tar
+import bitblas
+from bitblas.base.disk_cache import (
+    TRIM_INTERVAL,
+    get_cache_dir_from_env,
+    get_max_bytes_from_env,
+    touch,
+    trim_cache,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+COMPILE_CACHE_DIR_ENV = "BITBLAS_COMPILE_CACHE_DIR"
+COMPILE_CACHE_MAX_BYTES_ENV = "BITBLAS_COMPILE_CACHE_MAX_BYTES"
+DEFAULT_COMPILE_CACHE_MAX_BYTES = 4 << 30
+ARTIFACT_NAME = "tvm_tmp_mod." + tar.output_format
+SOURCE_NAME = "source.cu"
+
+_compile_cache_dir: Optional[str] = get_cache_dir_from_env(COMPILE_CACHE_DIR_ENV,
+                                                           "~/.cache/bitblas_compile")
+_compile_cache_max_bytes: Optional[int] = get_max_bytes_from_env(COMPILE_CACHE_MAX_BYTES_ENV,
+                                                                 DEFAULT_COMPILE_CACHE_MAX_BYTES)
+_stores = 0
+_stores_lock = threading.Lock()
+
+
+def get_compile_cache_dir() -> Optional[str]:
+    return _compile_cache_dir
+
+
+def set_compile_cache_dir(cache_dir: Optional[str]):
+    """Move the compile cache, ``None`` disables it."""
+    global _compile_cache_dir
+    _compile_cache_dir = cache_dir
+
+
+def get_compile_cache_max_bytes() -> Optional[int]:
+    return _compile_cache_max_bytes
+
+
+def set_compile_cache_max_bytes(max_bytes: Optional[int]):
+    """Bound the compile cache, ``None`` leaves it unbounded."""
+    global _compile_cache_max_bytes
+    _compile_cache_max_bytes = max_bytes
+
+
+@functools.lru_cache(maxsize=None)
+def _toolchain_key() -> str:
+    # artifacts of another tvm build or of another post processing are not reused
+    try:
+        tvm_commit = tvm.support.libinfo().get("GIT_COMMIT_HASH")
+    except Exception:  # pylint: disable=broad-except
+        tvm_commit = None
+    return f"{tvm_commit}|{bitblas.__version__}"
+
+
+@functools.lru_cache(maxsize=None)
+def _nvcc_version() -> Optional[str]:
+    # modules built by another cuda toolkit are not reused
+    try:
+        from tvm.contrib.nvcc import get_cuda_version  # pylint: disable=import-outside-toplevel
+        return str(get_cuda_version())
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def get_compile_key(mod: IRModule, target: tvm.target.Target, pass_context: Dict) -> str:
+    """
+    Content address of a build: the scheduled module, the target and its
+    architecture, the pass context and the toolchain (tvm, bitblas, nvcc).
+    """
+    key = "|".join([
+        str(tvm.ir.structural_hash(mod)),
+        str(target),
+        str(getattr(target, "arch", None)),
+        repr(sorted((str(k), str(v)) for k, v in pass_context.items())),
+        _toolchain_key(),
+        str(_nvcc_version()),
+    ])
+    return sha256(key.encode()).hexdigest()
+
+
+def _entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def lookup_compiled(cache_dir: str, key: str) -> Optional[Tuple[str, str]]:
+    """Return the cuda source and the artifact path of a cached build."""
+    entry_path = _entry_path(cache_dir, key)
+    artifact_path = os.path.join(entry_path, ARTIFACT_NAME)
+    source_path = os.path.join(entry_path, SOURCE_NAME)
+    if not os.path.exists(artifact_path) or not os.path.exists(source_path):
+        return None
+    with open(source_path) as f:
+        code = f.read()
+    touch(entry_path)
+    return code, artifact_path
+
+
+def store_compiled(cache_dir: str,
+                   key: str,
+                   code: str,
+                   artifact_path: str,
+                   max_bytes: Optional[int] = None) -> str:
+    """
+    Publish a build under its key and return the cached artifact path.
+
+    Entries are written into a staging directory and renamed into place,
+    concurrent builders of the same key keep the first published entry.
+    Every ``TRIM_INTERVAL`` stores, the cache is trimmed to ``max_bytes``.
+    """
+    global _stores
+    with _stores_lock:
+        trim = _stores % TRIM_INTERVAL == 0
+        _stores += 1
+    if trim:
+        trim_cache(cache_dir, max_bytes)
+    entry_path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    staging_path = tempfile.mkdtemp(prefix=f".{key}.", dir=os.path.dirname(entry_path))
+    try:
+        shutil.copy(artifact_path, os.path.join(staging_path, ARTIFACT_NAME))
+        with open(os.path.join(staging_path, SOURCE_NAME), "w") as f:
+            f.write(code)
+        # fails when already published by another builder
+        with contextlib.suppress(OSError):
+            os.rename(staging_path, entry_path)
+    finally:
+        if os.path.exists(staging_path):
+            shutil.rmtree(staging_path, ignore_errors=True)
+    cached_path = os.path.join(entry_path, ARTIFACT_NAME)
+    return cached_path if os.path.exists(cached_path) else artifact_path
+
+
+def clear_compile_cache(cache_dir: Optional[str] = None):
+    """Remove every entry of the compile cache (the current one by default)."""
+    cache_dir = cache_dir or _compile_cache_dir
+    if cache_dir is not None and os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
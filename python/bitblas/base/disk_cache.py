@@ -0,0 +1,101 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Location and size management of the on-disk caches under ``~/.cache``"""
+import contextlib
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# entries are trimmed every this many stores of a process, walking a large
+# cache on every store would cost more than the builds it saves
+TRIM_INTERVAL = 64
+
+
+def get_cache_dir_from_env(env: str, default: str) -> Optional[str]:
+    """The cache directory set by ``env``, ``default`` if unset, None (disabled) if empty."""
+    cache_dir = os.environ.get(env)
+    if cache_dir is None:
+        return os.path.expanduser(default)
+    return cache_dir or None
+
+
+def get_max_bytes_from_env(env: str, default: Optional[int]) -> Optional[int]:
+    """The size limit set by ``env``, ``default`` if unset, None (unbounded) if empty."""
+    max_bytes = os.environ.get(env)
+    if max_bytes is None:
+        return default
+    return int(max_bytes) if max_bytes else None
+
+
+def touch(path: str):
+    """Mark a cache entry as used, entries are trimmed least recently used first."""
+    with contextlib.suppress(OSError):
+        os.utime(path)
+
+
+def _entry_size_in_bytes(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    nbytes = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            # the file may be removed concurrently
+            with contextlib.suppress(OSError):
+                nbytes += os.path.getsize(os.path.join(root, file))
+    return nbytes
+
+
+def _list_entries(cache_dir: str) -> List[Tuple[float, int, str]]:
+    # entries are sharded by the first two characters of their key, hidden
+    # names are the staging entries of in-flight stores
+    entries = []
+    for shard in os.listdir(cache_dir):
+        shard_path = os.path.join(cache_dir, shard)
+        if shard.startswith(".") or not os.path.isdir(shard_path):
+            continue
+        for name in os.listdir(shard_path):
+            if name.startswith("."):
+                continue
+            path = os.path.join(shard_path, name)
+            with contextlib.suppress(OSError):
+                entries.append((os.path.getmtime(path), _entry_size_in_bytes(path), path))
+    return entries
+
+
+def cache_size_in_bytes(cache_dir: str) -> int:
+    if not os.path.isdir(cache_dir):
+        return 0
+    return sum(nbytes for _, nbytes, _ in _list_entries(cache_dir))
+
+
+def trim_cache(cache_dir: str, max_bytes: Optional[int]) -> int:
+    """
+    Remove the least recently used entries of a cache until it holds at most
+    ``max_bytes``, returns the number of bytes removed. Entries are renamed
+    out of the way before being deleted, so lookups never see a partial one.
+    """
+    if max_bytes is None or not os.path.isdir(cache_dir):
+        return 0
+    entries = _list_entries(cache_dir)
+    total = sum(nbytes for _, nbytes, _ in entries)
+    removed = 0
+    for _, nbytes, path in sorted(entries):
+        if total - removed <= max_bytes:
+            break
+        shard_path = os.path.dirname(path)
+        retired_path = tempfile.mkdtemp(prefix=".", dir=shard_path)
+        try:
+            os.rename(path, os.path.join(retired_path, os.path.basename(path)))
+        except OSError:
+            # already removed by another process
+            continue
+        finally:
+            shutil.rmtree(retired_path, ignore_errors=True)
+        removed += nbytes
+    if removed:
+        logger.debug(f"Trimmed {removed} bytes from {cache_dir}")
+    return removed
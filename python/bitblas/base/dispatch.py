@@ -0,0 +1,239 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Dispatch of dynamic shape kernels over the grid of their specialized shapes"""
+from collections import Counter
+import itertools
+import json
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+
+# the number of grid points tuned by default, the remaining points reuse
+# the kernel of their nearest tuned point
+DEFAULT_MAX_TUNED_POINTS = 32
+
+GridPoint = Tuple[int, ...]
+# a bucket index or a (bound, lhs, rhs) node
+DispatchTree = Union[int, Tuple[int, "DispatchTree", "DispatchTree"]]
+
+
+def _log_distance(lhs: Sequence[int], rhs: Sequence[int]) -> float:
+    # shapes are compared by ratio, 16 is as far from 32 as 1024 from 2048
+    return sum(abs(math.log2(max(a, 1)) - math.log2(max(b, 1))) for a, b in zip(lhs, rhs))
+
+
+def normalize_grid(opt_shapes: Mapping) -> Dict[str, List[int]]:
+    """The sorted values of each symbol of (int or list valued) ``opt_shapes``."""
+    grid = {}
+    for name, values in opt_shapes.items():
+        if not hasattr(values, "__len__"):
+            values = [values]
+        grid[str(name)] = sorted({int(v) for v in values})
+    return grid
+
+
+def select_grid_points(grid: Mapping[str, Sequence[int]],
+                       max_points: Optional[int] = None) -> List[Dict[str, int]]:
+    """
+    The points of the Cartesian product of ``grid`` to tune.
+
+    All points are returned if there are at most ``max_points`` of them.
+    Otherwise the points are picked greedily, each one the farthest (in log
+    space) from those already picked, starting from the smallest point, so
+    that every untuned point has a tuned neighbour close to it. The points
+    are returned in product order.
+    """
+    names = list(grid.keys())
+    points = list(itertools.product(*(grid[name] for name in names)))
+    if max_points is not None and len(points) > max_points:
+        selected = [0]
+        distances = [_log_distance(point, points[0]) for point in points]
+        while len(selected) < max_points:
+            farthest = max(range(len(points)), key=lambda i: distances[i])
+            if distances[farthest] == 0:
+                break
+            selected.append(farthest)
+            distances = [
+                min(distance, _log_distance(point, points[farthest]))
+                for distance, point in zip(distances, points)
+            ]
+        points = [points[i] for i in sorted(selected)]
+    return [dict(zip(names, point)) for point in points]
+
+
+def get_dispatch_table(
+    symbols: Sequence[str],
+    specialized: Sequence[Tuple[str, Mapping[str, int]]],
+    grid: Optional[Mapping[str, Sequence[int]]] = None,
+) -> Tuple[List[List[int]], Dict[GridPoint, str]]:
+    """
+    Map every point of the dispatch grid to a specialized kernel.
+
+    ``specialized`` holds the name and the ``opt_shapes`` of each kernel. The
+    axes of the grid are the values the kernels are specialized for, extended
+    with the values of ``grid`` if given. A point without a kernel of its own
+    runs the kernel of its nearest specialized point.
+
+    Returns the sorted values of each symbol, in the order of ``symbols``,
+    and the kernel name of each point.
+    """
+    grid = normalize_grid(grid or {})
+    axes: List[List[int]] = []
+    for symbol in symbols:
+        values = set(grid.get(symbol, []))
+        values.update(int(opt_shapes[symbol]) for _, opt_shapes in specialized)
+        axes.append(sorted(values))
+
+    kernels: Dict[GridPoint, str] = {}
+    for name, opt_shapes in specialized:
+        # the first kernel of a point wins, as in the former if-chain
+        kernels.setdefault(tuple(int(opt_shapes[symbol]) for symbol in symbols), name)
+    if not kernels:
+        raise ValueError("At least one specialized kernel is required to dispatch")
+
+    table: Dict[GridPoint, str] = {}
+    for point in itertools.product(*axes):
+        if point in kernels:
+            table[point] = kernels[point]
+        else:
+            nearest = min(kernels, key=lambda tuned: _log_distance(point, tuned))
+            table[point] = kernels[nearest]
+    return axes, table
+
+
+def get_dispatch_tree(values: Sequence[int]) -> DispatchTree:
+    """
+    A balanced binary search over the buckets of the sorted ``values``.
+
+    A value dispatches to the smallest bucket covering it, values beyond the
+    last one to the last bucket. A leaf is the index of a bucket, a node
+    ``(bound, lhs, rhs)`` goes to ``lhs`` if the value is at most ``bound``
+    and to ``rhs`` otherwise, so any value is resolved in ``ceil(log2(n))``
+    comparisons.
+    """
+
+    def _build(lo: int, hi: int) -> DispatchTree:
+        if hi - lo == 1:
+            return lo
+        mid = (lo + hi) // 2
+        return (values[mid - 1], _build(lo, mid), _build(mid, hi))
+
+    if not values:
+        raise ValueError("Cannot dispatch over an empty set of values")
+    return _build(0, len(values))
+
+
+class ShapeTrace:
+    """
+    Thread safe histogram of the values taken by a dynamic symbol at runtime,
+    e.g. the M of every call of ``bitblas.Linear`` when set as its
+    ``shape_trace``. It can be saved and fed to ``select_dynamic_buckets``.
+    """
+
+    def __init__(self, histogram: Optional[Mapping[int, int]] = None):
+        self._lock = threading.Lock()
+        self.histogram: Counter = Counter({int(k): int(v) for k, v in (histogram or {}).items()})
+
+    def record(self, value: int, count: int = 1):
+        with self._lock:
+            self.histogram[int(value)] += count
+
+    def save(self, path: str):
+        with self._lock:
+            histogram = dict(sorted(self.histogram.items()))
+        with open(path, "w") as f:
+            json.dump({str(k): v for k, v in histogram.items()}, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "ShapeTrace":
+        with open(path) as f:
+            return cls(json.load(f))
+
+
+def _default_bucket_loss(value: int, bucket: int) -> float:
+    # proxy of the latency lost by running a kernel tuned for ``bucket`` on
+    # ``value``: tiles and pipelines are sized for the tuned shape, the
+    # mismatch grows with the ratio of the two shapes
+    return abs(math.log2(max(bucket, 1)) - math.log2(max(value, 1)))
+
+
+def _default_bucket_candidates(values: Sequence[int]) -> List[int]:
+    # kernels tuned a few rows apart are alike, beyond 16 rows only multiples
+    # of 16 are considered which keeps the search quadratic in M / 16
+    return sorted({v if v <= 16 else (v + 15) // 16 * 16 for v in values})
+
+
+def select_dynamic_buckets(
+    observed: Union[ShapeTrace, Mapping[int, int], Iterable[int]],
+    num_buckets: int,
+    loss: Optional[Callable[[int, int], float]] = None,
+    candidates: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """
+    Pick at most ``num_buckets`` values of a dynamic symbol to tune, e.g. the
+    ``opt_M`` of ``bitblas.Linear`` or the ``M`` of ``MatmulConfig``.
+
+    ``observed`` is a histogram of the runtime values (value to count), a
+    ``ShapeTrace`` or the raw values. The buckets minimize the expected
+    ``loss(value, bucket)`` of running each observed value on the kernel it
+    dispatches to, the smallest bucket covering it or the last bucket. The
+    default loss is the log ratio of the two shapes, pass measured latencies
+    through ``loss`` for a finer selection. Buckets are picked among
+    ``candidates``, by default the observed values rounded up to multiples of
+    16 beyond 16, with an exact dynamic program.
+
+    Returns the sorted bucket values.
+    """
+    if num_buckets < 1:
+        raise ValueError(f"At least one bucket is required, got {num_buckets}")
+    if isinstance(observed, ShapeTrace):
+        observed = dict(observed.histogram)
+    elif not isinstance(observed, Mapping):
+        observed = Counter(int(v) for v in observed)
+    histogram = {int(v): float(c) for v, c in observed.items() if c > 0}
+    if not histogram:
+        raise ValueError("Cannot select buckets without observed values")
+    loss = loss or _default_bucket_loss
+    values = sorted(histogram)
+    candidates = sorted(set(candidates or _default_bucket_candidates(values)))
+
+    n = len(candidates)
+    # slot s holds the values dispatched to candidate s if it is a bucket
+    # and the previous bucket is at or below candidate s - 1
+    slots = np.searchsorted(candidates, values, side="left")
+    # slot_loss[s, b]: loss of the values of slot s on the kernel of candidate b
+    slot_loss = np.zeros((n + 1, n))
+    for value, slot in zip(values, slots):
+        slot_loss[slot] += [histogram[value] * loss(value, bucket) for bucket in candidates]
+    # span[i, j]: loss of slots i + 1 .. j on bucket j, i = -1 spans from the start
+    cumulative = np.cumsum(slot_loss[:n], axis=0)
+    span = np.full((n + 1, n), np.inf)
+    diagonal = cumulative[np.arange(n), np.arange(n)]
+    span[0] = diagonal
+    for i in range(n - 1):
+        span[i + 1, i + 1:] = diagonal[i + 1:] - cumulative[i, i + 1:]
+    # values beyond the last bucket j (including those beyond every candidate)
+    tail = np.array([slot_loss[j + 1:, j].sum() for j in range(n)])
+
+    # best[j]: least loss of the values up to candidate j with j as the last bucket
+    best = span[0].copy()
+    choices = []
+    total = best + tail
+    best_count, best_last = 1, int(np.argmin(total))
+    best_total = total[best_last]
+    for count in range(2, num_buckets + 1):
+        # previous bucket i < j
+        transitions = best[:, None] + span[1:]
+        previous = np.argmin(transitions, axis=0)
+        best = transitions[previous, np.arange(n)]
+        choices.append(previous)
+        total = best + tail
+        last = int(np.argmin(total))
+        if total[last] < best_total:
+            best_count, best_last, best_total = count, last, total[last]
+
+    buckets = [best_last]
+    for count in range(best_count, 1, -1):
+        buckets.append(int(choices[count - 2][buckets[-1]]))
+    return [candidates[j] for j in reversed(buckets)]
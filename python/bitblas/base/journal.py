@@ -0,0 +1,98 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Append-only journal of a tuning session, to resume interrupted runs"""
+import json
+import os
+import threading
+import time
+from hashlib import sha256
+from typing import Dict, Mapping, Optional, Tuple
+import tvm
+from tvm import tir
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _point_key(point: Optional[Mapping]) -> str:
+    return json.dumps({str(k): int(v) for k, v in (point or {}).items()}, sort_keys=True)
+
+
+class TuningJournal:
+    """
+    A JSON lines file recording the progress of a tuning session.
+
+    Every measured candidate of a function (identified by its structural
+    hash and the target) at a point of its dynamic range is appended as it
+    finishes, followed by the winner once the point is tuned. Re-opening the
+    journal of an interrupted session lets the tuning calls it is passed to
+    skip the points already tuned. Each line is flushed and synced, a line
+    cut short by a crash is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._best: Dict[Tuple[str, str], Dict] = {}
+        self.num_candidates = 0
+        if os.path.exists(path):
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _load(self):
+        with open(self.path) as f:
+            content = f.read()
+        for lineno, line in enumerate(content.splitlines(), 1):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring a truncated entry of {self.path} at line {lineno}")
+                continue
+            if entry.get("type") == "best":
+                self._best[(entry["func"], entry["point"])] = entry["record"]
+            elif entry.get("type") == "candidate":
+                self.num_candidates += 1
+        if content and not content.endswith("\n"):
+            # start the next entry on a line of its own
+            with open(self.path, "a") as f:
+                f.write("\n")
+        logger.info(f"Resuming tuning session {self.path}: {len(self._best)} points tuned, "
+                    f"{self.num_candidates} candidates measured")
+
+    @staticmethod
+    def get_func_key(func: tir.PrimFunc, target: tvm.target.Target) -> str:
+        key = f"{tvm.ir.structural_hash(func.without_attr('opt_shapes'))}|{target}"
+        return sha256(key.encode()).hexdigest()
+
+    def _append(self, entry: Dict):
+        entry["time"] = time.time()
+        line = json.dumps(entry) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            # a crash cuts at most this line short, the previous ones are durable
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_candidate(self, func_key: str, point: Optional[Mapping], record: Dict):
+        """Append a measured candidate, ``record`` is its ``CompileResult.serialize()``."""
+        self._append({
+            "type": "candidate",
+            "func": func_key,
+            "point": _point_key(point),
+            "record": record
+        })
+        self.num_candidates += 1
+
+    def record_best(self, func_key: str, point: Optional[Mapping], record: Dict):
+        """Append the winner of a point, marking it as tuned."""
+        point = _point_key(point)
+        self._append({"type": "best", "func": func_key, "point": point, "record": record})
+        self._best[(func_key, point)] = record
+
+    def lookup_best(self, func_key: str, point: Optional[Mapping]) -> Optional[Dict]:
+        """The winner recorded for a point, None if it has not been tuned."""
+        return self._best.get((func_key, _point_key(point)))
+
+    def __len__(self) -> int:
+        return len(self._best)
@@ -0,0 +1,112 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Robust latency measurement of the candidates of a tuning run"""
+import math
+from typing import Dict, List, Literal, Optional, Sequence
+from tvm.runtime import Module
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _aggregate(samples: Sequence[float], method: str, trim_ratio: float) -> float:
+    ordered = sorted(samples)
+    if method == "mean":
+        return sum(ordered) / len(ordered)
+    if method == "median":
+        mid = len(ordered) // 2
+        return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    if method == "trimmed_mean":
+        trim = int(len(ordered) * trim_ratio)
+        kept = ordered[trim:len(ordered) - trim] or ordered
+        return sum(kept) / len(kept)
+    raise ValueError(f"Unknown aggregation: {method}")
+
+
+def latency_stats(samples: Sequence[float],
+                  method: str = "median",
+                  trim_ratio: float = 0.2) -> Dict:
+    """Summary of latency samples (in ms), ``latency`` is their ``method`` aggregate."""
+    mean = sum(samples) / len(samples)
+    std = math.sqrt(sum((s - mean)**2 for s in samples) / len(samples))
+    return {
+        "latency": _aggregate(samples, method, trim_ratio),
+        "aggregate": method,
+        "samples": [float(s) for s in samples],
+        "mean": mean,
+        "std": std,
+        "cv": std / mean if mean > 0 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+    }
+
+
+class MeasurementPolicy:
+    """
+    How candidates are measured and compared.
+
+    Each measurement runs ``warmup`` untimed calls, then ``repeat`` samples of
+    ``number`` calls each, aggregated with ``aggregate`` ("median",
+    "trimmed_mean" cutting ``trim_ratio`` of the samples on each side, or
+    "mean"). A measurement with a coefficient of variation above ``max_cv``
+    is taken again, up to ``max_remeasure`` times, keeping the steadiest one.
+    The ``final_topk`` best candidates of a run are then re-measured head to
+    head, interleaved sample by sample so that they share the same machine
+    conditions, before the best one is picked.
+    """
+
+    def __init__(
+        self,
+        warmup: int = 1,
+        number: int = 3,
+        repeat: int = 5,
+        aggregate: Literal["median", "trimmed_mean", "mean"] = "median",
+        trim_ratio: float = 0.2,
+        max_cv: Optional[float] = 0.05,
+        max_remeasure: int = 2,
+        final_topk: int = 3,
+    ):
+        if number < 1 or repeat < 1:
+            raise ValueError("number and repeat must be positive")
+        _aggregate([1.0], aggregate, trim_ratio)
+        self.warmup = warmup
+        self.number = number
+        self.repeat = repeat
+        self.aggregate = aggregate
+        self.trim_ratio = trim_ratio
+        self.max_cv = max_cv
+        self.max_remeasure = max_remeasure
+        self.final_topk = final_topk
+
+    def _sample(self, rt_mod: Module, device, args, repeat: int) -> List[float]:
+        if self.warmup > 0:
+            rt_mod.time_evaluator(rt_mod.entry_name, device, number=self.warmup)(*args)
+        evaluator = rt_mod.time_evaluator(
+            rt_mod.entry_name, device, number=self.number, repeat=repeat)
+        return [result * 1e3 for result in evaluator(*args).results]
+
+    def measure(self, rt_mod: Module, device, args) -> Dict:
+        """Measure ``rt_mod`` on ``args``, returns its ``latency_stats``."""
+        best_stats = None
+        remeasured = 0
+        while True:
+            stats = latency_stats(
+                self._sample(rt_mod, device, args, self.repeat), self.aggregate, self.trim_ratio)
+            if best_stats is None or stats["cv"] < best_stats["cv"]:
+                best_stats = stats
+            if (self.max_cv is None or stats["cv"] <= self.max_cv or
+                    remeasured >= self.max_remeasure):
+                break
+            logger.debug(f"Re-measuring, the coefficient of variation {stats['cv']:.3f} "
+                         f"exceeds {self.max_cv}")
+            remeasured += 1
+        best_stats["remeasured"] = remeasured
+        return best_stats
+
+    def head_to_head(self, rt_mods: Sequence[Module], device, args) -> List[Dict]:
+        """Interleaved measurement of the given modules, returns their ``latency_stats``."""
+        samples: List[List[float]] = [[] for _ in rt_mods]
+        for _ in range(self.repeat):
+            for i, rt_mod in enumerate(rt_mods):
+                samples[i].extend(self._sample(rt_mod, device, args, 1))
+        return [latency_stats(s, self.aggregate, self.trim_ratio) for s in samples]
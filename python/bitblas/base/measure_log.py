@@ -0,0 +1,85 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Log of the measured candidates of every tuning run, to train cost models"""
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MeasurementLog:
+    """
+    A JSON lines file accumulating every candidate measured by the tuning
+    calls it is passed to, not only the winners: the architecture, the
+    function (see ``TuningJournal.get_func_key``), the point of its dynamic
+    range, and the serialized candidate with its hint (whose cost features
+    carry the shape and data type) and latency.
+
+    The log is meant to outlive tuning sessions, learned cost models (see
+    ``bitblas.base.roller.cost_model``) are trained from its ``samples``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: List[Dict] = []
+        if os.path.exists(path):
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _load(self):
+        with open(self.path) as f:
+            content = f.read()
+        for lineno, line in enumerate(content.splitlines(), 1):
+            try:
+                self.entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring a truncated entry of {self.path} at line {lineno}")
+        if content and not content.endswith("\n"):
+            with open(self.path, "a") as f:
+                f.write("\n")
+
+    def record(self, arch: str, func_key: str, point: Optional[Mapping], record: Dict):
+        """Append a measured candidate, ``record`` is its ``CompileResult.serialize()``."""
+        entry = {
+            "arch": str(arch),
+            "func": func_key,
+            "point": {str(k): int(v) for k, v in (point or {}).items()},
+            "record": record,
+            "time": time.time(),
+        }
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries.append(entry)
+
+    def samples(self, arch: Optional[str] = None) -> Tuple[List[Dict[str, float]], List[float]]:
+        """
+        The cost features and the measured latency of the logged candidates
+        of ``arch`` (all architectures if None). Candidates without features,
+        failed or only predicted are left out.
+        """
+        features, latencies = [], []
+        with self._lock:
+            entries = list(self.entries)
+        for entry in entries:
+            if arch is not None and entry.get("arch") != str(arch):
+                continue
+            record = entry.get("record", {})
+            latency = record.get("latency")
+            predicted = (record.get("stats") or {}).get("predicted")
+            if (not record.get("hint", {}).get("features") or latency is None or
+                    not math.isfinite(latency) or latency >= 1e9 or predicted):
+                continue
+            features.append(record["hint"]["features"])
+            latencies.append(float(latency))
+        return features, latencies
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,166 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+On-disk cache of the configs emitted by the roller policies.
+
+The cache lives in ``~/.cache/bitblas_policy``, or in the directory set by
+``BITBLAS_POLICY_CACHE_DIR``. An empty value disables it.
+
+The cache is bounded by ``BITBLAS_POLICY_CACHE_MAX_BYTES``, 256 MiB by
+default and unbounded if empty. The least recently used entries are removed
+first. ``clear_policy_cache`` empties it.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from hashlib import sha256
+from typing import Dict, List, Optional, Type
+import tvm
+from tvm import tir
+from bitblas.base.roller.arch import TileDevice
+from bitblas.base.roller.arch.arch_base import get_arch_key
+from bitblas.base.roller.hint import Hint
+from bitblas.base.roller.policy import DefaultPolicy
+from bitblas.base.compile_cache import _toolchain_key
+from bitblas.base.disk_cache import (
+    TRIM_INTERVAL,
+    get_cache_dir_from_env,
+    get_max_bytes_from_env,
+    touch,
+    trim_cache,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+POLICY_CACHE_DIR_ENV = "BITBLAS_POLICY_CACHE_DIR"
+POLICY_CACHE_MAX_BYTES_ENV = "BITBLAS_POLICY_CACHE_MAX_BYTES"
+DEFAULT_POLICY_CACHE_MAX_BYTES = 256 << 20
+
+_policy_cache_dir: Optional[str] = get_cache_dir_from_env(POLICY_CACHE_DIR_ENV,
+                                                          "~/.cache/bitblas_policy")
+_policy_cache_max_bytes: Optional[int] = get_max_bytes_from_env(POLICY_CACHE_MAX_BYTES_ENV,
+                                                                DEFAULT_POLICY_CACHE_MAX_BYTES)
+_stores = 0
+_stores_lock = threading.Lock()
+
+
+def get_policy_cache_dir() -> Optional[str]:
+    return _policy_cache_dir
+
+
+def set_policy_cache_dir(cache_dir: Optional[str]):
+    """Move the policy cache, ``None`` disables it."""
+    global _policy_cache_dir
+    _policy_cache_dir = cache_dir
+
+
+def get_policy_cache_max_bytes() -> Optional[int]:
+    return _policy_cache_max_bytes
+
+
+def set_policy_cache_max_bytes(max_bytes: Optional[int]):
+    """Bound the policy cache, ``None`` leaves it unbounded."""
+    global _policy_cache_max_bytes
+    _policy_cache_max_bytes = max_bytes
+
+
+def get_policy_key(func: tir.PrimFunc,
+                   arch: TileDevice,
+                   policy_cls: Type[DefaultPolicy],
+                   topk: int,
+                   tags: Optional[Dict] = None) -> str:
+    """Content address of the configs a policy emits for a function on a device."""
+    key = "|".join([
+        str(tvm.ir.structural_hash(func)),
+        get_arch_key(arch),
+        f"{policy_cls.__module__}.{policy_cls.__qualname__}",
+        str(topk),
+        repr(sorted((str(k), str(v)) for k, v in (tags or {}).items())),
+        _toolchain_key(),
+    ])
+    return sha256(key.encode()).hexdigest()
+
+
+def _entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def lookup_policy_result(cache_dir: str, key: str, arch: TileDevice) -> Optional[List[Hint]]:
+    """The cached configs of a key, None if they are not cached."""
+    entry_path = _entry_path(cache_dir, key)
+    if not os.path.exists(entry_path):
+        return None
+    try:
+        with open(entry_path) as f:
+            entries = json.load(f)
+        hints = []
+        for entry in entries:
+            hint = Hint().deserialize(entry["hint"], arch)
+            hint.priority = entry.get("priority")
+            hints.append(hint)
+    except (OSError, ValueError, KeyError, TypeError) as load_error:
+        logger.debug("Ignoring the unreadable policy cache entry {}: {}".format(
+            entry_path, load_error))
+        return None
+    touch(entry_path)
+    return hints
+
+
+def store_policy_result(cache_dir: str,
+                        key: str,
+                        hints: List[Hint],
+                        max_bytes: Optional[int] = None):
+    """
+    Publish the configs of a key, the entry is replaced atomically. Every
+    ``TRIM_INTERVAL`` stores, the cache is trimmed to ``max_bytes``.
+    """
+    global _stores
+    with _stores_lock:
+        trim = _stores % TRIM_INTERVAL == 0
+        _stores += 1
+    if trim:
+        trim_cache(cache_dir, max_bytes)
+    entry_path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    entries = [{"hint": hint.serialize(), "priority": hint.priority} for hint in hints]
+    with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(entry_path), prefix=f".{key}.", delete=False) as f:
+        json.dump(entries, f)
+    os.replace(f.name, entry_path)
+
+
+def emit_config_cached(
+    policy_cls: Type[DefaultPolicy],
+    func: tir.PrimFunc,
+    arch: TileDevice,
+    topk: int,
+    tags: Optional[Dict] = None,
+) -> List[Hint]:
+    """
+    ``policy_cls(func, arch, tags).emit_config(topk)``, looked up in the
+    policy cache first: on a hit the policy is neither built nor run.
+    """
+    cache_dir = _policy_cache_dir
+    key = get_policy_key(func, arch, policy_cls, topk, tags) if cache_dir else None
+    if key is not None:
+        hints = lookup_policy_result(cache_dir, key, arch)
+        if hints is not None:
+            logger.debug("Reusing {} cached configs of {}".format(len(hints), policy_cls.__name__))
+            return hints
+    hints = policy_cls(func=func, arch=arch, tags=tags).emit_config(topk)
+    if key is not None:
+        try:
+            store_policy_result(cache_dir, key, hints, _policy_cache_max_bytes)
+        except OSError as store_error:
+            logger.debug("Failed to store the policy result: {}".format(store_error))
+    return hints
+
+
+def clear_policy_cache(cache_dir: Optional[str] = None):
+    """Remove every entry of the policy cache (the current one by default)."""
+    cache_dir = cache_dir or _policy_cache_dir
+    if cache_dir is not None and os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
-from .node import PrimFuncNode  # noqa: F401
+from .node import PrimFuncNode, clear_tile_analysis_cache  # noqa: F401
 from .hint import Hint  # noqa: F401
 from .policy import DefaultPolicy, TensorCorePolicy  # noqa: F401
 from .arch import TileDevice, CUDA  # noqa: F401
+from .cost_model import CostModel, RooflineCostModel, RidgeCostModel  # noqa: F401
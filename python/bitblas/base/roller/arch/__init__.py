@@ -2,12 +2,17 @@
 # Licensed under the MIT License.
 from .arch_base import TileDevice
 from .cuda import *
+from .device_profile import (
+    get_device_profile,  # noqa: F401
+    load_device_profiles,  # noqa: F401
+    register_device_profile,  # noqa: F401
+)
 from .cpu import *
 
 
-def get_arch(target: tvm.target.Target) -> TileDevice:
+def get_arch(target: tvm.target.Target, profile=None) -> TileDevice:
     if target.kind.name == "cuda":
-        return CUDA(target)
+        return CUDA(target, profile)
     elif target.kind.name == "llvm":
         return CPU(target)
     else:
@@ -1,7 +1,25 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-from typing import List
+import json
+from typing import Dict, List
+
+# the attributes of a device the policies read
+_ARCH_ATTRS = [
+    "platform",
+    "compute_capability",
+    "reg_cap",
+    "smem_cap",
+    "max_smem_usage",
+    "compute_max_core",
+    "warp_size",
+    "sm_partition",
+    "transaction_size",
+    "bandwidth",
+    "l2_cache_size_bytes",
+    "dram_bandwidth_gbps",
+    "peak_tflops",
+]
 
 
 class TileDevice:
@@ -35,6 +53,17 @@ class TileDevice:
         self.transaction_size: List[int] = [0, 0]  # in bytes
         # bandwidth in MB/s, will be used for recommend basic tile size
         self.bandwidth: List[int] = [0, 0]
+        # peak global memory bandwidth in GB/s and compute throughputs in
+        # TFLOPS by unit ("tensorcore", "cuda_core"), used by the cost model
+        self.dram_bandwidth_gbps: float = 0
+        self.peak_tflops: Dict[str, float] = {}
 
     def get_avaliable_tensorintrin_shapes(self):
         raise NotImplementedError()
+
+
+def get_arch_key(arch: TileDevice) -> str:
+    """The profile of a device, as far as the policies are concerned."""
+    profile = {name: getattr(arch, name, None) for name in _ARCH_ATTRS}
+    profile["target"] = str(getattr(arch, "target", None))
+    return json.dumps(profile, sort_keys=True, default=str)
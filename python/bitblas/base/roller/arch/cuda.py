@@ -4,7 +4,11 @@
 import tvm
 from tvm.target import Target
 from .arch_base import TileDevice
-from typing import List, Dict
+from .device_profile import get_device_profile
+from typing import List, Dict, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def check_sm_version(arch: str) -> int:
@@ -27,30 +31,62 @@ class TensorInstruction(object):
 
 
 class CUDA(TileDevice):
+    """
+    A CUDA device, described by the live device 0, or by the profile of the
+    architecture of the target (see ``device_profile``) when there is no
+    device or when a ``profile`` is given. Scheduling and code generation
+    work from a profile alone, measurement needs the device.
+    """
 
-    def __init__(self, target: Target):
+    def __init__(self, target: Target, profile: Optional[Union[str, Dict]] = None):
         self.target = target
         self.sm_version = check_sm_version(self.target.arch)
         device = tvm.runtime.cuda(0)
-        if not device.exist:
-            raise RuntimeError("Cannot find cuda device 0.")
         self.device: tvm.runtime.Device = device
         self.platform: str = "CUDA"
-        self.smem_cap = device.max_shared_memory_per_block
-        self.compute_max_core = device.multi_processor_count
-        self.warp_size = device.warp_size
-        self.compute_capability = device.compute_version.replace(".", "")
-        self.reg_cap: int = 65536
+        if profile is None and not device.exist:
+            profile = self.target.arch
+        if isinstance(profile, str):
+            arch = profile
+            profile = get_device_profile(arch)
+            if profile is None:
+                raise RuntimeError(f"Cannot find cuda device 0 nor a device profile of {arch}.")
+        # the profile of the device when it is not read from a live one
+        self.profile: Optional[Dict] = profile
+        if profile is None:
+            self.smem_cap = device.max_shared_memory_per_block
+            self.compute_max_core = device.multi_processor_count
+            self.warp_size = device.warp_size
+            self.compute_capability = device.compute_version.replace(".", "")
+            self.reg_cap: int = 65536
+            self.sm_partition: int = 4
+            self.l2_cache_size_bytes: int = target.l2_cache_size_bytes
+            # the number of transaction size in bytes
+            self.transaction_size: List[int] = [32, 128]  # in bytes
+            # bandwidth in MB/s, will be used for recommend basic tile size
+            # TODO(lei): find some way to get the real bandwidth
+            # However, the ratio of bandwidth between different devices can
+            # be similar. The bandwidth can work for another devices as well.
+            self.bandwidth: List[int] = [750, 12080]
+        else:
+            logger.info("Using the device profile {} of {}".format(
+                profile.get("name", "(unnamed)"), self.target.arch))
+            self.smem_cap = int(profile["smem_cap"])
+            self.compute_max_core = int(profile["compute_max_core"])
+            self.warp_size = int(profile["warp_size"])
+            self.compute_capability = str(self.sm_version)
+            self.reg_cap: int = int(profile["reg_cap"])
+            self.sm_partition: int = int(profile["sm_partition"])
+            self.l2_cache_size_bytes: int = int(
+                profile.get("l2_cache_size_bytes") or target.l2_cache_size_bytes)
+            self.transaction_size: List[int] = list(profile["transaction_size"])
+            self.bandwidth: List[int] = list(profile["bandwidth"])
         self.max_smem_usage: int = 2 * self.smem_cap
-        self.sm_partition: int = 4
-        self.l2_cache_size_bytes: int = target.l2_cache_size_bytes
-        # the number of transaction size in bytes
-        self.transaction_size: List[int] = [32, 128]  # in bytes
-        # bandwidth in MB/s, will be used for recommend basic tile size
-        # TODO(lei): find some way to get the real bandwidth
-        # However, the ratio of bandwidth between different devices can
-        # be similar. The bandwidth can work for another devices as well.
-        self.bandwidth: List[int] = [750, 12080]
+        # peaks of the analytical cost model, a live device takes those of the
+        # profile of its architecture, 0 / empty when unknown
+        peaks = profile if profile is not None else (get_device_profile(self.target.arch) or {})
+        self.dram_bandwidth_gbps: float = float(peaks.get("dram_bandwidth_gbps", 0))
+        self.peak_tflops: Dict[str, float] = dict(peaks.get("peak_tflops", {}))
         # get the available tensor instructions during runtime to avoid
         # the dependency of the tensor intrinsics registration
         self.available_tensor_instructions: List[TensorInstruction] = None
@@ -0,0 +1,131 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Hardware profiles of CUDA architectures, used when no device is present"""
+import json
+import os
+import threading
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# path of a json file of profiles, {"sm_80": {...}, ...}, loaded on first use
+DEVICE_PROFILE_ENV = "BITBLAS_DEVICE_PROFILE"
+
+_MiB = 1024 * 1024
+
+# attributes shared by the supported architectures, smem_cap is the per block
+# limit reported by the driver (as read from a live device), not the opt-in one
+_COMMON_PROFILE = {
+    "smem_cap": 48 * 1024,
+    "warp_size": 32,
+    "reg_cap": 65536,
+    "sm_partition": 4,
+    "transaction_size": [32, 128],
+    # the ratio of the bandwidths matters for the tile recommendation, not
+    # their values, see CUDA.bandwidth
+    "bandwidth": [750, 12080],
+}
+
+# a representative device of each architecture, the peaks (dense fp16 tensor
+# core and fp32 cuda core throughput) drive the analytical cost model
+_BUILTIN_PROFILES: Dict[str, Dict] = {
+    "sm_70": {
+        "name": "Tesla V100",
+        "compute_max_core": 80,
+        "l2_cache_size_bytes": 6 * _MiB,
+        "dram_bandwidth_gbps": 900,
+        "peak_tflops": {
+            "tensorcore": 125,
+            "cuda_core": 15.7
+        }
+    },
+    "sm_75": {
+        "name": "Tesla T4",
+        "compute_max_core": 40,
+        "l2_cache_size_bytes": 4 * _MiB,
+        "dram_bandwidth_gbps": 320,
+        "peak_tflops": {
+            "tensorcore": 65,
+            "cuda_core": 8.1
+        }
+    },
+    "sm_80": {
+        "name": "A100",
+        "compute_max_core": 108,
+        "l2_cache_size_bytes": 40 * _MiB,
+        "dram_bandwidth_gbps": 1555,
+        "peak_tflops": {
+            "tensorcore": 312,
+            "cuda_core": 19.5
+        }
+    },
+    "sm_86": {
+        "name": "GeForce RTX 3090",
+        "compute_max_core": 82,
+        "l2_cache_size_bytes": 6 * _MiB,
+        "dram_bandwidth_gbps": 936,
+        "peak_tflops": {
+            "tensorcore": 71,
+            "cuda_core": 35.6
+        }
+    },
+    "sm_89": {
+        "name": "GeForce RTX 4090",
+        "compute_max_core": 128,
+        "l2_cache_size_bytes": 72 * _MiB,
+        "dram_bandwidth_gbps": 1008,
+        "peak_tflops": {
+            "tensorcore": 165,
+            "cuda_core": 82.6
+        }
+    },
+    "sm_90": {
+        "name": "H100 SXM",
+        "compute_max_core": 132,
+        "l2_cache_size_bytes": 50 * _MiB,
+        "dram_bandwidth_gbps": 3350,
+        "peak_tflops": {
+            "tensorcore": 989,
+            "cuda_core": 67
+        }
+    },
+}
+
+_registered_profiles: Dict[str, Dict] = {}
+_env_loaded = False
+_lock = threading.Lock()
+
+
+def register_device_profile(arch: str, profile: Dict):
+    """Register (or override) the profile of an architecture, e.g. ``sm_80``."""
+    missing = {"compute_max_core"} - set(profile) - set(_BUILTIN_PROFILES.get(arch, {}))
+    if missing:
+        raise ValueError(f"The profile of {arch} misses {sorted(missing)}")
+    with _lock:
+        _registered_profiles[arch] = dict(profile)
+
+
+def load_device_profiles(path: str):
+    """Register the profiles of a json file mapping architectures to profiles."""
+    with open(path) as f:
+        profiles = json.load(f)
+    for arch, profile in profiles.items():
+        register_device_profile(arch, profile)
+
+
+def get_device_profile(arch: str) -> Optional[Dict]:
+    """
+    The profile of ``arch``: the registered attributes over the builtin ones
+    over the common ones. None if the architecture is unknown.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        if os.environ.get(DEVICE_PROFILE_ENV):
+            load_device_profiles(os.environ[DEVICE_PROFILE_ENV])
+    with _lock:
+        registered = _registered_profiles.get(arch)
+    if registered is None and arch not in _BUILTIN_PROFILES:
+        return None
+    return {**_COMMON_PROFILE, **_BUILTIN_PROFILES.get(arch, {}), **(registered or {})}
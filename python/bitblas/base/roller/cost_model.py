@@ -0,0 +1,199 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Cost models predicting the latency of roller candidates without running them"""
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from .arch import TileDevice
+from .hint import Hint
+
+# the peaks of an A100, for devices of unknown peaks: only the ranking of the
+# candidates of a device matters, not the absolute predictions
+_DEFAULT_DRAM_BANDWIDTH_GBPS = 1555.0
+_DEFAULT_PEAK_TFLOPS = {"tensorcore": 312.0, "cuda_core": 19.5}
+
+
+class CostModel(ABC):
+    """
+    Predicts the latency (in ms) of the candidates emitted by a roller policy
+    from their ``Hint.features``, to rank them offline or to measure only the
+    most promising ones. Hints without features (e.g. seeds) are predicted
+    ``inf``.
+    """
+
+    @abstractmethod
+    def predict(self, hints: Sequence[Hint]) -> List[float]:
+        pass
+
+    def rank(self, hints: Sequence[Hint], topk: Optional[int] = None) -> List[Hint]:
+        """The ``topk`` hints (all by default) of least predicted latency, best first."""
+        predictions = self.predict(hints)
+        order = sorted(range(len(hints)), key=lambda i: predictions[i])
+        return [hints[i] for i in order[:topk]]
+
+    def update(self, hints: Sequence[Hint], latencies: Sequence[float]):  # noqa: B027
+        """Learn from measured latencies, analytical models ignore them."""
+
+
+class RooflineCostModel(CostModel):
+    """
+    Roofline of the device: a kernel takes the time of its slowest resource,
+    global memory, shared memory or compute, each at its peak scaled down by
+    how well the candidate uses it.
+
+    - global memory moves the unique bytes of the function once, the bytes
+      re-read by other blocks miss the L2 with ``l2_miss_ratio`` (lower with
+      a rasterized grid), at an efficiency growing with the vector width.
+    - shared memory stages the global traffic, at the global bandwidth times
+      the ratio of ``TileDevice.bandwidth``.
+    - compute runs the flops on tensor cores or cuda cores.
+    - the warps resident on an SM, multiplied by the pipeline stages, hide the
+      memory latency up to ``latency_hiding_warps``, and the last wave of a
+      grid that does not fill the SMs wastes the idle ones.
+    """
+
+    launch_overhead_ms = 0.003
+    l2_miss_ratio = 0.5
+    rasterized_l2_miss_ratio = 0.25
+    latency_hiding_warps = 16
+    # bytes of an access reaching the full bandwidth, 128 bit loads
+    full_vector_bytes = 16
+
+    def __init__(self, arch: TileDevice):
+        self.arch = arch
+        self.dram_bandwidth_gbps = arch.dram_bandwidth_gbps or _DEFAULT_DRAM_BANDWIDTH_GBPS
+        self.peak_tflops = {**_DEFAULT_PEAK_TFLOPS, **arch.peak_tflops}
+        global_bandwidth, shared_bandwidth = arch.bandwidth
+        self.smem_bandwidth_gbps = math.inf
+        if global_bandwidth > 0:
+            self.smem_bandwidth_gbps = self.dram_bandwidth_gbps * shared_bandwidth / global_bandwidth
+
+    def predict_one(self, features) -> float:
+        if not features:
+            return math.inf
+        num_sm = max(self.arch.compute_max_core, 1)
+        grid_size = max(features["grid_size"], 1)
+        # SMs busy in the last wave over all the SMs
+        sm_waves = math.ceil(grid_size / num_sm)
+        wave_efficiency = grid_size / (sm_waves * num_sm)
+        resident_blocks = min(features["block_per_SM"], sm_waves)
+        warps = resident_blocks * features["threads"] / max(self.arch.warp_size, 1)
+        latency_hiding = min(1.0,
+                             warps * max(features["pipeline_stage"], 1) / self.latency_hiding_warps)
+
+        unique_bytes = min(features["unique_bytes"], features["global_bytes"])
+        miss_ratio = (
+            self.rasterized_l2_miss_ratio if features["rasterization"] else self.l2_miss_ratio)
+        dram_bytes = unique_bytes + (features["global_bytes"] - unique_bytes) * miss_ratio
+        vector_efficiency = 0.5 + 0.5 * min(1.0, features["vector_bytes"] / self.full_vector_bytes)
+        dram_ms = dram_bytes / (self.dram_bandwidth_gbps * 1e6 * vector_efficiency)
+        smem_ms = features["global_bytes"] / (self.smem_bandwidth_gbps * 1e6)
+
+        unit = "tensorcore" if features["use_tc"] else "cuda_core"
+        compute_ms = features["flops"] / (self.peak_tflops[unit] * 1e9)
+
+        return (max(dram_ms, smem_ms, compute_ms) / (wave_efficiency * max(latency_hiding, 1e-3)) +
+                self.launch_overhead_ms)
+
+    def predict(self, hints: Sequence[Hint]) -> List[float]:
+        return [self.predict_one(hint.features) for hint in hints]
+
+
+class RidgeCostModel(CostModel):
+    """
+    Ridge regression of the log latency on hand-built features of the hints:
+    the log of the roofline prediction and of the traffic and work, and the
+    launch configuration. It is trained from measured candidates, with
+    ``fit`` on a set of samples (e.g. the ``samples`` of a
+    ``bitblas.base.MeasurementLog``, see ``fit_log``) and incrementally with
+    ``update`` as tuning measures more of them. Until ``min_samples`` are
+    known it predicts with the roofline model.
+    """
+
+    def __init__(self, arch: TileDevice, alpha: float = 1.0, min_samples: int = 16):
+        self.arch = arch
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.roofline = RooflineCostModel(arch)
+        self._features: List[np.ndarray] = []
+        self._targets: List[float] = []
+        self.weights: Optional[np.ndarray] = None
+        self._mean: Optional[np.ndarray] = None
+        self._std: Optional[np.ndarray] = None
+
+    def featurize(self, features: Dict[str, float]) -> np.ndarray:
+        return np.array([
+            math.log(self.roofline.predict_one(features)),
+            math.log1p(features["flops"]),
+            math.log1p(features["global_bytes"]),
+            math.log1p(features["unique_bytes"]),
+            math.log1p(features["smem_bytes"]),
+            math.log1p(features["grid_size"]),
+            features["num_wave"],
+            features["block_per_SM"],
+            math.log2(max(features["threads"], 1)),
+            features["pipeline_stage"],
+            features["use_async"],
+            features["use_tc"],
+            math.log2(max(features["vector_bytes"], 1)),
+            float(features["rasterization"] > 0),
+            features["bits"] / 32,
+        ])
+
+    @property
+    def trained(self) -> bool:
+        return self.weights is not None
+
+    @property
+    def num_samples(self) -> int:
+        return len(self._targets)
+
+    def _refit(self):
+        if len(self._targets) < self.min_samples:
+            return
+        x = np.stack(self._features)
+        self._mean = x.mean(axis=0)
+        self._std = np.where(x.std(axis=0) > 0, x.std(axis=0), 1.0)
+        # the last column is the intercept, which is not regularized
+        x = np.hstack([(x - self._mean) / self._std, np.ones((len(x), 1))])
+        penalty = self.alpha * np.eye(x.shape[1])
+        penalty[-1, -1] = 0
+        self.weights = np.linalg.solve(x.T @ x + penalty, x.T @ np.log(self._targets))
+
+    def fit(self, features: Sequence[Dict[str, float]], latencies: Sequence[float]):
+        """Retrain from scratch on the given cost features and latencies (in ms)."""
+        self._features, self._targets = [], []
+        self.weights = None
+        self._add(features, latencies)
+        self._refit()
+        return self
+
+    def fit_log(self, log, arch: Optional[str] = None):
+        """Retrain on the samples of ``arch`` (the target arch of the model by default) of a log."""
+        if arch is None:
+            arch = getattr(getattr(self.arch, "target", None), "arch", None)
+        return self.fit(*log.samples(arch))
+
+    def _add(self, features: Sequence[Dict[str, float]], latencies: Sequence[float]):
+        for feature, latency in zip(features, latencies):
+            if feature and 0 < latency < 1e9:
+                self._features.append(self.featurize(feature))
+                self._targets.append(float(latency))
+
+    def update(self, hints: Sequence[Hint], latencies: Sequence[float]):
+        self._add([hint.features for hint in hints], latencies)
+        self._refit()
+
+    def predict(self, hints: Sequence[Hint]) -> List[float]:
+        if not self.trained:
+            return self.roofline.predict(hints)
+        predictions = []
+        for hint in hints:
+            if not hint.features:
+                predictions.append(math.inf)
+                continue
+            x = (self.featurize(hint.features) - self._mean) / self._std
+            predictions.append(float(np.exp(x @ self.weights[:-1] + self.weights[-1])))
+        return predictions
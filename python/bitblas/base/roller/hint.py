@@ -1,7 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 """Hint definition for schedule"""
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from . import PrimFuncNode
 import numpy as np
 from .rasterization import *
@@ -92,6 +92,7 @@ class TileDict:
         self.block_per_SM = -1
         self.num_wave = -1
         self.grid_size = -1
+        self.reg_usage = -1
         self.valid = True
 
     def get_tile(self, func) -> List[int]:
@@ -176,6 +177,10 @@ class Hint(object):
         self.intrin_info = IntrinInfo("float16", "float16", True)
         self.shared_scope: str = "shared"
         self.pass_context: Dict = {}
+        # roller score of the tile of the hint, lower is better, None if unknown
+        self.priority: Optional[float] = None
+        # features of the hint for the cost models, see DefaultPolicy.get_cost_features
+        self.features: Dict[str, float] = {}
 
     def to_dict(self) -> Dict:
         dic = {}
@@ -210,6 +215,79 @@ class Hint(object):
             setattr(self, k, v)
         return self
 
+    def serialize(self) -> Dict:
+        """
+        Json serializable form of the hint, including everything the schedule
+        rules read from it, so that the schedule can be re-applied later.
+        The architecture is not serialized.
+        """
+        intrin_info = self.intrin_info
+        rasterization_plan = {"kind": type(self.rasterization_plan).__name__}
+        if hasattr(self.rasterization_plan, "panel_width_"):
+            rasterization_plan["panel_width"] = int(self.rasterization_plan.panel_width_)
+        return {
+            "block": [int(x) for x in self.block],
+            "thread": [int(x) for x in self.thread],
+            "warp": [int(x) for x in self.warp],
+            "rstep": [int(x) for x in self.rstep],
+            "reduce_thread": [int(x) for x in self.reduce_thread],
+            "use_tc": bool(self.use_tc),
+            "raxis_order": [int(x) for x in self._raxis_order],
+            "step": [int(x) for x in self._step],
+            "vectorize": {str(k): int(v) for k, v in self.vectorize.items()},
+            "pipeline_stage": int(self.pipeline_stage),
+            "use_async": bool(self.use_async),
+            "intrin_info": {
+                "in_dtype": str(intrin_info.in_dtype),
+                "out_dtype": str(intrin_info.out_dtype),
+                "trans_b": bool(intrin_info.trans_b),
+                "input_transform_kind": int(intrin_info.input_transform_kind),
+                "weight_transform_kind": int(intrin_info.weight_transform_kind),
+            },
+            "shared_scope": self.shared_scope,
+            "pass_context": {str(k): v for k, v in self.pass_context.items()},
+            "cached_tensors": [str(x) for x in self.cached_tensors],
+            "output_strides": {
+                str(k): [stride.ax, stride.stride] for k, stride in self.output_strides.items()
+            },
+            "rasterization_plan": rasterization_plan,
+            "opt_shapes": {str(k): int(v) for k, v in (self.opt_shapes or {}).items()},
+            "features": {str(k): float(v) for k, v in self.features.items()},
+        }
+
+    def deserialize(self, dic: Dict, arch=None) -> "Hint":
+        self.__init__()
+        self.arch = arch
+        self.block = list(dic["block"])
+        self.thread = list(dic["thread"])
+        self.warp = list(dic["warp"])
+        self.rstep = list(dic["rstep"])
+        self.reduce_thread = list(dic["reduce_thread"])
+        self.use_tc = dic["use_tc"]
+        self._raxis_order = list(dic["raxis_order"])
+        self._step = list(dic["step"])
+        self.vectorize = dict(dic["vectorize"])
+        self.pipeline_stage = dic["pipeline_stage"]
+        self.use_async = dic["use_async"]
+        self.intrin_info = IntrinInfo(**dic["intrin_info"])
+        self.shared_scope = dic["shared_scope"]
+        self.pass_context = dict(dic["pass_context"])
+        self.cached_tensors = list(dic["cached_tensors"])
+        self.output_strides = {
+            int(k): Stride(stride=stride, ax=ax)
+            for k, (ax, stride) in dic["output_strides"].items()
+        }
+        plan = dic["rasterization_plan"]
+        if plan["kind"] == "Rasterization2DRow":
+            self.rasterization_plan = Rasterization2DRow(plan["panel_width"])
+        elif plan["kind"] == "Rasterization2DColumn":
+            self.rasterization_plan = Rasterization2DColumn(plan["panel_width"])
+        else:
+            self.rasterization_plan = NoRasterization()
+        self.opt_shapes = dict(dic["opt_shapes"])
+        self.features = dict(dic.get("features", {}))
+        return self
+
     @property
     def raxis_order(self) -> List[int]:
         if self._raxis_order != []:
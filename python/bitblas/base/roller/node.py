@@ -5,15 +5,72 @@
 import tvm
 from tvm import tir
 from tvm.tir import IterVar, PrimFunc
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 from tvm.tir.schedule.schedule import BlockRV
+from collections import OrderedDict
 import numpy as np
 import functools
+import threading
 from ..analysis import BlockInfo, get_reduction_blocks
 from .. import analysis
 from .. import normalize_prim_func
 from .shape_inference import get_analyzer_by_tir
 
+# the number of functions whose tile analyses are kept, least recently used first out
+TILE_ANALYSIS_CACHE_SIZE = 64
+
+_tile_analysis_cache: "OrderedDict[Tuple, Tuple[PrimFunc, Dict[str, Dict], threading.RLock]]" = (
+    OrderedDict())
+_tile_analysis_lock = threading.Lock()
+
+
+def _get_names(func: PrimFunc) -> Tuple:
+    """The names of the buffers and blocks of ``func``, which structural equality ignores."""
+    names = [func.buffer_map[param].name for param in func.params if param in func.buffer_map]
+
+    def _visit(node):
+        if isinstance(node, tir.Block):
+            names.append(node.name_hint)
+            names.extend(buffer.name for buffer in node.alloc_buffers)
+            names.extend(region.buffer.name for region in node.match_buffers)
+
+    tir.stmt_functor.post_order_visit(func.body, _visit)
+    return tuple(names)
+
+
+def get_tile_analysis_cache(func: PrimFunc) -> Tuple[Dict[str, Dict], threading.RLock]:
+    """
+    The memoized tile analyses (see ``PrimFuncNode.memoize``) of ``func`` and
+    the lock guarding them, shared by all the nodes of structurally equal
+    functions so that every policy of a function (successive ``emit_config``
+    calls, identical layers) reuses them. The analyses are keyed by buffer
+    name, functions naming their buffers differently do not share them.
+    """
+    key = (tvm.ir.structural_hash(func), _get_names(func))
+    with _tile_analysis_lock:
+        entry = _tile_analysis_cache.get(key)
+        if entry is not None and tvm.ir.structural_equal(entry[0], func):
+            _tile_analysis_cache.move_to_end(key)
+            return entry[1], entry[2]
+        memo: Dict[str, Dict] = {}
+        # re-entrant, an analysis may memoize the analyses it builds on
+        memo_lock = threading.RLock()
+        _tile_analysis_cache[key] = (func, memo, memo_lock)
+        while len(_tile_analysis_cache) > TILE_ANALYSIS_CACHE_SIZE:
+            _tile_analysis_cache.popitem(last=False)
+        return memo, memo_lock
+
+
+def clear_tile_analysis_cache():
+    with _tile_analysis_lock:
+        _tile_analysis_cache.clear()
+
+
+def tile_key(tile, rstep: Optional[Dict] = None) -> Tuple:
+    """Hashable form of a tile and its reduce steps."""
+    rstep = tuple(sorted((k, int(v)) for k, v in (rstep or {}).items()))
+    return tuple(int(x) for x in tile), rstep
+
 
 def pre_order_traverse(block_analyzer, blocks, func):
     visited = set()
@@ -104,12 +161,17 @@ class Node(object):
             return None
         return self._tag[k]
 
+    def tags_key(self) -> Tuple:
+        """Hashable form of the tags of the node."""
+        return tuple(sorted((str(k), repr(v)) for k, v in self._tag.items()))
+
 
 class PrimFuncNode(Node):
 
     def __init__(self, prim_func: PrimFunc, tags: Optional[Dict] = None) -> None:
         super().__init__(tags)
         self.prim_func = self._specialize_func(prim_func)
+        self._memo, self._memo_lock = get_tile_analysis_cache(self.prim_func)
         self.sch: tir.Schedule = tir.Schedule(self.prim_func)
         self.block_analyzer: BlockAnalyzer = BlockAnalyzer(self.sch)
         self.schedule_stages: List[BlockRV] = []
@@ -228,14 +290,34 @@ class PrimFuncNode(Node):
     def get_buffer_dtype(self, buffer: tir.Buffer) -> tvm.DataType:
         return tvm.DataType(buffer.dtype)
 
+    def memoize(self, kind: str, key, compute: Callable[[], Any]) -> Any:
+        """
+        The result of ``compute`` for ``key`` among the analyses of ``kind``,
+        computed once per structurally equal function. ``key`` must capture
+        everything the result depends on besides the function.
+        """
+        with self._memo_lock:
+            memo = self._memo.setdefault(kind, {})
+            if key not in memo:
+                memo[key] = compute()
+            return memo[key]
+
     def propagate(self, tile, rstep: Optional[Dict] = None, targets=None):
         if rstep is None:
             rstep = {}
-        shape = {
-            self.block_analyzer.get_output_buffers(block)[0].name:
-            [tvm.arith.ConstIntBound(0, val - 1) for val in tile] for block in self.schedule_stages
-        }
-        return self.ana.infer(shape, rstep, targets)
+
+        def _infer():
+            shape = {
+                self.block_analyzer.get_output_buffers(block)[0].name:
+                [tvm.arith.ConstIntBound(0, val - 1) for val in tile]
+                for block in self.schedule_stages
+            }
+            return self.ana.infer(shape, rstep, targets)
+
+        key = (tile_key(tile, rstep), None if targets is None else tuple(targets))
+        shapes, intermediate_bind = self.memoize("propagate", key, _infer)
+        # the memoized shapes are shared, hand out copies
+        return {name: list(shape) for name, shape in shapes.items()}, dict(intermediate_bind)
 
     def propagate_inputs(self, tile, rstep: Optional[Dict] = None) -> List[List[int]]:
         if rstep is None:
@@ -358,6 +440,13 @@ class PrimFuncNode(Node):
     def footprint(self, shape, rstep, stride_map: Optional[Dict] = None) -> int:
         if stride_map is None:
             stride_map = {}
+        key = (tile_key(shape, rstep),
+               tuple(sorted((name, s.ax, s.stride) for name, s in stride_map.items())))
+        result, cached_tensor = self.memoize("footprint", key,
+                                             lambda: self._footprint(shape, rstep, stride_map))
+        return result, list(cached_tensor)
+
+    def _footprint(self, shape, rstep, stride_map: Dict) -> int:
         result = 0
         shapes, _ = self.propagate(shape, rstep)
 
@@ -10,10 +10,11 @@ import numpy as np
 import tvm
 
 from ..arch import TileDevice
+from ..arch.arch_base import get_arch_key
 from ..bestfit import BestFit
 from ..hint import Hint, Stride, TileDict
 from .common import coalesced_factor, coalesced_tensor_shape, factorize, get_all_factors
-from ..node import PrimFuncNode
+from ..node import PrimFuncNode, tile_key
 from ..rasterization import NoRasterization
 
 
@@ -48,6 +49,8 @@ class DefaultPolicy:
 
             self._expand_reduce_axis(td)
             for codegen_dicts in self.assign_block_size(td):
+                codegen_dicts.priority = float(self.tile_priority(td))
+                codegen_dicts.features = self.get_cost_features(td, codegen_dicts)
                 results.append(codegen_dicts)
                 if len(results) >= topk:
                     break
@@ -69,8 +72,7 @@ class DefaultPolicy:
         visited_tiles = {}
         queue = PriorityQueue()
 
-        def prio(td: TileDict):
-            return (td.traffic + 1) * td.num_wave
+        prio = self.tile_priority
 
         def add_to_queue(tile):
             if tuple(tile) in visited_tiles:
@@ -94,6 +96,53 @@ class DefaultPolicy:
         sorted_tiles = sorted(visited_tiles, key=lambda td: prio(td))
         return sorted_tiles
 
+    @staticmethod
+    def tile_priority(td: TileDict) -> float:
+        """The order in which tiles are explored and emitted, lower is better."""
+        return (td.traffic + 1) * td.num_wave
+
+    def get_cost_features(self, td: TileDict, hint: Hint) -> Dict[str, float]:
+        """
+        Features of a candidate for the cost models (see ``roller.cost_model``):
+        the work of the function, the traffic, footprint and occupancy of the
+        tile and the launch configuration of the hint. Bytes are counted in
+        memory transactions, ``global_bytes`` over all the blocks.
+        """
+        node = self.prim_func_node
+        reduce_extent = int(np.prod([int(ax.dom.extent) for ax in node.raxis]))
+        unique_bytes = 0
+        for buffer in node.args:
+            nbytes = (node.get_buffer_dtype(buffer).bits + 7) // 8
+            unique_bytes += int(np.prod([node.extent_wrapper(x) for x in buffer.shape])) * nbytes
+        if hint.use_tc:
+            threads = int(np.prod(hint.block) // np.prod(hint.warp)) * self.arch.warp_size
+        else:
+            threads = int(np.prod(hint.thread) * np.prod(hint.reduce_thread))
+        buffer_bytes = {
+            buffer.name: (node.get_buffer_dtype(buffer).bits + 7) // 8 for buffer in node.args
+        }
+        vector_bytes = max(
+            [vec * buffer_bytes.get(name, 1) for name, vec in hint.vectorize.items()],
+            default=(node.get_dtype().bits + 7) // 8)
+        return {
+            "flops": float(2 * np.prod(node.get_space_dim()) * reduce_extent),
+            "global_bytes": float(td.traffic * td.grid_size),
+            "block_bytes": float(td.traffic),
+            "unique_bytes": float(unique_bytes),
+            "smem_bytes": float(td.smem_cost),
+            "reg_usage": float(td.reg_usage),
+            "grid_size": float(td.grid_size),
+            "block_per_SM": float(td.block_per_SM),
+            "num_wave": float(td.num_wave),
+            "threads": float(threads),
+            "pipeline_stage": float(hint.pipeline_stage),
+            "use_async": float(hint.use_async),
+            "use_tc": float(bool(hint.use_tc)),
+            "vector_bytes": float(vector_bytes),
+            "rasterization": float(getattr(hint.rasterization_plan, "panel_width_", 0)),
+            "bits": float(node.get_dtype().bits),
+        }
+
     def get_base_tile(self):
         """
         Gets the minimum tile configuration that satisfies no redundancy in computation.
@@ -455,9 +504,16 @@ class DefaultPolicy:
         """
         output_strides_map = {}
         tensor_strides_map = {}
+        arch_key = get_arch_key(self.arch)
         for node in self.ordered_nodes:
-            output_strides_map[node], tensor_strides_map[node] = self.compute_node_stride_map(
-                node, td)
+            # the stride map of a node depends on its tile and reduce steps,
+            # its tags and the device
+            tile = tile_key(td.get_tile(node), td.get_rstep(node))
+            key = (type(self).__name__, tile, node.tags_key(), arch_key)
+            output_strides, tensor_strides = node.memoize(
+                "stride_map", key, lambda node=node: self.compute_node_stride_map(node, td))
+            output_strides_map[node], tensor_strides_map[node] = (dict(output_strides),
+                                                                  dict(tensor_strides))
         td.output_strides_map, td.tensor_strides_map = output_strides_map, tensor_strides_map
 
     def compute_tile_dict(self, output_tile: List[int], rstep_map) -> TileDict:
@@ -490,6 +546,7 @@ class DefaultPolicy:
         reg_usage = int(2 * max([
             np.prod(td.get_tile(node)) * node.get_dtype().bits / 32 for node in self.ordered_nodes
         ]))
+        td.reg_usage = reg_usage
         if reg_usage > self.arch.reg_cap:
             td.valid = False
             return td
@@ -0,0 +1,43 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Options of a tuning call, threaded from the operators down to the builds"""
+from dataclasses import dataclass
+from typing import List, Optional
+from tvm.contrib.popen_pool import PopenPoolExecutor
+from bitblas.base.budget import TuningBudget
+from bitblas.base.measure import MeasurementPolicy
+from bitblas.base.journal import TuningJournal
+from bitblas.base.measure_log import MeasurementLog
+from bitblas.base.roller.cost_model import CostModel
+from bitblas.base.roller.hint import Hint
+
+
+@dataclass
+class TuningOptions:
+    """
+    How ``fast_tune`` and the tuning calls built on it search, all optional.
+
+    - ``builder``: the ``PopenPoolExecutor`` building the candidates, shared
+      between the operators tuned in a row, see ``bitblas.base.build_pool``.
+    - ``seed_hints``: hints evaluated first, in addition to the emitted
+      configs, e.g. the schedule of a similar, already tuned shape.
+    - ``budget``: bounds the time and the builds spent, see
+      ``bitblas.base.budget``.
+    - ``measurement``: how the candidates are timed, see
+      ``bitblas.base.measure``.
+    - ``journal``: records the progress to resume an interrupted tuning, see
+      ``bitblas.base.journal``.
+    - ``cost_model``: ranks the candidates so that only the ``measure_topk``
+      most promising ones are measured, see ``bitblas.base.roller.cost_model``.
+    - ``measure_log``: accumulates the measured candidates to train cost
+      models, see ``bitblas.base.measure_log``.
+    """
+
+    builder: Optional[PopenPoolExecutor] = None
+    seed_hints: Optional[List[Hint]] = None
+    budget: Optional[TuningBudget] = None
+    measurement: Optional[MeasurementPolicy] = None
+    journal: Optional[TuningJournal] = None
+    cost_model: Optional[CostModel] = None
+    measure_topk: Optional[int] = None
+    measure_log: Optional[MeasurementLog] = None
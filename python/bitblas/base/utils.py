@@ -3,10 +3,10 @@
 
 import tvm
 import os
-from tvm.contrib.popen_pool import PopenPoolExecutor, StatusKind
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from tvm.contrib.popen_pool import PopenPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
-from typing import List, Tuple, Optional, Dict, Union, Literal
+from typing import Callable, List, Tuple, Optional, Dict, Union, Literal
 from tvm import tir, IRModule
 from tvm.runtime import Module
 from tvm.tir import Schedule
@@ -15,15 +15,45 @@ import bitblas
 from .analysis import get_root_block, get_reduction_blocks, find_var_from_func
 from bitblas.base.roller.arch import CUDA
 from bitblas.base.roller.policy import TensorCorePolicy, DefaultPolicy
+from bitblas.base.roller.hint import Hint
+from bitblas.base.roller.cost_model import RooflineCostModel
+from bitblas.base.build_pool import get_build_pool
+from bitblas.base.measure import MeasurementPolicy
+from bitblas.base.journal import TuningJournal
+from bitblas.base.tuning_options import TuningOptions
+from bitblas.base.policy_cache import emit_config_cached
+from bitblas.base.dispatch import (
+    DEFAULT_MAX_TUNED_POINTS,
+    get_dispatch_table,
+    get_dispatch_tree,
+    select_grid_points,
+)
+from bitblas.base.compile_cache import (
+    get_compile_cache_dir,
+    get_compile_cache_max_bytes,
+    get_compile_key,
+    lookup_compiled,
+    store_compiled,
+)
 from bitblas.gpu.matmul_analysis import get_tensorized_func_and_tags
+import copy
+import queue
+from dataclasses import replace
 import tempfile
-import itertools
+import threading
 from tvm.ir.supply import GlobalVarSupply
 from bitblas.utils import tensor_replace_dp4a, tensor_remove_make_int4
 import logging
 
 logger = logging.getLogger(__name__)
 
+# the number of configs emitted per requested candidate, leaving room for
+# configs that turn out to schedule into a duplicated module
+CANDIDATE_OVERSAMPLING = 2
+# with a cost model the configs are ranked before building, a wider pool of
+# configs gives it more to choose from
+COST_MODEL_OVERSAMPLING = 4
+
 
 def get_rasterization_code(pannel_width: int = 8) -> str:
     return f"""
@@ -53,11 +83,25 @@ class CompileResult:
         self.latency = 1e9
         self.profile_tensors = []
         self.time_evaluator = None
+        # with a measurement policy, the device to measure on and the latency statistics
+        self.measurement: Optional[MeasurementPolicy] = None
+        self.device = None
+        self.stats: Optional[Dict] = None
 
     def profile(self):
         profile_tensors = self.profile_tensors
+        if self.measurement is not None:
+            self.stats = self.measurement.measure(self.mod, self.device, profile_tensors)
+            return self.stats["latency"]
         return self.time_evaluator(*profile_tensors).mean * 1e3
 
+    def serialize(self) -> Dict:
+        """The tuned schedule hint, its latency (in ms) and its latency statistics."""
+        record = {"hint": self.config.serialize(), "latency": float(self.latency)}
+        if self.stats is not None:
+            record["stats"] = self.stats
+        return record
+
 
 def _apply_config(
         func: tir.PrimFunc,
@@ -163,19 +207,68 @@ def get_dummy_input_arrays(
     return profile_tensors
 
 
-def apply_and_build_parallel(func,
-                             configs,
-                             arch,
-                             num_repeats=3,
-                             max_workers=10,
-                             data_distribution="uniform") -> CompileResult:
+def apply_and_build_parallel(
+    func,
+    configs,
+    arch,
+    num_repeats=3,
+    max_workers=10,
+    data_distribution="uniform",
+    options: Optional[TuningOptions] = None,
+    max_candidates: Optional[int] = None,
+    on_measured: Optional[Callable[[CompileResult], None]] = None,
+) -> CompileResult:
+    """
+    Apply the configs, build them in a process pool and profile the results.
+
+    Configs which schedule into a module already seen (same structural hash
+    and pass context) are not built again. With ``max_candidates`` only the
+    first ``max_candidates`` distinct modules, in config order, are built.
+    Modules found in the compile cache (see ``bitblas.base.compile_cache``)
+    are not built at all.
+
+    The three stages are pipelined per candidate: a candidate is submitted
+    for building as soon as its schedule is applied and profiled as soon as
+    its build completes, so building on the CPU overlaps with measuring on
+    the GPU. Candidates are profiled one at a time.
+
+    The ``builder``, ``budget``, ``measurement`` and ``cost_model`` of the
+    ``options`` (see ``bitblas.base.tuning_options``) apply, the others are
+    handled by ``fast_tune``.
+
+    Builds go to the ``builder`` pool, or to the process-wide build pool (see
+    ``bitblas.base.build_pool``). With ``max_workers`` set to 1 a private
+    single worker pool is used instead, which keeps the builds serial.
+
+    A ``budget`` (see ``bitblas.base.budget``) stops the run early: pending
+    builds are cancelled and the best result measured so far is returned.
+    Candidates not expected to improve on the best one are not measured.
+
+    Without a device (tuning from a device profile), the candidates are built
+    but not measured. Their latency is predicted by the ``cost_model`` if
+    given (see ``bitblas.base.roller.cost_model``) and the best predicted one
+    is returned, otherwise no best result is returned.
+
+    Candidates are timed with the mean of ``num_repeats`` runs, or with the
+    ``measurement`` policy (see ``bitblas.base.measure``), which also
+    re-measures the best candidates head to head before picking one.
+    ``on_measured`` is called with every candidate once measured.
+    """
+    options = options or TuningOptions()
+    builder, budget = options.builder, options.budget
+    measurement, cost_model = options.measurement, options.cost_model
     cpresults = []
-
-    profile_tensors = get_dummy_input_arrays(func, arch.device, distribution=data_distribution)
-    max_workers = min(len(configs), os.cpu_count(), max_workers)
-
-    # apply config in thread parallel
-    _sched: List[Schedule] = []
+    if budget is not None:
+        budget.start()
+
+    # with an offline device profile (see ``bitblas.base.roller.arch``) the
+    # candidates are only built, filling the compile cache for a later
+    # measurement on a machine with the device
+    measurable = arch.device.exist
+    if not measurable:
+        logger.info("No device to measure on, the candidates are built but not measured")
+    profile_tensors = get_dummy_input_arrays(
+        func, arch.device, distribution=data_distribution) if measurable else []
 
     def _apply_schedule(f, c):
         try:
@@ -185,16 +278,19 @@ def apply_and_build_parallel(func,
             sch = None
         return sch
 
-    with ThreadPoolExecutor(max_workers=4) as scheduler:
-        futures = {scheduler.submit(_apply_schedule, func, config) for config in configs}
-        for future in as_completed(futures):
-            _sched.append(future.result())
+    owns_builder = builder is None and max_workers <= 1
+    if owns_builder:
+        builder = PopenPoolExecutor(max_workers=1)
+    elif builder is None:
+        builder = get_build_pool()
 
-    builder = PopenPoolExecutor(max_workers=max_workers)
+    # read here, the builds run in other processes
+    compile_cache_dir = get_compile_cache_dir()
+    compile_cache_max_bytes = get_compile_cache_max_bytes()
 
     # build in process parallel
     def _build(context) -> str:
-        idx, mod, arch = context
+        idx, mod, arch, compile_key = context
         if mod is None:
             return idx, None, None
         # TODO(lei):
@@ -215,55 +311,192 @@ def apply_and_build_parallel(func,
         artifact_path = os.path.join(tempfile.mkdtemp(), "tvm_tmp_mod." + tar.output_format)
         code = rt_mod.imported_modules[0].get_source()
         rt_mod.export_library(artifact_path, fcompile=tar)
+        if compile_key is not None:
+            artifact_path = store_compiled(compile_cache_dir, compile_key, code, artifact_path,
+                                           compile_cache_max_bytes)
         return idx, code, artifact_path
 
-    _mods = [sch.mod if sch is not None else None for sch in _sched]
-
-    for map_result in builder.map_with_error_catching(
-            _build,
-        [(i, mod, arch) for i, mod in enumerate(_mods)],
-    ):
-        if map_result.status == StatusKind.TIMEOUT:
-            logger.debug("LocalBuilder: Timeout")
-        elif map_result.status == StatusKind.EXCEPTION:
-            # TODO(lei): redirect the exception to file if needed
-            logger.debug("LocalBuilder: An exception occurred {}".format(map_result.value))
-            continue
-        elif map_result.status == StatusKind.COMPLETE:
-            idx, code, artifact_path = map_result.value
+    # every candidate posts exactly one (idx, build future) item, the build
+    # future is None when the candidate is not built.
+    built: "queue.Queue" = queue.Queue()
+    _sched: List[Optional[Schedule]] = [None] * len(configs)
+    if max_candidates is None:
+        max_candidates = len(configs)
+
+    # schedules complete in any order, but are released for building in
+    # config order so that the budget goes to the highest priority configs.
+    release_lock = threading.Lock()
+    scheduled: Dict[int, Optional[Schedule]] = {}
+    seen_modules = set()
+    release_state = {"next": 0, "submitted": 0}
+    in_flight: Dict[int, Future] = {}
+    stopped = threading.Event()
+
+    def _stop(reason: str):
+        if stopped.is_set():
+            return
+        logger.info(f"Stop tuning early: {reason}")
+        stopped.set()
+        with release_lock:
+            for future in in_flight.values():
+                future.cancel()
+
+    def _submit(idx, sch):
+        try:
+            _submit_candidate(idx, sch)
+        except Exception as submit_error:  # pylint: disable=broad-except
+            # the profiling loop waits for an item of every candidate
+            logger.debug("Failed to submit config {}: {}".format(idx, submit_error))
+            built.put((idx, None))
+
+    def _submit_candidate(idx, sch):
+        pass_context = {"tir.use_async_copy": True, **configs[idx].pass_context}
+        key = get_compile_key(sch.mod, arch.target, pass_context)
+        if key in seen_modules:
+            logger.debug("Skip config {} which duplicates a scheduled module".format(idx))
+            built.put((idx, None))
+            return
+        seen_modules.add(key)
+        cached = lookup_compiled(compile_cache_dir, key) if compile_cache_dir else None
+        if cached is not None:
+            release_state["submitted"] += 1
+            future = Future()
+            future.set_result((idx, *cached))
+            built.put((idx, future))
+            return
+        # the first build of a call is always granted, an exhausted budget
+        # still yields a result
+        if budget is not None and not budget.reserve_build(force=release_state["submitted"] == 0):
+            built.put((idx, None))
+            return
+        compile_key = key if compile_cache_dir else None
+        future = builder.submit(_build, (idx, sch.mod, arch, compile_key))
+        release_state["submitted"] += 1
+        in_flight[idx] = future
+        future.add_done_callback(lambda f: built.put((idx, f)))
+
+    def _release():
+        # must be called with the release lock held
+        while release_state["next"] in scheduled:
+            idx = release_state["next"]
+            release_state["next"] += 1
+            sch = scheduled.pop(idx)
+            if sch is None or release_state["submitted"] >= max_candidates or stopped.is_set():
+                built.put((idx, None))
+            else:
+                _submit(idx, sch)
+
+    def _schedule_and_submit(idx):
+        with release_lock:
+            budget_spent = release_state["submitted"] >= max_candidates or stopped.is_set()
+        # no need to schedule once enough distinct candidates are building
+        sch = None if budget_spent else _apply_schedule(func, configs[idx])
+        _sched[idx] = sch
+        with release_lock:
+            scheduled[idx] = sch
+            _release()
+
+    def _profile(cpresult: CompileResult):
+        config = cpresult.config
+        try:
+            latency = cpresult.profile()
+        except Exception as e_mesg:
+            logger.debug(f"Evaluation with config failed {e_mesg}")
+            return
+        logger.info("Evaluation with config {}".format(config))
+        logger.info("Time cost of this config: {:.3f} ms".format(latency))
+        cpresult.latency = latency
+
+    with ThreadPoolExecutor(max_workers=4) as scheduler:
+        for idx in range(len(configs)):
+            scheduler.submit(_schedule_and_submit, idx)
+
+        # the most favourable measured latency per unit of roller priority
+        latency_per_priority = None
+        best_latency = None
+        # profile on this thread while the remaining candidates are scheduled and built
+        for _ in range(len(configs)):
+            idx, future = built.get()
+            with release_lock:
+                in_flight.pop(idx, None)
+            if future is None or future.cancelled():
+                continue
+            if budget is not None and best_latency is not None:
+                if budget.time_exhausted():
+                    _stop("the tuning deadline has passed")
+                    continue
+                # builds complete out of order and priorities are not monotonic
+                # in config order, only this candidate is known to be hopeless
+                if not budget.is_promising(
+                        getattr(configs[idx], "priority", None), latency_per_priority,
+                        best_latency):
+                    logger.debug("Skip config {} which is not expected to improve".format(idx))
+                    continue
+            try:
+                _, code, artifact_path = future.result()
+            except TimeoutError:
+                logger.debug("LocalBuilder: Timeout")
+                continue
+            except Exception as build_error:  # pylint: disable=broad-except
+                # TODO(lei): redirect the exception to file if needed
+                logger.debug("LocalBuilder: An exception occurred {}".format(build_error))
+                continue
             if artifact_path is None:
                 logger.debug("Artifact path is None")
                 continue
-            sch = _sched[idx]
-            config = configs[idx]
             rt_mod = tvm.runtime.load_module(artifact_path)
-            cpresult = CompileResult(config, sch, rt_mod)
-            timer_cuda_mod = rt_mod.time_evaluator(
-                rt_mod.entry_name, arch.device, number=num_repeats)
+            cpresult = CompileResult(configs[idx], _sched[idx], rt_mod)
             cpresult.profile_tensors = profile_tensors
-            cpresult.time_evaluator = timer_cuda_mod
+            cpresult.time_evaluator = rt_mod.time_evaluator(
+                rt_mod.entry_name, arch.device, number=num_repeats)
             cpresult.code = code
-            cpresults.append(cpresult)
-        else:
-            raise ValueError(f"Unreachable: unexpected result: {map_result}")
-
-    del builder
+            cpresult.measurement = measurement
+            cpresult.device = arch.device
+            if not measurable:
+                if cost_model is not None:
+                    cpresult.latency = cost_model.predict([configs[idx]])[0]
+                    cpresult.stats = {"predicted": True}
+                cpresults.append((idx, cpresult))
+                continue
+            _profile(cpresult)
+            cpresults.append((idx, cpresult))
+            if on_measured is not None:
+                on_measured(cpresult)
+            if cpresult.latency < 1e9:
+                best_latency = min(best_latency or cpresult.latency, cpresult.latency)
+                priority = getattr(configs[idx], "priority", None)
+                if priority:
+                    ratio = cpresult.latency / priority
+                    latency_per_priority = min(latency_per_priority or ratio, ratio)
+
+    if owns_builder:
+        del builder
+
+    # report in the order of the configs, independent of the completion order
+    cpresults = [cpresult for _, cpresult in sorted(cpresults, key=lambda item: item[0])]
+    candidates = cpresults
+    if measurable and measurement is not None and measurement.final_topk > 1 and not (
+            budget is not None and budget.time_exhausted()):
+        finalists = sorted((cpresult for cpresult in cpresults if cpresult.latency < 1e9),
+                           key=lambda cpresult: cpresult.latency)[:measurement.final_topk]
+        if len(finalists) > 1:
+            try:
+                final_stats = measurement.head_to_head([cpresult.mod for cpresult in finalists],
+                                                       arch.device, profile_tensors)
+            except Exception as measure_error:  # pylint: disable=broad-except
+                logger.debug("Head to head measurement failed: {}".format(measure_error))
+            else:
+                for cpresult, stats in zip(finalists, final_stats):
+                    cpresult.stats = {**(cpresult.stats or {}), "final": stats}
+                    cpresult.latency = stats["latency"]
+                # the finalists were measured in the same conditions, pick among them
+                candidates = finalists
 
     best = None
     best_latency = 1e9
-    for cpresult in cpresults:
-        config = cpresult.config
-        try:
-            latency = cpresult.profile()
-        except Exception as e_mesg:
-            logger.debug(f"Evaluation with config failed {e_mesg}")
-            continue
-        logger.info("Evaluation with config {}".format(config))
-        logger.info("Time cost of this config: {:.3f} ms".format(latency))
-
-        cpresult.latency = latency
-        if latency < best_latency:
-            best_latency = latency
+    for cpresult in candidates:
+        if cpresult.latency < best_latency:
+            best_latency = cpresult.latency
             best = cpresult
 
     return cpresults, best
@@ -275,10 +508,44 @@ def apply_and_build(
     arch,
     parallel_build=False,
     data_distribution="uniform",
+    options: Optional[TuningOptions] = None,
+    max_candidates: Optional[int] = None,
+    on_measured: Optional[Callable[[CompileResult], None]] = None,
 ) -> Tuple[List[CompileResult], CompileResult]:
     max_workers = 10 if parallel_build else 1
     return apply_and_build_parallel(
-        func, configs, arch, max_workers=max_workers, data_distribution=data_distribution)
+        func,
+        configs,
+        arch,
+        max_workers=max_workers,
+        data_distribution=data_distribution,
+        options=options,
+        max_candidates=max_candidates,
+        on_measured=on_measured)
+
+
+def _restore_compile_result(func: tir.PrimFunc, record: Dict, arch) -> Optional[CompileResult]:
+    # the schedule of a recorded winner, without a runtime module
+    hint = Hint().deserialize(record["hint"], arch)
+    try:
+        sch = _apply_config(func, hint)
+    except Exception as apply_error:  # pylint: disable=broad-except
+        logger.debug("Failed to restore the recorded config: {}".format(apply_error))
+        return None
+    if sch is None:
+        return None
+    cpresult = CompileResult(hint, sch, None)
+    cpresult.latency = record["latency"]
+    cpresult.stats = record.get("stats")
+    return cpresult
+
+
+def _specialize_seed_hint(hint: Hint, arch, opt_shapes: Dict[str, int]) -> Hint:
+    # the seed may come from another shape, record the point it is tuned for
+    seed = copy.copy(hint)
+    seed.arch = arch
+    seed.opt_shapes = dict(opt_shapes)
+    return seed
 
 
 def fast_tune(
@@ -287,7 +554,31 @@ def fast_tune(
     topk: int = 10,
     parallel_build: bool = True,
     data_distribution: Literal["uniform", "onefill"] = "uniform",
+    options: Optional[TuningOptions] = None,
 ):
+    """
+    Tune the function with the ``topk`` best configs emitted by the roller
+    policy which schedule into distinct modules. The emitted configs are
+    cached on disk (see ``bitblas.base.policy_cache``), an identical function
+    on the same device skips the policy. The search is set by the
+    ``options`` (see ``bitblas.base.tuning_options``).
+
+    ``seed_hints`` (e.g. the schedule of a similar, already tuned shape) are
+    evaluated first, in addition to the emitted configs. A ``budget`` bounds
+    the time and the number of builds spent, a ``measurement`` policy sets
+    how candidates are timed.
+
+    With a ``journal`` (see ``bitblas.base.journal``) the measured candidates
+    and the winner are recorded as they finish, and a function already tuned
+    in the journal is restored from its winner without tuning.
+
+    A ``cost_model`` (see ``bitblas.base.roller.cost_model``) re-ranks the
+    emitted configs by predicted latency, and only the ``measure_topk``
+    (``topk`` by default) most promising ones are measured. Without a device
+    the roofline model is used and the schedule is picked by prediction.
+    The measured candidates update the cost model, and are appended to the
+    ``measure_log`` (see ``bitblas.base.measure_log``) to train later ones.
+    """
     # check the function is a primfunc
     if not isinstance(func, tir.PrimFunc):
         raise ValueError("Only support func is PrimFunc")  # pragma: no cover
@@ -303,10 +594,6 @@ def fast_tune(
         if not all([isinstance(v.value, int) for v in opt_shapes.values()]):
             logger.error("The opt_shapes should be int value")
             return None, None
-        # currently only support one dynamic range
-        if len(opt_shapes) > 1:
-            logger.error("Currently only support one dynamic range")
-            return None, None
 
         for buffer in func.buffer_map.values():
             for axis in buffer.shape:
@@ -314,35 +601,93 @@ def fast_tune(
                     raise NotImplementedError(
                         "Currently do not support fast tune with none-dynamic range set")
         if opt_shapes:
+            # specialize all the dynamic symbolics at once
+            var_map = {}
             for name, shape in opt_shapes.items():
                 var = find_var_from_func(func, name)
-                specilized_func = func.specialize({
-                    var: shape.astype(var.dtype)
-                }).with_attr("is_specialized")
+                var_map[var] = shape.astype(var.dtype)
+            specilized_func = func.specialize(var_map).with_attr("is_specialized")
 
     arch = CUDA(target)
+    options = options or TuningOptions()
+    seed_hints, journal, measure_log = options.seed_hints, options.journal, options.measure_log
+    cost_model, measure_topk = options.cost_model, options.measure_topk
 
-    policy = DefaultPolicy(func=func, arch=arch)
+    point = {}
+    if func.attrs is not None and "opt_shapes" in func.attrs:
+        point = {str(k): int(v) for k, v in func.attrs["opt_shapes"].items()}
+    journal_key = None
+    if journal is not None or measure_log is not None:
+        journal_key = TuningJournal.get_func_key(func, target)
+    if journal is not None:
+        record = journal.lookup_best(journal_key, point)
+        if record is not None:
+            best = _restore_compile_result(func, record, arch)
+            if best is not None:
+                logger.info(f"Restored the tuned config of {point or 'the function'} from "
+                            f"{journal.path}")
+                return [best], best
+
+    policy_cls, policy_func = DefaultPolicy, func
     try:
         specilized_func, tags = get_tensorized_func_and_tags(specilized_func, arch.target)
     except Exception as e_msg:
         logger.debug("Get tensorized func and tags failed: ", e_msg)
         tags = None
     if tags:
-        policy = TensorCorePolicy(func=specilized_func, arch=arch, tags=tags)
+        policy_cls, policy_func = TensorCorePolicy, specilized_func
+
+    if cost_model is None and not arch.device.exist:
+        # nothing to measure on, pick the schedule by its predicted latency
+        cost_model = RooflineCostModel(arch)
+    # configs often schedule into the same module, emit more of them so that
+    # topk distinct modules are left after deduplication
+    configs = emit_config_cached(
+        policy_cls,
+        policy_func,
+        arch,
+        topk * (CANDIDATE_OVERSAMPLING if cost_model is None else COST_MODEL_OVERSAMPLING),
+        tags=tags or None)
+
+    if cost_model is not None:
+        predictions = cost_model.predict(configs)
+        for config, prediction in zip(configs, predictions):
+            # the budget extrapolates latencies from priorities, a predicted
+            # latency is a finer priority than the roller score
+            config.priority = prediction
+        configs = [config for _, config in sorted(zip(predictions, configs), key=lambda x: x[0])]
 
-    configs = policy.emit_config(topk)
+    if seed_hints:
+        configs = [_specialize_seed_hint(hint, arch, point) for hint in seed_hints] + configs
 
     if len(configs) == 0:
         raise ValueError("No valid config generated")
 
+    def _on_measured(cpresult: CompileResult):
+        if journal is not None:
+            journal.record_candidate(journal_key, point, cpresult.serialize())
+        if measure_log is not None:
+            measure_log.record(target.arch, journal_key, point, cpresult.serialize())
+
     cpresults, best = apply_and_build(
         func,
         configs,
         arch,
         parallel_build=parallel_build,
         data_distribution=data_distribution,
+        options=replace(options, cost_model=cost_model),
+        max_candidates=(topk if measure_topk is None else measure_topk) + len(seed_hints or []),
+        on_measured=_on_measured,
     )
+    if cost_model is not None:
+        measured = [
+            cpresult for cpresult in cpresults
+            if cpresult.latency < 1e9 and not (cpresult.stats or {}).get("predicted")
+        ]
+        cost_model.update([cpresult.config for cpresult in measured],
+                          [cpresult.latency for cpresult in measured])
+    if journal is not None and best is not None:
+        journal.record_best(journal_key, point, best.serialize())
 
     return cpresults, best
 
@@ -410,29 +755,35 @@ def create_dispatch_func(g_var: str, func: tir.PrimFunc, refactored_funcs: List[
         _invoke_params.append(buffer.data)
     _invoke_params += list(dyn_symbolic)
 
-    func_range: List[int] = []
-    global_symbols = []
-    for g_var, refactor_func in refactored_funcs:
-        opt_shapes = refactor_func.attrs["opt_shapes"]
-        func_range.append(list(opt_shapes.values())[0])
-        global_symbols.append(g_var)
-
-    # TODO(lei): general the dispatch function to support multiple dynamic symbolics
-    assert len(dyn_symbolic) == 1, "Only support one dynamic symbolics currently"
+    # the list valued opt_shapes of the original function span the grid,
+    # points which were not tuned run the kernel of their nearest tuned point
+    grid = attrs["opt_shapes"] if attrs is not None and "opt_shapes" in attrs else None
+    axes, table = get_dispatch_table(
+        [var.name for var in dyn_symbolic],
+        [(g_var, refactor_func.attrs["opt_shapes"]) for g_var, refactor_func in refactored_funcs],
+        grid,
+    )
 
     ib = tvm.tir.ir_builder.create()
-    syb = list(dyn_symbolic)[-1]
-    last_range = 0
-    for i, (_range, g_var) in enumerate(zip(func_range, global_symbols)):
-        if i == 0:
-            with ib.if_scope(syb <= _range):
-                ib.emit(tvm.tir.Call(None, g_var, _invoke_params))
-        else:
-            with ib.if_scope(tvm.tir.all(syb > last_range, syb <= _range)):
-                ib.emit(tvm.tir.Call(None, g_var, _invoke_params))
-        last_range = _range
-    with ib.if_scope(syb > last_range):
-        ib.emit(tvm.tir.Call(None, g_var, _invoke_params))
+
+    def _emit_dispatch(depth: int, point: Tuple[int, ...]):
+        # one binary search per dynamic symbolic, nested in the order of the params
+        if depth == len(dyn_symbolic):
+            ib.emit(tvm.tir.Call(None, table[point], _invoke_params))
+            return
+        _emit_search(depth, point, get_dispatch_tree(axes[depth]))
+
+    def _emit_search(depth: int, point: Tuple[int, ...], tree):
+        if isinstance(tree, int):
+            _emit_dispatch(depth + 1, point + (axes[depth][tree],))
+            return
+        bound, lhs, rhs = tree
+        with ib.if_scope(dyn_symbolic[depth] <= bound):
+            _emit_search(depth, point, lhs)
+        with ib.else_scope():
+            _emit_search(depth, point, rhs)
+
+    _emit_dispatch(0, ())
     stmt = ib.get()
     dispatch_func = tvm.tir.PrimFunc(params, stmt, ret_type, buffer_map, attrs).with_attrs({
         "tir.is_global_func": True,
@@ -458,21 +809,34 @@ def create_dispatch_mod(g_var: str, original_func: tir.PrimFunc,
     return dispatch_mod
 
 
-def fast_tune_with_dynamic_range(
+def tune_dynamic_range_buckets(
     func: tir.PrimFunc,
     target: tvm.target.Target,
     topk: int = 10,
     parallel_build: bool = True,
-    global_symbol: Optional[str] = None,
     dynamic_range: Optional[Dict[str, List[int]]] = None,
-) -> IRModule:
+    options: Optional[TuningOptions] = None,
+    max_tuned_points: Optional[int] = DEFAULT_MAX_TUNED_POINTS,
+) -> Tuple[Optional[tir.PrimFunc], Optional[List[CompileResult]]]:
+    """
+    Tune the function over the Cartesian product of the dynamic range of its
+    dynamic symbolics.
+
+    At most ``max_tuned_points`` points of the grid are tuned (all of them if
+    ``None``), spread over the grid in log space. The dispatcher built by
+    ``create_dispatch_mod`` runs the kernel of the nearest tuned point for
+    the others. The ``options`` apply to every point, see ``fast_tune``: the
+    ``budget`` is shared by all the points, and the points already tuned in
+    the ``journal`` are restored from it.
+
+    Returns the function annotated with its ``opt_shapes`` and the best
+    compile result of each tuned point, or ``(None, None)`` if tuning failed.
+    """
     if dynamic_range is None:
         dynamic_range = {}
     if target.kind.name != "cuda":
         logger.error("Only support CUDA target")
-        return None
-    if not global_symbol:
-        global_symbol = func.attrs["global_symbol"]
+        return None, None
 
     # set opt_shapes for the primfunc with dynamic symbolic
     opt_shapes: Dict[str, List[int]] = {}
@@ -488,28 +852,85 @@ def fast_tune_with_dynamic_range(
     if "opt_shapes" not in func.attrs:
         logger.error(
             "[BitBLAS] The primfunc has no opt_shapes, please set opt_shapes for the primfunc")
-        return None
+        return None, None
     else:
         # should be list value
         if not all([isinstance(v, tvm.ir.Array) for v in func.attrs["opt_shapes"].values()]):
             logger.error("The opt_shapes should be list value")
-            return None
+            return None, None
 
     logger.info("Start fast tuning with dynamic range")
     opt_shapes = func.attrs["opt_shapes"]
 
-    # Step 1.Calculate the Cartesian product using itertools.product
-    product_list = list(itertools.product(*(opt_shapes[key] for key in opt_shapes)))
-
-    # Convert the Cartesian product to a list of dictionaries
-    specialize_items: List[Dict] = [dict(zip(opt_shapes.keys(), values)) for values in product_list]
+    # Step 1. Select the points of the Cartesian product to tune
+    specialize_items: List[Dict] = select_grid_points(
+        {str(key): [int(v) for v in opt_shapes[key]] for key in opt_shapes}, max_tuned_points)
+    logger.info(f"Tuning {len(specialize_items)} points of the dynamic range")
 
-    specilized_tuned_funcs: List[tir.PrimFunc] = []
+    best_results: List[CompileResult] = []
     for item in specialize_items:
-        func = func.with_attr("opt_shapes", item)
-        _, best = fast_tune(func, target, topk, parallel_build)
+        _, best = fast_tune(
+            func.with_attr("opt_shapes", item), target, topk, parallel_build, options=options)
         if best is None:
-            return None
-        specilized_tuned_funcs.append(best.sch.mod["main"])
+            return None, None
+        best_results.append(best)
+
+    return func, best_results
 
+
+def fast_tune_with_dynamic_range(
+    func: tir.PrimFunc,
+    target: tvm.target.Target,
+    topk: int = 10,
+    parallel_build: bool = True,
+    global_symbol: Optional[str] = None,
+    dynamic_range: Optional[Dict[str, List[int]]] = None,
+    options: Optional[TuningOptions] = None,
+    max_tuned_points: Optional[int] = DEFAULT_MAX_TUNED_POINTS,
+) -> IRModule:
+    if not global_symbol:
+        global_symbol = func.attrs["global_symbol"]
+    func, best_results = tune_dynamic_range_buckets(
+        func,
+        target,
+        topk,
+        parallel_build,
+        dynamic_range,
+        options,
+        max_tuned_points=max_tuned_points)
+    if best_results is None:
+        return None
+
+    specilized_tuned_funcs: List[tir.PrimFunc] = [best.sch.mod["main"] for best in best_results]
     return create_dispatch_mod(global_symbol, func, specilized_tuned_funcs)
+
+
+def apply_tuned_hints(
+    func: tir.PrimFunc,
+    hints: List[Hint],
+    global_symbol: Optional[str] = None,
+) -> Optional[IRModule]:
+    """
+    Re-apply previously tuned hints without any profiling.
+
+    A function without dynamic symbolic takes a single hint. Otherwise
+    ``func`` must carry the list valued ``opt_shapes`` of its dynamic range
+    and each hint is applied to the point given by its own ``opt_shapes``,
+    in the order they were tuned.
+    """
+    if func.attrs is None or "opt_shapes" not in func.attrs:
+        if len(hints) != 1:
+            raise ValueError("A static function expects exactly one hint")
+        sch = _apply_config(func, hints[0])
+        return sch.mod if sch is not None else None
+
+    if not global_symbol:
+        global_symbol = func.attrs["global_symbol"]
+    specialized_funcs: List[tir.PrimFunc] = []
+    for hint in hints:
+        sch = _apply_config(func.with_attr("opt_shapes", hint.opt_shapes), hint)
+        if sch is None:
+            logger.debug("Failed to apply hint {}".format(hint))
+            return None
+        specialized_funcs.append(sch.mod["main"])
+    return create_dispatch_mod(global_symbol, func, specialized_funcs)
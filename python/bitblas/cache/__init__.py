@@ -7,3 +7,13 @@ from .operator import (
     get_database_path,  # noqa: F401
     set_database_path,  # noqa: F401
 )
+from .database import (
+    OperatorDatabase,  # noqa: F401
+    DirectoryDatabase,  # noqa: F401
+    SQLiteDatabase,  # noqa: F401
+    open_database,  # noqa: F401
+    list_database_archs,  # noqa: F401
+)
+from .manifest import get_manifest, check_manifest  # noqa: F401
+from .stats import CacheStats  # noqa: F401
+from .pretune import pretune, get_model_matmul_configs  # noqa: F401
@@ -0,0 +1,488 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Storage backends of the BitBLAS operator database"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, suppress
+import fcntl
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+from hashlib import sha256
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+BITBLAS_DATABASE_INDEX = "index.json"
+SQLITE_DATABASE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+# staging files older than this are left over by crashed writers
+STALE_STAGING_SECONDS = 3600
+
+
+class OperatorDatabase(ABC):
+    """
+    Storage of tuned operators for a single architecture.
+
+    A record is a json serializable dict holding at least ``config_type``,
+    ``operator_type`` and ``config``. Artifacts are files (compiled module,
+    sources, wrapper library) stored alongside the record.
+    """
+
+    def __init__(self, database_path: str, arch_str: str):
+        self.database_path = database_path
+        self.arch_str = arch_str
+
+    @abstractmethod
+    def entries(self) -> Dict[str, Dict]:
+        """Return the records of all operators, keyed by config hash."""
+        pass
+
+    @abstractmethod
+    def lookup(self, hash_str: str) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    def load_artifacts(self, hash_str: str) -> Dict[str, str]:
+        """Return the local file path of each artifact of an operator."""
+        pass
+
+    @abstractmethod
+    def save(self, hash_str: str, record: Dict, artifact_dir: str, overwrite: bool = False):
+        """
+        Store the record and every file of ``artifact_dir`` as artifacts.
+
+        An existing entry is kept unless ``overwrite`` is set, in which case
+        it is replaced as a whole.
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, hash_strs: Iterable[str]):
+        """Delete the records and artifacts of the given operators."""
+        pass
+
+    @abstractmethod
+    def compact(self):
+        """Reclaim storage that is no longer referenced by any record."""
+        pass
+
+    @abstractmethod
+    def size_in_bytes(self) -> int:
+        pass
+
+    def contains(self, hash_str: str) -> bool:
+        return self.lookup(hash_str) is not None
+
+
+def _directory_size_in_bytes(path: str) -> int:
+    nbytes = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            # the file may be removed concurrently
+            with suppress(OSError):
+                nbytes += os.path.getsize(os.path.join(root, file))
+    return nbytes
+
+
+class DirectoryDatabase(OperatorDatabase):
+    """
+    One directory per config hash under ``<database_path>/<arch_str>``,
+    described by an ``index.json`` so that lookups do not touch the entries.
+
+    Entries are written into a hidden staging directory and published with
+    an atomic rename while holding an advisory lock on the arch directory,
+    so concurrent processes never observe a partially written entry.
+    """
+
+    LOCK_FILE = ".lock"
+    STAGING_PREFIX = "."
+
+    def __init__(self, database_path: str, arch_str: str):
+        super().__init__(database_path, arch_str)
+        self.arch_path = os.path.join(database_path, arch_str)
+        self._index: Optional[Dict[str, Dict]] = None
+
+    def entries(self) -> Dict[str, Dict]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def lookup(self, hash_str: str) -> Optional[Dict]:
+        record = self.entries().get(hash_str)
+        if record is not None and not os.path.isdir(os.path.join(self.arch_path, hash_str)):
+            logger.debug(f"Indexed operator {hash_str} is missing from {self.arch_path}")
+            del self._index[hash_str]
+            return None
+        return record
+
+    def load_artifacts(self, hash_str: str) -> Dict[str, str]:
+        config_path = os.path.join(self.arch_path, hash_str)
+        return {file: os.path.join(config_path, file) for file in os.listdir(config_path)}
+
+    def save(self, hash_str: str, record: Dict, artifact_dir: str, overwrite: bool = False):
+        config_path = os.path.join(self.arch_path, hash_str)
+        # if the config already exists, skip saving
+        if os.path.exists(config_path) and not overwrite:
+            return
+        os.makedirs(self.arch_path, exist_ok=True)
+        self._write_mapping(record, artifact_dir)
+        # stage on the same file system so that publishing is a rename
+        staging_path = tempfile.mkdtemp(
+            prefix=f"{self.STAGING_PREFIX}{hash_str}.", dir=self.arch_path)
+        retired_path = None
+        try:
+            shutil.copytree(artifact_dir, staging_path, dirs_exist_ok=True)
+            with self._lock():
+                if os.path.exists(config_path) and overwrite:
+                    # move the old entry out of the way, it is deleted after publishing
+                    retired_path = tempfile.mkdtemp(
+                        prefix=f"{self.STAGING_PREFIX}{hash_str}.", dir=self.arch_path)
+                    os.rename(config_path, os.path.join(retired_path, hash_str))
+                # another process may have published the same entry meanwhile
+                if not os.path.exists(config_path):
+                    os.rename(staging_path, config_path)
+                    self._update_index({hash_str: record})
+        finally:
+            for path in (staging_path, retired_path):
+                if path is not None and os.path.exists(path):
+                    shutil.rmtree(path, ignore_errors=True)
+        if self._index is not None:
+            self._index[hash_str] = record
+
+    def remove(self, hash_strs: Iterable[str]):
+        hash_strs = list(hash_strs)
+        if not hash_strs or not os.path.isdir(self.arch_path):
+            return
+        retired_path = tempfile.mkdtemp(prefix=self.STAGING_PREFIX, dir=self.arch_path)
+        try:
+            with self._lock():
+                for hash_str in hash_strs:
+                    config_path = os.path.join(self.arch_path, hash_str)
+                    if os.path.exists(config_path):
+                        os.rename(config_path, os.path.join(retired_path, hash_str))
+                self._update_index({}, removed=hash_strs)
+        finally:
+            shutil.rmtree(retired_path, ignore_errors=True)
+        if self._index is not None:
+            for hash_str in hash_strs:
+                self._index.pop(hash_str, None)
+
+    def compact(self):
+        if not os.path.isdir(self.arch_path):
+            return
+        now = time.time()
+        with self._lock():
+            index = self._read_index()
+            for name in os.listdir(self.arch_path):
+                path = os.path.join(self.arch_path, name)
+                if name in (self.LOCK_FILE, BITBLAS_DATABASE_INDEX) or name in index:
+                    continue
+                if name.startswith(self.STAGING_PREFIX):
+                    # in-flight writes are recent, only drop abandoned ones
+                    try:
+                        if now - os.path.getmtime(path) < STALE_STAGING_SECONDS:
+                            continue
+                    except OSError:
+                        continue
+                elif os.path.isdir(path) and self._read_record(path) is not None:
+                    continue
+                logger.debug(f"Removing unreferenced database file {path}")
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            # drop index entries whose directory has been removed
+            missing = [h for h in index if not os.path.isdir(os.path.join(self.arch_path, h))]
+            if missing:
+                self._update_index({}, removed=missing)
+        self._index = None
+
+    def size_in_bytes(self) -> int:
+        return _directory_size_in_bytes(self.arch_path)
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.arch_path, self.LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_mapping(self, record: Dict, artifact_dir: str):
+        # keep the per entry mapping files, the index can be rebuilt from them
+        config_type = record["config_type"]
+        with open(os.path.join(artifact_dir, f"{config_type}.json"), "w") as f:
+            json.dump(record["config"], f)
+        mapping = {k: v for k, v in record.items() if k != "config"}
+        with open(os.path.join(artifact_dir, "mapping.json"), "w") as f:
+            json.dump(mapping, f)
+
+    def _is_entry_directory(self, directory: str) -> bool:
+        # skip staging directories of in-flight writes
+        return not directory.startswith(self.STAGING_PREFIX) and os.path.isdir(
+            os.path.join(self.arch_path, directory))
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if not os.path.isdir(self.arch_path):
+            return {}
+        index = self._read_index()
+        # entries written without an index update (e.g. by an older release)
+        # are picked up from their mapping file and appended to the index.
+        missing = {}
+        for directory in os.listdir(self.arch_path):
+            if directory in index or not self._is_entry_directory(directory):
+                continue
+            record = self._read_record(os.path.join(self.arch_path, directory))
+            if record is not None:
+                missing[directory] = record
+        if missing:
+            index.update(missing)
+            with self._lock():
+                self._update_index(missing)
+        return index
+
+    def _read_record(self, config_path) -> Optional[Dict]:
+        mapping_path = os.path.join(config_path, "mapping.json")
+        if not os.path.exists(mapping_path):
+            return None
+        with open(mapping_path) as f:
+            mapping = json.load(f)
+        config_file = os.path.join(config_path, f"{mapping['config_type']}.json")
+        if not os.path.exists(config_file):
+            return None
+        with open(config_file) as f:
+            config = json.load(f)
+        return {**mapping, "config": config}
+
+    def _read_index(self) -> Dict[str, Dict]:
+        index_path = os.path.join(self.arch_path, BITBLAS_DATABASE_INDEX)
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path) as f:
+                return json.load(f)["entries"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read database index {index_path}, rebuilding: {e}")
+            return {}
+
+    def _update_index(self, records: Dict[str, Dict], removed: Iterable[str] = ()):
+        # must be called with the lock held, readers only ever see a complete
+        # index because it is replaced atomically.
+        index = self._read_index()
+        index.update(records)
+        for hash_str in removed:
+            index.pop(hash_str, None)
+        index_path = os.path.join(self.arch_path, BITBLAS_DATABASE_INDEX)
+        with tempfile.NamedTemporaryFile(
+                "w", dir=self.arch_path, prefix=self.STAGING_PREFIX, delete=False) as f:
+            json.dump({"entries": index}, f)
+        os.replace(f.name, index_path)
+
+
+class SQLiteDatabase(OperatorDatabase):
+    """
+    Single file database: records live in an indexed ``operators`` table and
+    artifacts are deduplicated blobs addressed by their sha256 digest.
+
+    Blobs are materialized once into a local directory keyed by digest, since
+    both TVM and ctypes need a file path to load a module.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS operators (
+        arch TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        operator_type TEXT NOT NULL,
+        config_type TEXT NOT NULL,
+        M TEXT,
+        N INTEGER,
+        K INTEGER,
+        A_dtype TEXT,
+        W_dtype TEXT,
+        out_dtype TEXT,
+        accum_dtype TEXT,
+        record TEXT NOT NULL,
+        PRIMARY KEY (arch, hash)
+    );
+    CREATE INDEX IF NOT EXISTS operators_shape
+        ON operators (arch, operator_type, A_dtype, W_dtype, N, K);
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        data BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS artifacts (
+        arch TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        name TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        PRIMARY KEY (arch, hash, name)
+    );
+    """
+
+    def __init__(self, database_path: str, arch_str: str, artifact_cache_dir: Optional[str] = None):
+        super().__init__(database_path, arch_str)
+        if artifact_cache_dir is None:
+            artifact_cache_dir = os.path.join(tempfile.gettempdir(),
+                                              f"bitblas-artifacts-{os.getuid()}")
+        self.artifact_cache_dir = artifact_cache_dir
+        parent = os.path.dirname(os.path.abspath(database_path))
+        os.makedirs(parent, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.database_path, timeout=60)
+        try:
+            # commit on success, rollback on error
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def entries(self) -> Dict[str, Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT hash, record FROM operators WHERE arch = ?",
+                                (self.arch_str,)).fetchall()
+        return {hash_str: json.loads(record) for hash_str, record in rows}
+
+    def lookup(self, hash_str: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM operators WHERE arch = ? AND hash = ?",
+                               (self.arch_str, hash_str)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_artifacts(self, hash_str: str) -> Dict[str, str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, digest FROM artifacts WHERE arch = ? AND hash = ?",
+                                (self.arch_str, hash_str)).fetchall()
+            artifacts = {}
+            for name, digest in rows:
+                artifacts[name] = self._materialize(conn, name, digest)
+        return artifacts
+
+    def _materialize(self, conn: sqlite3.Connection, name: str, digest: str) -> str:
+        # keep the file extension, tvm.runtime.load_module dispatches on it
+        path = os.path.join(self.artifact_cache_dir, digest + os.path.splitext(name)[1])
+        if os.path.exists(path):
+            return path
+        os.makedirs(self.artifact_cache_dir, exist_ok=True)
+        (data,) = conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        # other processes may materialize the same blob concurrently
+        with tempfile.NamedTemporaryFile(dir=self.artifact_cache_dir, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
+        return path
+
+    def save(self, hash_str: str, record: Dict, artifact_dir: str, overwrite: bool = False):
+        config = record["config"]
+        M = config.get("M")
+        with self._connect() as conn:
+            # take the write lock up front, concurrent writers are serialized
+            conn.execute("BEGIN IMMEDIATE")
+            exists = conn.execute("SELECT 1 FROM operators WHERE arch = ? AND hash = ?",
+                                  (self.arch_str, hash_str)).fetchone()
+            if exists:
+                if not overwrite:
+                    return
+                conn.execute("DELETE FROM operators WHERE arch = ? AND hash = ?",
+                             (self.arch_str, hash_str))
+                conn.execute("DELETE FROM artifacts WHERE arch = ? AND hash = ?",
+                             (self.arch_str, hash_str))
+            for name in sorted(os.listdir(artifact_dir)):
+                with open(os.path.join(artifact_dir, name), "rb") as f:
+                    data = f.read()
+                digest = sha256(data).hexdigest()
+                conn.execute("INSERT OR IGNORE INTO blobs (digest, data) VALUES (?, ?)",
+                             (digest, sqlite3.Binary(data)))
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (arch, hash, name, digest) VALUES (?, ?, ?, ?)",
+                    (self.arch_str, hash_str, name, digest))
+            conn.execute(
+                "INSERT INTO operators (arch, hash, operator_type, config_type, M, N, K, A_dtype,"
+                " W_dtype, out_dtype, accum_dtype, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.arch_str,
+                    hash_str,
+                    record["operator_type"],
+                    record["config_type"],
+                    json.dumps(M),
+                    config.get("N"),
+                    config.get("K"),
+                    config.get("A_dtype", config.get("in_dtype")),
+                    config.get("W_dtype", config.get("in_dtype")),
+                    config.get("out_dtype"),
+                    config.get("accum_dtype"),
+                    json.dumps(record),
+                ),
+            )
+
+    def remove(self, hash_strs: Iterable[str]):
+        with self._connect() as conn:
+            for hash_str in hash_strs:
+                conn.execute("DELETE FROM operators WHERE arch = ? AND hash = ?",
+                             (self.arch_str, hash_str))
+                conn.execute("DELETE FROM artifacts WHERE arch = ? AND hash = ?",
+                             (self.arch_str, hash_str))
+
+    def compact(self):
+        with self._connect() as conn:
+            # artifacts of every arch share the blobs table
+            conn.execute(
+                "DELETE FROM blobs WHERE digest NOT IN (SELECT DISTINCT digest FROM artifacts)")
+        conn = sqlite3.connect(self.database_path, timeout=60)
+        try:
+            # VACUUM can not run inside a transaction
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    def size_in_bytes(self) -> int:
+        return os.path.getsize(self.database_path) if os.path.exists(self.database_path) else 0
+
+
+def is_sqlite_database_path(database_path: str) -> bool:
+    return database_path.endswith(SQLITE_DATABASE_SUFFIXES)
+
+
+def list_database_archs(database_path: str) -> List[str]:
+    """Return the architectures which have operators stored at ``database_path``."""
+    if not os.path.exists(database_path):
+        return []
+    if is_sqlite_database_path(database_path):
+        conn = sqlite3.connect(database_path, timeout=60)
+        try:
+            rows = conn.execute("SELECT DISTINCT arch FROM operators").fetchall()
+        except sqlite3.OperationalError:
+            # the schema has not been created yet
+            rows = []
+        finally:
+            conn.close()
+        return sorted(arch for (arch,) in rows)
+    return sorted(
+        arch for arch in os.listdir(database_path)
+        if os.path.isdir(os.path.join(database_path, arch)))
+
+
+def open_database(database_path: str,
+                  arch_str: str,
+                  backend: Optional[str] = None) -> OperatorDatabase:
+    """
+    Open the operator database of ``arch_str`` stored at ``database_path``.
+
+    The backend is inferred from the path when not given: files ending with
+    one of ``SQLITE_DATABASE_SUFFIXES`` use SQLite, anything else is treated
+    as a directory database.
+    """
+    if backend is None:
+        backend = "sqlite" if is_sqlite_database_path(database_path) else "directory"
+    if backend == "sqlite":
+        return SQLiteDatabase(database_path, arch_str)
+    elif backend == "directory":
+        return DirectoryDatabase(database_path, arch_str)
+    else:
+        raise ValueError(f"Unsupported database backend: {backend}")
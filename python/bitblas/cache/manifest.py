@@ -0,0 +1,74 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Versions of the toolchain which produced the entries of the operator database"""
+import functools
+import re
+import shutil
+import subprocess
+from typing import Dict, Iterable, Optional
+import tvm
+import bitblas
+import logging
+
+logger = logging.getLogger(__name__)
+
+# bump when the layout of database records or artifacts changes
+DATABASE_SCHEMA_VERSION = 1
+
+MANIFEST_KEYS = ("schema", "bitblas", "tvm", "nvcc")
+
+
+def _get_tvm_commit() -> Optional[str]:
+    try:
+        return tvm.support.libinfo().get("GIT_COMMIT_HASH")
+    except Exception as e:
+        logger.debug(f"Failed to query the tvm commit: {e}")
+        return None
+
+
+def _get_nvcc_version() -> Optional[str]:
+    # the wrapper libraries are compiled with the nvcc found in PATH
+    if shutil.which("nvcc") is None:
+        return None
+    try:
+        output = subprocess.run(["nvcc", "--version"], capture_output=True, text=True,
+                                timeout=60).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Failed to query the nvcc version: {e}")
+        return None
+    match = re.search(r"release (\d+\.\d+)", output)
+    return match.group(1) if match else None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_manifest() -> tuple:
+    return (
+        ("schema", DATABASE_SCHEMA_VERSION),
+        ("bitblas", bitblas.__version__),
+        ("tvm", _get_tvm_commit()),
+        ("nvcc", _get_nvcc_version()),
+    )
+
+
+def get_manifest() -> Dict:
+    """The manifest of operators built by the running process."""
+    return dict(_get_manifest())
+
+
+def check_manifest(manifest: Optional[Dict], keys: Iterable[str] = MANIFEST_KEYS) -> Optional[str]:
+    """
+    Compare a stored manifest against the running toolchain.
+
+    Returns a description of the first mismatch among ``keys`` or None if
+    the entry is compatible. Versions that are unknown on either side are
+    not compared, and entries written before manifests existed are assumed
+    to be compatible.
+    """
+    if manifest is None:
+        return None
+    current = get_manifest()
+    for key in keys:
+        stored, expected = manifest.get(key), current.get(key)
+        if stored is not None and expected is not None and stored != expected:
+            return f"{key} {stored} != {expected}"
+    return None
@@ -2,77 +2,364 @@
 # Licensed under the MIT License.
 import bitblas
 from bitblas.ops.operator import OperatorConfig, Operator
+from bitblas.base.roller.hint import Hint
+from bitblas.base.tuning_options import TuningOptions
 from dataclasses import asdict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import ctypes
+import math
 import os
-import json
+import time
 import tempfile
 from hashlib import sha256
 import shutil
 import tvm
 from tvm.contrib.tar import tar
+from typing import Dict, List, Optional, Set, Tuple
+from .database import (
+    OperatorDatabase,
+    open_database,
+    is_sqlite_database_path,
+    list_database_archs,
+)
+from .manifest import get_manifest, check_manifest
+from .stats import CacheStats
 import logging
 
 logger = logging.getLogger(__name__)
 
 BITBLAS_DATABASE_PATH = os.path.expanduser("~/.cache/bitblas")
+# the default number of threads used to load a whole database
+DEFAULT_LOAD_WORKERS = 8
+# the default bound of the shape distance of nearest neighbour lookups,
+# i.e. the sum of |log2| ratios of the M, N and K dimensions
+DEFAULT_MAX_NEAREST_DISTANCE = 2.0
+# config fields which may differ between neighbours
+SHAPE_FIELDS = ("M", "N", "K")
+
+
+def get_config_hash(config: OperatorConfig) -> str:
+    return sha256(repr(config).encode()).hexdigest()
 
 
 class OperatorCache:
     """
     Manages a cache for operator instances (e.g., Matmul, Convolution) based on their configurations.
+
+    Operators stored in an attached database are only described by its index
+    (config hash -> config, operator type) until they are requested, so
+    attaching a large database does not load any module.
+
+    The cache can be bounded by a number of entries and/or an estimated
+    number of bytes. Unpinned operators are then evicted in LRU or LFU order
+    and re-loaded from the attached database on their next lookup.
+
+    Lookups, loads, fallback builds and tuning are counted in ``stats``.
     """
 
-    def __init__(self):
-        self.cache = {}
+    EVICTION_POLICIES = ("lru", "lfu")
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 eviction_policy: str = "lru"):
+        self.cache: OrderedDict = OrderedDict()
+        self.database_path: Optional[str] = None
+        self.target = None
+        self.database: Optional[OperatorDatabase] = None
+        self._pinned: Set[OperatorConfig] = set()
+        self._frequency: Dict[OperatorConfig, int] = {}
+        # estimated sizes, computed on demand once per operator
+        self._nbytes: Dict[OperatorConfig, int] = {}
+        self._warned_unevictable = False
+        # operators built with the schedule of a neighbour, never persisted
+        self._borrowed: Set[OperatorConfig] = set()
+        self.stats = CacheStats()
+        self.nearest_lookup = False
+        self.max_nearest_distance = DEFAULT_MAX_NEAREST_DISTANCE
+        self.set_capacity(max_entries, max_bytes, eviction_policy)
+
+    def set_capacity(self,
+                     max_entries: Optional[int] = None,
+                     max_bytes: Optional[int] = None,
+                     eviction_policy: str = "lru"):
+        """Bound the cache, ``None`` leaves the corresponding limit unbounded."""
+        if eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unsupported eviction policy: {eviction_policy}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self._evict()
 
     def add(self, config: OperatorConfig, op_inst: Operator):
+        if self.cache.get(config) is not op_inst:
+            self._nbytes.pop(config, None)
         self.cache[config] = op_inst
+        self._borrowed.discard(config)
+        self.cache.move_to_end(config)
+        self._frequency[config] = self._frequency.get(config, 0)
+        self._evict(keep=config)
 
     def get(self, config: OperatorConfig):
-        return self.cache.get(config)
+        op_inst = self.cache.get(config)
+        if op_inst is not None:
+            self.record_event("hit", config)
+        elif self.database is not None:
+            op_inst = self._load_indexed_operator(config)
+        if op_inst is None:
+            self.record_event("miss", config)
+        else:
+            self.cache.move_to_end(config)
+            self._frequency[config] += 1
+        return op_inst
+
+    def set_nearest_lookup(self,
+                           enabled: bool = True,
+                           max_distance: float = DEFAULT_MAX_NEAREST_DISTANCE):
+        """Let layers build missing operators from the nearest tuned shape."""
+        self.nearest_lookup = enabled
+        self.max_nearest_distance = max_distance
+
+    def record_event(self, event: str, config: OperatorConfig, seconds: Optional[float] = None):
+        self.stats.record(event, get_config_hash(config), config, seconds)
+
+    def timer(self, event: str, config: OperatorConfig):
+        """Time a block as ``event`` of the config, e.g. tuning after a miss."""
+        return self.stats.timer(event, get_config_hash(config), config)
 
     def exists(self, config):
-        return config in self.cache
+        if config in self.cache:
+            return True
+        if self.database is None:
+            return False
+        record = self.database.lookup(get_config_hash(config))
+        return record is not None and self._is_loadable(record)
+
+    def remove(self, config: OperatorConfig):
+        """Drop the operator from memory, the attached database is left untouched."""
+        self.cache.pop(config, None)
+        self._pinned.discard(config)
+        self._frequency.pop(config, None)
+        self._nbytes.pop(config, None)
+        self._borrowed.discard(config)
+
+    def pin(self, config: OperatorConfig):
+        """Never evict the operator of this config."""
+        self._pinned.add(config)
+
+    def unpin(self, config: OperatorConfig):
+        self._pinned.discard(config)
+        self._evict()
 
     def clear(self):
         self.cache.clear()
+        self._pinned.clear()
+        self._frequency.clear()
+        self._nbytes.clear()
+        self._borrowed.clear()
+        self.database_path = None
+        self.target = None
+        self.database = None
 
     def size(self):
         return len(self.cache)
 
+    def size_in_bytes(self):
+        return sum(self._operator_bytes(config) for config in self.cache)
+
+    def _operator_bytes(self, config: OperatorConfig) -> int:
+        if config not in self._nbytes:
+            self._nbytes[config] = self._estimate_operator_bytes(self.cache[config])
+        return self._nbytes[config]
+
+    def _estimate_operator_bytes(self, op_inst: Operator) -> int:
+        # a rough host memory estimate: the loaded wrapper library and the
+        # kernel source, which grow with the size of the module.
+        nbytes = 0
+        lib_name = getattr(op_inst, "lib_name", None)
+        if lib_name is not None and os.path.exists(lib_name):
+            nbytes += os.path.getsize(lib_name)
+        rt_mod = getattr(op_inst, "rt_mod", None)
+        if rt_mod is not None and len(rt_mod.imported_modules) > 0:
+            nbytes += len(rt_mod.imported_modules[0].get_source())
+        return nbytes
+
+    def _over_capacity(self) -> bool:
+        if self.max_entries is not None and len(self.cache) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.size_in_bytes() > self.max_bytes
+
+    def _eviction_order(self, keep: Optional[OperatorConfig]) -> List[OperatorConfig]:
+        candidates = [c for c in self.cache if c not in self._pinned and c != keep]
+        if self.eviction_policy == "lfu":
+            # sorted is stable, ties are broken by recency
+            candidates = sorted(candidates, key=lambda c: self._frequency[c])
+        return candidates
+
+    def _evict(self, keep: Optional[OperatorConfig] = None):
+        if not self._over_capacity():
+            return
+        for config in self._eviction_order(keep):
+            if not self._over_capacity():
+                break
+            if not self._spill(config):
+                continue
+            del self.cache[config]
+            del self._frequency[config]
+            self._nbytes.pop(config, None)
+            self._borrowed.discard(config)
+
+    def _spill(self, config: OperatorConfig) -> bool:
+        # borrowed schedules are cheap to rebuild and must not be persisted
+        if config in self._borrowed:
+            return True
+        # only evict operators which can be re-loaded from the attached database
+        if self.database is None:
+            if not self._warned_unevictable:
+                logger.warning("The operator cache exceeds its capacity but has no attached "
+                               "database to evict operators to, the capacity is not enforced")
+                self._warned_unevictable = True
+            logger.debug(f"No database attached, keeping {config} in the operator cache")
+            return False
+        hash_str = get_config_hash(config)
+        if not self._has_compatible_entry(self.database, hash_str):
+            self._save_operator(self.database, hash_str, config, self.cache[config])
+        return self._has_compatible_entry(self.database, hash_str)
+
+    def is_attached(self, database_path) -> bool:
+        return self.database_path is not None and os.path.abspath(
+            self.database_path) == os.path.abspath(database_path)
+
     def save_into_database(self, database_path=None, target=None):
         database_path = self._ensure_database_path(database_path)
+        databases: Dict[str, OperatorDatabase] = {}
         for config, op_inst in self.cache.items():
+            if config in self._borrowed:
+                continue
             arch_str = self._determine_arch_str(op_inst, target)
-            arch_path = os.path.join(database_path, arch_str)
-            self._ensure_directory(arch_path)
-            hash_str = sha256(repr(config).encode()).hexdigest()
-            config_path = os.path.join(arch_path, hash_str)
+            if arch_str not in databases:
+                databases[arch_str] = self._open_database(database_path, arch_str)
+            database = databases[arch_str]
+            hash_str = get_config_hash(config)
             # if the config already exists, skip saving
-            if os.path.exists(config_path):
+            if self._has_compatible_entry(database, hash_str):
                 continue
-            self._ensure_directory(config_path)
-            self._save_operator_config_and_artifact(config, op_inst, config_path)
+            self._save_operator(database, hash_str, config, op_inst)
+
+    def _save_operator(self, database: OperatorDatabase, hash_str, config, op_inst):
+        # incompatible entries of the same config are replaced
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            self._save_operator_config_and_artifact(config, op_inst, artifact_dir)
+            database.save(
+                hash_str, self._make_record(config, op_inst), artifact_dir, overwrite=True)
+
+    def _has_compatible_entry(self, database: OperatorDatabase, hash_str) -> bool:
+        record = database.lookup(hash_str)
+        return record is not None and check_manifest(record.get("manifest")) is None
+
+    def _is_loadable(self, record) -> bool:
+        # incompatible artifacts can still be rebuilt from the schedule hints
+        # as long as the record layout is understood
+        manifest = record.get("manifest")
+        if check_manifest(manifest) is None:
+            return True
+        return bool(record.get("tuning_records")) and check_manifest(manifest, ["schema"]) is None
+
+    def gc(self, database_path, target=None) -> Dict:
+        """
+        Remove garbage from the database and compact its storage.
+
+        An entry is garbage when its config can no longer be instantiated,
+        when it is not stored under the hash of its config (a stale or
+        duplicate entry that lookups never reach) or when its manifest does
+        not match the running toolchain. Call ``rebuild_database`` first to
+        keep incompatible entries which have schedule hints. Every arch is
+        collected unless ``target`` is given.
 
-    def load_from_database(self, database_path, target=None):
+        Returns ``{"removed": {"<arch>/<hash>": reason}, "bytes_reclaimed": int}``.
+        """
+        if target is None:
+            archs = list_database_archs(database_path)
+        else:
+            archs = [self._determine_target_arch_str(target)]
+        report = {"removed": {}, "bytes_reclaimed": 0}
+        for arch_str in archs:
+            database = self._open_database(database_path, arch_str)
+            nbytes = database.size_in_bytes()
+            entries = database.entries()
+            removed = {}
+            for hash_str, record in entries.items():
+                reason = self._garbage_reason(hash_str, record, entries)
+                if reason is not None:
+                    removed[hash_str] = reason
+            database.remove(removed.keys())
+            database.compact()
+            # the sqlite backend shares a single file between archs, a
+            # concurrent writer may even make the difference negative
+            report["bytes_reclaimed"] += max(0, nbytes - database.size_in_bytes())
+            for hash_str, reason in removed.items():
+                logger.info(
+                    f"Removed operator {arch_str}/{hash_str} from {database_path}: {reason}")
+                report["removed"][f"{arch_str}/{hash_str}"] = reason
+        logger.info(f"Reclaimed {report['bytes_reclaimed']} bytes from {database_path}")
+        return report
+
+    def _garbage_reason(self, hash_str, record, entries) -> Optional[str]:
+        try:
+            config_cls = getattr(bitblas, record["config_type"])
+            getattr(bitblas, record["operator_type"])
+            expected_hash = get_config_hash(config_cls(**record["config"]))
+        except Exception as e:
+            return f"invalid record: {e}"
+        if expected_hash != hash_str:
+            return "duplicate" if expected_hash in entries else "unreachable"
+        reason = check_manifest(record.get("manifest"))
+        if reason is not None:
+            return f"incompatible: {reason}"
+        return None
+
+    def load_from_database(self, database_path, target=None, lazy=True, num_workers=None):
+        """
+        Attach the database for the given target.
+
+        With ``lazy`` enabled only the index is read, and each operator is
+        loaded on the first ``get`` of its config. Otherwise every indexed
+        operator is loaded immediately, using up to ``num_workers`` threads
+        to read and load the artifacts.
+        """
         if not os.path.exists(database_path):
             logger.info(
                 f"Database path {database_path} does not exist, skipping loading operators from the database"
             )
             return
         arch_str = self._determine_target_arch_str(target)
-        arch_path = os.path.join(database_path, arch_str)
-        if not os.path.exists(arch_path):
+        if not is_sqlite_database_path(database_path) and not os.path.exists(
+                os.path.join(database_path, arch_str)):
             logger.info(
                 f"Target {arch_str} does not exist in the database, skipping loading operators from the database"
             )
             return
-        self._load_operators_from_arch_path(arch_path, target)
+        self.database_path = database_path
+        self.target = target
+        self.database = self._open_database(database_path, arch_str)
+        logger.info(f"Indexed {len(self.database.entries())} operators from {database_path}")
+        if not lazy:
+            self._load_operators_from_database(self.database, target, num_workers)
+
+    def _open_database(self, database_path, arch_str) -> OperatorDatabase:
+        # share the attached database so that saved entries are visible to lookups
+        if (self.database is not None and self.is_attached(database_path) and
+                self.database.arch_str == arch_str):
+            return self.database
+        return open_database(database_path, arch_str)
 
     def _ensure_database_path(self, database_path):
         if database_path is None:
             return tempfile.mkdtemp()
-        os.makedirs(database_path, exist_ok=True)
+        if not is_sqlite_database_path(database_path):
+            os.makedirs(database_path, exist_ok=True)
         return database_path
 
     def _determine_arch_str(self, op_inst, target):
@@ -81,10 +368,26 @@ class OperatorCache:
     def _ensure_directory(self, path):
         os.makedirs(path, exist_ok=True)
 
+    def _make_record(self, config, op_inst) -> Dict:
+        record = {
+            "config_type": type(config).__name__,
+            "operator_type": type(op_inst).__name__,
+            "config": asdict(config),
+            "manifest": get_manifest(),
+        }
+        # schedule hints allow a rebuild when the compiled artifacts become unusable
+        if op_inst.tuning_records is not None:
+            record["tuning_records"] = op_inst.tuning_records
+        return record
+
+    def _load_indexed_operator(self, config):
+        hash_str = get_config_hash(config)
+        record = self.database.lookup(hash_str)
+        if record is None:
+            return None
+        return self._load_operator(self.database, hash_str, record, self.target)
+
     def _save_operator_config_and_artifact(self, config, op_inst, config_path):
-        config_type, operator_type = type(config).__name__, type(op_inst).__name__
-        with open(os.path.join(config_path, f"{config_type}.json"), "w") as json_file:
-            json.dump(asdict(config), json_file)
         artifact_path = os.path.join(config_path, "tvm_rt_mod." + tar.output_format)
         try:
             op_inst.rt_mod.export_library(artifact_path, fcompile=tar)
@@ -92,10 +395,6 @@ class OperatorCache:
             # library does not support export_library
             export_error = e  # noqa: F841
             pass
-        json_data = {"config_type": config_type, "operator_type": operator_type}
-        json_file_path = os.path.join(config_path, "mapping.json")
-        with open(json_file_path, "w") as json_file:
-            json.dump(json_data, json_file)
 
         # For writing source.cu file
         source_file_path = os.path.join(config_path, "source.cu")
@@ -123,31 +422,222 @@ class OperatorCache:
     def _determine_target_arch_str(self, target):
         return (target if isinstance(target, str) else "-".join(list(target.keys) + [target.arch]))
 
-    def _load_operators_from_arch_path(self, arch_path, target):
-        for root, dirs, _ in os.walk(arch_path):
-            for directory in dirs:
-                config_path = os.path.join(root, directory)
-                self._load_operator(config_path, target)
-
-    def _load_operator(self, config_path, target):
-        mapping, config, rt_mod, src_name, lib_name = None, None, None, None, None
-        for file in os.listdir(config_path):
-            full_path = os.path.join(config_path, file)
-            if file == "mapping.json":
-                with open(full_path) as f:
-                    mapping = json.load(f)
-            elif file.endswith(".json"):
-                with open(full_path) as f:
-                    config = json.load(f)
-            elif file.endswith(".tar"):
+    def _load_operators_from_database(self, database: OperatorDatabase, target, num_workers=None):
+        # artifact i/o and module loading run in a thread pool, operators are
+        # instantiated on the calling thread in a deterministic (hash) order.
+        entries = sorted(database.entries().items())
+        if num_workers is None:
+            num_workers = min(DEFAULT_LOAD_WORKERS, os.cpu_count() or 1)
+        num_workers = max(1, min(num_workers, len(entries)))
+
+        def _load(item):
+            hash_str, record = item
+            # decided from the index alone, without touching the artifacts
+            reason = check_manifest(record.get("manifest"))
+            if reason is not None:
+                logger.info(f"Skipping incompatible artifacts of operator {hash_str}: {reason}")
+                return None, None, None
+            try:
+                return self._load_operator_artifacts(database, hash_str)
+            except Exception as e:
+                logger.warning(f"Failed to load operator {hash_str} from the database: {e}")
+                return None, None, None
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            loaded = executor.map(_load, entries)
+            for (hash_str, record), (rt_mod, src_name, lib_name) in zip(entries, loaded):
+                if rt_mod:
+                    op_inst = self._instantiate_and_add_operator(record, record["config"], rt_mod,
+                                                                 src_name, lib_name, target)
+                    # artifacts are read concurrently, a per operator duration is meaningless
+                    self.stats.record("disk_load", hash_str, op_inst.config)
+                else:
+                    self._rebuild_and_add_operator(database, hash_str, record, target)
+
+    def _load_operator_artifacts(self, database: OperatorDatabase, hash_str):
+        rt_mod, src_name, lib_name = None, None, None
+        for file, full_path in database.load_artifacts(hash_str).items():
+            if file.endswith(".tar"):
                 rt_mod = tvm.runtime.load_module(full_path)
             elif file == "wrapper_compiled.so":
                 lib_name = full_path
+                # map the library here, the loader returns the same handle later
+                ctypes.CDLL(lib_name)
             elif file == "wrapper_source.cu":
                 src_name = full_path
+        return rt_mod, src_name, lib_name
+
+    def _load_operator(self, database: OperatorDatabase, hash_str, record, target):
+        start = time.perf_counter()
+        rt_mod, src_name, lib_name = None, None, None
+        reason = check_manifest(record.get("manifest"))
+        if reason is not None:
+            logger.info(f"Skipping incompatible artifacts of operator {hash_str}: {reason}")
+        else:
+            try:
+                rt_mod, src_name, lib_name = self._load_operator_artifacts(database, hash_str)
+            except Exception as e:
+                logger.warning(f"Failed to load operator {hash_str} from the database: {e}")
+        if rt_mod:
+            op_inst = self._instantiate_and_add_operator(record, record["config"], rt_mod, src_name,
+                                                         lib_name, target)
+            self.stats.record("disk_load", hash_str, op_inst.config, time.perf_counter() - start)
+            return op_inst
+        return self._rebuild_and_add_operator(database, hash_str, record, target)
+
+    def _rebuild_and_add_operator(self, database: OperatorDatabase, hash_str, record, target):
+        if not self._is_loadable(record) or not record.get("tuning_records"):
+            return None
+        logger.info(f"Rebuilding operator {hash_str} from its recorded schedule hints")
+        start = time.perf_counter()
+        op_inst = self._rebuild_operator(database, hash_str, record, target)
+        if op_inst is not None:
+            self.stats.record("compile_fallback", hash_str, op_inst.config,
+                              time.perf_counter() - start)
+            self.add(op_inst.config, op_inst)
+        return op_inst
+
+    def _rebuild_operator(self, database: OperatorDatabase, hash_str, record, target):
+        config_cls = getattr(bitblas, record["config_type"])
+        operator_cls = getattr(bitblas, record["operator_type"])
+        config = config_cls(**record["config"])
+        op_inst = operator_cls(
+            config=config, target=target, enable_tuning=False, from_database=True)
+        if not op_inst.apply_tuning_records(record["tuning_records"]):
+            logger.warning(f"Failed to rebuild operator {hash_str} from its schedule hints")
+            return None
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            self._save_operator_config_and_artifact(config, op_inst, artifact_dir)
+            database.save(
+                hash_str, self._make_record(config, op_inst), artifact_dir, overwrite=True)
+        return op_inst
 
-        if mapping and config and rt_mod:
-            self._instantiate_and_add_operator(mapping, config, rt_mod, src_name, lib_name, target)
+    def find_nearest(
+        self,
+        config: OperatorConfig,
+        max_distance: Optional[float] = None,
+    ) -> Optional[Tuple[str, Dict, float]]:
+        """
+        Find the indexed operator with the nearest shape which has schedule hints.
+
+        A neighbour has the same operator type and the same config apart from
+        M, N and K (a group size equal to K counts as per channel on both
+        sides), and a static M when ``config`` has one. Returns the hash,
+        record and distance of the nearest neighbour within ``max_distance``,
+        which defaults to ``max_nearest_distance``.
+        """
+        if self.database is None:
+            return None
+        if max_distance is None:
+            max_distance = self.max_nearest_distance
+        fields = asdict(config)
+        nearest = None
+        for hash_str, record in self.database.entries().items():
+            if record["config_type"] != type(config).__name__ or not self._is_loadable(
+                    record) or not record.get("tuning_records"):
+                continue
+            distance = self._shape_distance(fields, record["config"])
+            if distance is None or distance > max_distance:
+                continue
+            if nearest is None or (distance, hash_str) < (nearest[2], nearest[0]):
+                nearest = (hash_str, record, distance)
+        return nearest
+
+    def _shape_distance(self, fields: Dict, other: Dict) -> Optional[float]:
+        for key, value in fields.items():
+            if key in SHAPE_FIELDS:
+                continue
+            if key == "group_size":
+                # per channel quantization is stored as a group size of K
+                if (value == fields["K"]) != (other[key] == other["K"]):
+                    return None
+                if value != fields["K"] and value != other[key]:
+                    return None
+            elif other.get(key) != value:
+                return None
+        distance = 0.0
+        M, other_M = fields["M"], other["M"]
+        if isinstance(M, int) != isinstance(other_M, int):
+            return None
+        if isinstance(M, int):
+            distance += abs(math.log2(M / other_M))
+        elif len(M) != len(other_M):
+            return None
+        for key in ("N", "K"):
+            distance += abs(math.log2(fields[key] / other[key]))
+        return distance
+
+    def build_from_nearest(self,
+                           config: OperatorConfig,
+                           target=None,
+                           tune: bool = False,
+                           topk: int = 20,
+                           max_distance: Optional[float] = None) -> Optional[Operator]:
+        """
+        Build the operator of ``config`` with the schedule of its nearest tuned
+        neighbour in the attached database.
+
+        Without ``tune`` the neighbour's hints are the only candidates and no
+        profiling happens. With ``tune`` they are evaluated first, next to the
+        ``topk`` emitted configs. The operator is added to the cache; untuned
+        ones are never saved into a database, where they would shadow a
+        proper tuning of the config. Returns None if there is no neighbour, or if its
+        schedule does not apply to the new shape and ``tune`` is not set.
+        """
+        nearest = self.find_nearest(config, max_distance)
+        if nearest is None:
+            return None
+        hash_str, record, distance = nearest
+        logger.info(f"Building {config} from the schedule of operator {hash_str} "
+                    f"(distance {distance:.2f})")
+        if target is None:
+            target = self.target
+        operator_cls = getattr(bitblas, record["operator_type"])
+        op_inst = operator_cls(config=config, target=target, enable_tuning=False)
+        if tune:
+            seed_hints = [
+                Hint().deserialize(tuning_record["hint"], op_inst.arch)
+                for tuning_record in record["tuning_records"]
+            ]
+            with self.timer("tune", config):
+                op_inst.hardware_aware_finetune(
+                    topk=topk, options=TuningOptions(seed_hints=seed_hints))
+            built = op_inst.rt_mod is not None
+        else:
+            with self.timer("compile_fallback", config):
+                built = op_inst.apply_tuning_records(record["tuning_records"])
+        if not built:
+            logger.info(f"The schedule of operator {hash_str} does not apply to {config}")
+            return None
+        self.add(config, op_inst)
+        if not tune:
+            self._borrowed.add(config)
+        return op_inst
+
+    def rebuild_database(self, database_path, target=None) -> int:
+        """
+        Recompile every operator of the database from its recorded schedule
+        hints and replace the stored artifacts, without any tuning or profiling.
+
+        Meant for upgrades of TVM or the CUDA toolkit, which leave the compiled
+        artifacts unusable. Entries without hints are left untouched. Returns
+        the number of rebuilt operators.
+        """
+        if target is None:
+            target = bitblas.auto_detect_nvidia_target()
+        database = self._open_database(database_path, self._determine_target_arch_str(target))
+        num_rebuilt = 0
+        for hash_str, record in sorted(database.entries().items()):
+            if not record.get("tuning_records"):
+                logger.info(f"Operator {hash_str} has no schedule hints, skipping rebuild")
+                continue
+            if check_manifest(record.get("manifest"), ["schema"]) is not None:
+                logger.info(f"Operator {hash_str} has an unsupported schema, skipping rebuild")
+                continue
+            if self._rebuild_operator(database, hash_str, record, target) is not None:
+                num_rebuilt += 1
+        logger.info(f"Rebuilt {num_rebuilt} operators in {database_path}")
+        return num_rebuilt
 
     def _instantiate_and_add_operator(self, mapping, config, rt_mod, src_name, lib_name, target):
         config_cls = getattr(bitblas, mapping["config_type"])
@@ -156,16 +646,25 @@ class OperatorCache:
             config=config_cls(**config), target=target, enable_tuning=False, from_database=True)
         op_inst.update_runtime_module(rt_mod, src_name=src_name, lib_name=lib_name)
         self.add(config_cls(**config), op_inst)
+        return op_inst
 
 
 global_operator_cache = OperatorCache()
 
+# dump the statistics of the global cache at exit, e.g. to find configs tuned in production
+if os.environ.get("BITBLAS_CACHE_STATS_PATH"):
+    atexit.register(global_operator_cache.stats.dump, os.environ["BITBLAS_CACHE_STATS_PATH"])
 
-def load_global_ops_cache(database_path=BITBLAS_DATABASE_PATH, target=None):
+
+def load_global_ops_cache(database_path=BITBLAS_DATABASE_PATH,
+                          target=None,
+                          lazy=True,
+                          num_workers=None):
     if target is None:
         target = bitblas.auto_detect_nvidia_target()
     logger.info(f"Loading operators from database {database_path} for target {target}")
-    global_operator_cache.load_from_database(database_path, target)
+    global_operator_cache.load_from_database(
+        database_path, target, lazy=lazy, num_workers=num_workers)
     return global_operator_cache
 
 
@@ -174,6 +673,10 @@ def get_database_path():
 
 
 def set_database_path(path):
+    """
+    Set the default database path. Paths ending with ``.db``, ``.sqlite`` or
+    ``.sqlite3`` select the single file SQLite backend.
+    """
     global BITBLAS_DATABASE_PATH
     BITBLAS_DATABASE_PATH = path
     return BITBLAS_DATABASE_PATH
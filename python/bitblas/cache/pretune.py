@@ -0,0 +1,201 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Offline tuning of the operators of a model into an operator database"""
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Union
+import bitblas
+from bitblas.base.build_pool import get_build_pool, set_build_pool_size
+from bitblas.base.journal import TuningJournal
+from bitblas.base.measure_log import MeasurementLog
+from bitblas.base.roller.cost_model import RidgeCostModel
+from bitblas.base.tuning_options import TuningOptions
+from bitblas.ops.general_matmul import MatmulConfig, Matmul
+from .operator import OperatorCache, get_config_hash, get_database_path
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_model_matmul_configs(
+    hidden_size: int,
+    intermediate_size: int,
+    num_attention_heads: int,
+    num_key_value_heads: Optional[int] = None,
+    opt_M: Optional[Union[int, List[int]]] = None,
+    A_dtype: str = "float16",
+    W_dtype: str = "float16",
+    accum_dtype: str = "float16",
+    out_dtype: str = "float16",
+    group_size: int = -1,
+    with_scaling: bool = None,
+    with_zeros: bool = False,
+    zeros_mode: str = None,
+    fast_decoding: bool = True,
+    propagate_b: bool = False,
+) -> List[MatmulConfig]:
+    """
+    The matmul configs of the ``bitblas.Linear`` layers of a decoder block
+    (attention projections and a gated MLP), built with the same defaults as
+    ``bitblas.Linear`` so that the layers find them in the database.
+    """
+    if opt_M is None:
+        opt_M = bitblas.Linear.opt_M
+    if num_key_value_heads is None:
+        num_key_value_heads = num_attention_heads
+    head_dim = hidden_size // num_attention_heads
+    # (in_features, out_features) of q, k/v, o, gate/up and down projections
+    shapes = [
+        (hidden_size, hidden_size),
+        (hidden_size, num_key_value_heads * head_dim),
+        (hidden_size, intermediate_size),
+        (intermediate_size, hidden_size),
+    ]
+    configs = []
+    for in_features, out_features in shapes:
+        configs.append(
+            MatmulConfig(
+                M=opt_M,
+                N=out_features,
+                K=in_features,
+                A_dtype=A_dtype,
+                W_dtype=W_dtype,
+                accum_dtype=accum_dtype,
+                out_dtype=out_dtype,
+                storage_dtype=bitblas.Linear.STORAGE_DTYPE,
+                with_scaling=with_scaling,
+                with_zeros=with_zeros,
+                group_size=in_features if group_size in (-1, None) else group_size,
+                fast_decoding=fast_decoding,
+                with_bias=False,
+                propagate_b=propagate_b,
+                zeros_mode=zeros_mode,
+            ))
+    return configs
+
+
+class PretuneProgress:
+    """
+    The outcome of every config tuned so far, saved after each config so
+    that an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.records: Dict[str, Dict] = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.records = json.load(f)
+
+    def status(self, hash_str: str) -> Optional[str]:
+        record = self.records.get(hash_str)
+        return record["status"] if record else None
+
+    def update(self, hash_str: str, config: MatmulConfig, status: str, **kwargs):
+        self.records[hash_str] = {"config": repr(config), "status": status, **kwargs}
+        if self.path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # replace the file atomically, an interrupted write never corrupts it
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False) as f:
+            json.dump(self.records, f, indent=2)
+        os.replace(f.name, self.path)
+
+
+def pretune(
+    configs: Iterable[MatmulConfig],
+    database_path: Optional[str] = None,
+    target: Optional[str] = None,
+    topk: int = 20,
+    progress_path: Optional[str] = None,
+    retry_failed: bool = False,
+    max_workers: Optional[int] = None,
+    journal_path: Optional[str] = None,
+    measure_log_path: Optional[str] = None,
+    measure_topk: Optional[int] = None,
+) -> Dict[str, List[MatmulConfig]]:
+    """
+    Tune the given configs into the database.
+
+    Duplicated configs are tuned once and configs already in the database
+    are skipped. The remaining ones are tuned one after another, every build
+    going through the process-wide build pool (resized to ``max_workers`` if
+    given), and each operator is saved as soon as it is tuned. Configs which failed in a
+    previous run recorded at ``progress_path`` are skipped unless
+    ``retry_failed`` is set. With a ``journal_path``, every tuned point of
+    every config is journaled (see ``bitblas.base.TuningJournal``) so that a
+    preempted run resumes within a config as well.
+
+    With a ``measure_log_path``, every measured candidate is logged (see
+    ``bitblas.base.MeasurementLog``) and a ``RidgeCostModel`` trained on the
+    log of the previous runs, and updated as the configs are tuned, ranks
+    the candidates. Only the ``measure_topk`` (``topk`` by default) most
+    promising ones are then measured.
+
+    Returns the configs by outcome: ``tuned``, ``skipped`` and ``failed``.
+    """
+    if database_path is None:
+        database_path = get_database_path()
+    if target is None:
+        target = bitblas.auto_detect_nvidia_target()
+    configs = list(dict.fromkeys(configs))
+    progress = PretuneProgress(progress_path)
+
+    cache = OperatorCache()
+    cache.load_from_database(database_path, target)
+    result = {"tuned": [], "skipped": [], "failed": []}
+    pending = []
+    for config in configs:
+        hash_str = get_config_hash(config)
+        if cache.exists(config):
+            result["skipped"].append(config)
+        elif progress.status(hash_str) == "failed" and not retry_failed:
+            logger.info(f"Skipping config that failed in a previous run: {config}")
+            result["skipped"].append(config)
+        else:
+            pending.append(config)
+    logger.info(f"Tuning {len(pending)} of {len(configs)} distinct configs, "
+                f"{len(result['skipped'])} skipped")
+
+    if max_workers is not None:
+        set_build_pool_size(max_workers)
+    builder = get_build_pool()
+    journal = TuningJournal(journal_path) if journal_path is not None else None
+    measure_log = MeasurementLog(measure_log_path) if measure_log_path is not None else None
+    cost_model = None
+    for i, config in enumerate(pending):
+        hash_str = get_config_hash(config)
+        logger.info(f"[{i + 1}/{len(pending)}] Tuning {config}")
+        start = time.time()
+        try:
+            op_inst = Matmul(config, target=target, enable_tuning=False)
+            if measure_log is not None and cost_model is None:
+                cost_model = RidgeCostModel(op_inst.arch).fit_log(measure_log)
+                logger.info(f"Ranking candidates with a cost model trained on "
+                            f"{cost_model.num_samples} logged measurements")
+            with cache.timer("tune", config):
+                op_inst.hardware_aware_finetune(
+                    topk=topk,
+                    options=TuningOptions(
+                        builder=builder,
+                        journal=journal,
+                        cost_model=cost_model,
+                        measure_topk=measure_topk,
+                        measure_log=measure_log))
+            if op_inst.rt_mod is None:
+                raise RuntimeError("no valid schedule was found")
+            cache.add(config, op_inst)
+            cache.save_into_database(database_path, target)
+            # keep the memory of long runs bounded
+            cache.remove(config)
+        except Exception as e:
+            logger.warning(f"Failed to tune {config}: {e}")
+            progress.update(hash_str, config, "failed", error=str(e))
+            result["failed"].append(config)
+            continue
+        progress.update(hash_str, config, "tuned", seconds=time.time() - start)
+        result["tuned"].append(config)
+    return result
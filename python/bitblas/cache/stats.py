@@ -0,0 +1,121 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""Counters and timings of the operator cache"""
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# upper bounds (in seconds) of the buckets of the timing histograms
+HISTOGRAM_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, 60.0, 600.0, float("inf"))
+
+
+class TimingHistogram:
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "buckets": {
+                f"le_{bound}": count for bound, count in zip(HISTOGRAM_BUCKETS, self.buckets)
+            },
+        }
+
+
+class CacheStats:
+    """
+    Thread safe event counters of the operator cache, in total and per config.
+
+    Events are ``hit`` (served from memory), ``disk_load`` (loaded from the
+    attached database), ``miss`` (in neither), ``compile_fallback`` (built
+    without tuning, from stored hints or the default schedule) and ``tune``.
+    Events recorded with a duration also feed a timing histogram.
+    """
+
+    EVENTS = ("hit", "miss", "disk_load", "compile_fallback", "tune")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters: Dict[str, int] = {event: 0 for event in self.EVENTS}
+            self.histograms: Dict[str, TimingHistogram] = defaultdict(TimingHistogram)
+            self.per_config: Dict[str, Dict] = {}
+
+    def record(self,
+               event: str,
+               hash_str: Optional[str] = None,
+               config=None,
+               seconds: Optional[float] = None):
+        if event not in self.EVENTS:
+            raise ValueError(f"Unknown cache event: {event}")
+        with self._lock:
+            self.counters[event] += 1
+            if seconds is not None:
+                self.histograms[event].observe(seconds)
+            if hash_str is None:
+                return
+            entry = self.per_config.get(hash_str)
+            if entry is None:
+                entry = {"config": repr(config), "counters": {}, "seconds": {}}
+                self.per_config[hash_str] = entry
+            entry["counters"][event] = entry["counters"].get(event, 0) + 1
+            if seconds is not None:
+                entry["seconds"][event] = entry["seconds"].get(event, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, event: str, hash_str: Optional[str] = None, config=None):
+        """Record ``event`` with the duration of the block, unless it raises."""
+        start = time.perf_counter()
+        yield
+        self.record(event, hash_str, config, time.perf_counter() - start)
+
+    def top(self, event: str, n: int = 10) -> List[Tuple[str, Dict]]:
+        """The ``n`` configs with the most ``event`` events, e.g. repeatedly tuned ones."""
+        with self._lock:
+            entries = [(hash_str, entry)
+                       for hash_str, entry in self.per_config.items()
+                       if entry["counters"].get(event)]
+        entries.sort(key=lambda item: item[1]["counters"][event], reverse=True)
+        return entries[:n]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    event: histogram.to_dict() for event, histogram in self.histograms.items()
+                },
+                "per_config": json.loads(json.dumps(self.per_config)),
+            }
+
+    def dump(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,121 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+Command line tools of BitBLAS.
+
+Pre-tune the operators of a model into the operator database before a deploy:
+
+    bitblas pretune --hidden-size 4096 --intermediate-size 11008 \
+        --num-attention-heads 32 --W-dtype int4 --group-size 128 --with-scaling
+
+or tune a list of MatmulConfig arguments stored as json:
+
+    bitblas pretune --configs configs.json
+
+``python -m bitblas`` runs the same commands.
+"""
+import argparse
+import json
+import logging
+import bitblas
+from bitblas.cache import pretune, get_model_matmul_configs, get_database_path
+
+
+def _load_configs(path):
+    with open(path) as f:
+        return [bitblas.MatmulConfig(**kwargs) for kwargs in json.load(f)]
+
+
+def _pretune(args):
+    configs = []
+    if args.configs is not None:
+        configs.extend(_load_configs(args.configs))
+    if args.hidden_size is not None:
+        if args.intermediate_size is None or args.num_attention_heads is None:
+            raise ValueError(
+                "--intermediate-size and --num-attention-heads are required with --hidden-size")
+        configs.extend(
+            get_model_matmul_configs(
+                hidden_size=args.hidden_size,
+                intermediate_size=args.intermediate_size,
+                num_attention_heads=args.num_attention_heads,
+                num_key_value_heads=args.num_key_value_heads,
+                opt_M=args.opt_M,
+                A_dtype=args.A_dtype,
+                W_dtype=args.W_dtype,
+                accum_dtype=args.accum_dtype,
+                out_dtype=args.out_dtype,
+                group_size=args.group_size,
+                with_scaling=args.with_scaling,
+                with_zeros=args.with_zeros,
+                zeros_mode=args.zeros_mode,
+            ))
+    if not configs:
+        raise ValueError("Either --configs or a model description is required")
+    database_path = args.database or get_database_path()
+    progress_path = args.progress or f"{database_path.rstrip('/')}.pretune.json"
+    result = pretune(
+        configs,
+        database_path=database_path,
+        target=args.target,
+        topk=args.topk,
+        progress_path=progress_path,
+        retry_failed=args.retry_failed,
+        max_workers=args.max_workers,
+        journal_path=args.journal,
+        measure_log_path=args.measure_log,
+        measure_topk=args.measure_topk,
+    )
+    print(f"tuned: {len(result['tuned'])}, skipped: {len(result['skipped'])}, "
+          f"failed: {len(result['failed'])}")
+    return 1 if result["failed"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bitblas", description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_pretune = subparsers.add_parser(
+        "pretune", help="Tune matmul configs into the operator database")
+    parser_pretune.add_argument("--configs", help="json list of MatmulConfig arguments")
+    parser_pretune.add_argument("--hidden-size", type=int)
+    parser_pretune.add_argument("--intermediate-size", type=int)
+    parser_pretune.add_argument("--num-attention-heads", type=int)
+    parser_pretune.add_argument("--num-key-value-heads", type=int)
+    parser_pretune.add_argument(
+        "--opt-M", type=int, nargs="+", help="the M dimensions to optimize for")
+    parser_pretune.add_argument("--A-dtype", default="float16")
+    parser_pretune.add_argument("--W-dtype", default="float16")
+    parser_pretune.add_argument("--accum-dtype", default="float16")
+    parser_pretune.add_argument("--out-dtype", default="float16")
+    parser_pretune.add_argument("--group-size", type=int, default=-1)
+    parser_pretune.add_argument("--with-scaling", action="store_true", default=None)
+    parser_pretune.add_argument("--with-zeros", action="store_true")
+    parser_pretune.add_argument(
+        "--zeros-mode", choices=["original", "rescale", "quantized"], default=None)
+    parser_pretune.add_argument("--database", help="defaults to the BitBLAS database path")
+    parser_pretune.add_argument("--target", help="defaults to the detected GPU")
+    parser_pretune.add_argument("--topk", type=int, default=20)
+    parser_pretune.add_argument(
+        "--progress", help="progress file, defaults to <database>.pretune.json")
+    parser_pretune.add_argument(
+        "--journal", help="journal the tuning session to resume it, e.g. <database>.journal.jsonl")
+    parser_pretune.add_argument(
+        "--measure-log",
+        help="log the measured candidates to train the cost model, "
+        "e.g. <database>.measurements.jsonl")
+    parser_pretune.add_argument(
+        "--measure-topk", type=int, help="candidates measured per config, defaults to --topk")
+    parser_pretune.add_argument(
+        "--retry-failed", action="store_true", help="tune configs which failed in a previous run")
+    parser_pretune.add_argument(
+        "--max-workers", type=int, help="processes of the shared build pool")
+    parser_pretune.set_defaults(func=_pretune)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -11,8 +11,11 @@ import torch.nn as nn
 
 logger = getLogger(__name__)
 
-from typing import List, Union
+from typing import List, Optional, Union
 
+from bitblas.base.budget import TuningBudget
+from bitblas.base.tuning_options import TuningOptions
+from bitblas.base.dispatch import ShapeTrace
 from bitblas.cache import global_operator_cache, get_database_path
 from bitblas import Matmul, MatmulConfig
 from bitblas.quantization.utils import general_compress
@@ -41,6 +44,12 @@ def unpack_qzeros(qzeros, bits):
 
 class Linear(nn.Module):
     opt_M = [1, 16, 32, 64, 128, 256, 512]
+    # when set, the M of every call is recorded, see `bitblas.base.select_dynamic_buckets`
+    # to derive the opt_M of the layers from it
+    shape_trace: Optional[ShapeTrace] = None
+    # bounds the tuning of the layers created with tuning enabled, e.g. for a fast
+    # bring-up at deploy time, shared by all the layers
+    tuning_budget: Optional[TuningBudget] = None
     STORAGE_DTYPE = "int8"  # assume int8 storage
     TORCH_STORAGE_DTYPE = getattr(torch, STORAGE_DTYPE)
     BITBLAS_DTYPES = {
@@ -205,16 +214,27 @@ class Linear(nn.Module):
         self.source_format = self.bitblas_matmul.source_format
 
     def _get_or_create_bitblas_operator(self, config, enable_tuning):
-        if global_operator_cache.size() == 0:
+        if not global_operator_cache.is_attached(BITBLAS_DATABASE_PATH):
             global_operator_cache.load_from_database(BITBLAS_DATABASE_PATH, BITBLAS_TARGET)
-            logger.info(f"Loaded {global_operator_cache.size()} operators from database.")
+            logger.info(f"Attached operator database {BITBLAS_DATABASE_PATH}.")
 
         bitblas_matmul = global_operator_cache.get(config)
+        if bitblas_matmul is None and global_operator_cache.nearest_lookup:
+            bitblas_matmul = global_operator_cache.build_from_nearest(
+                config, BITBLAS_TARGET, tune=enable_tuning)
+            if bitblas_matmul is not None:
+                if enable_tuning:
+                    global_operator_cache.save_into_database(BITBLAS_DATABASE_PATH, BITBLAS_TARGET)
+                print("BitBLAS Operator built from the schedule of a similar tuned operator.")
+                return bitblas_matmul
         if bitblas_matmul is None:
             # should disable tuning for the first time because we may require loading bitblas operator from database.
-            bitblas_matmul = Matmul(config, target=BITBLAS_TARGET, enable_tuning=False)
+            with global_operator_cache.timer("compile_fallback", config):
+                bitblas_matmul = Matmul(config, target=BITBLAS_TARGET, enable_tuning=False)
             if enable_tuning:
-                bitblas_matmul.hardware_aware_finetune(topk=20)
+                with global_operator_cache.timer("tune", config):
+                    bitblas_matmul.hardware_aware_finetune(
+                        topk=20, options=TuningOptions(budget=self.tuning_budget))
                 global_operator_cache.add(config, bitblas_matmul)
                 global_operator_cache.save_into_database(BITBLAS_DATABASE_PATH, BITBLAS_TARGET)
                 print("BitBLAS Tuning done, appended operator to global_operator_cache.")
@@ -224,8 +244,8 @@ class Linear(nn.Module):
             print("BitBLAS Operator found in global_operator_cache.")
         return bitblas_matmul
 
-    def warmup(self, topk=20):
-        self.bitblas_matmul.hardware_aware_finetune(topk=topk)
+    def warmup(self, topk=20, budget: Optional[TuningBudget] = None):
+        self.bitblas_matmul.hardware_aware_finetune(topk=topk, options=TuningOptions(budget=budget))
 
     def forward(self, A, output=None):
         if A.dtype != torch.float16:
@@ -237,6 +257,8 @@ class Linear(nn.Module):
             output = torch.empty(
                 A.shape[:-1] + (self.out_features,), dtype=A.dtype, device=A.device)
         m = ctypes.c_int32(reduce(operator.mul, A.shape[:-1], 1))
+        if self.shape_trace is not None:
+            self.shape_trace.record(m.value)
         A = self.bitblas_matmul.transform_input(A)
         A_void = ctypes.c_void_p(A.data_ptr())
         # m is the product of the last n - 1 dimensions of A
@@ -12,7 +12,14 @@ import bitblas
 import ctypes
 from typing import List, Dict, Any, Optional
 import numpy as np
-from ..base import fast_tune, fast_tune_with_dynamic_range
+from ..base import (
+    fast_tune,
+    tune_dynamic_range_buckets,
+    apply_tuned_hints,
+)
+from ..base.utils import create_dispatch_mod
+from ..base.tuning_options import TuningOptions
+from ..base.roller.hint import Hint
 from copy import deepcopy
 from bitblas.base.roller.arch import get_arch
 from bitblas.wrapper import CUDASourceWrapper, CUDASourceWrapperWithDynamic
@@ -52,6 +59,8 @@ class Operator(ABC):
         self.arch = get_arch(target) if target else None
         self.dynamic_range = None
         self.pass_context: Dict = {}
+        # schedule hints of the tuned kernels, persisted to rebuild without profiling
+        self.tuning_records: Optional[List[Dict]] = None
         self.num_args = len(self.prim_func.params)
         self.function_handle = None
         self.num_output_args: int = (
@@ -166,11 +175,13 @@ class Operator(ABC):
                           func: PrimFunc,
                           target: Target,
                           topk: int = 20,
-                          parallel_build=True) -> IRModule:
-        _, best = fast_tune(func, target, topk=topk, parallel_build=parallel_build)
+                          parallel_build=True,
+                          options: Optional[TuningOptions] = None) -> IRModule:
+        _, best = fast_tune(func, target, topk=topk, parallel_build=parallel_build, options=options)
         if best is not None:
+            self.pass_context = best.config.pass_context or {}
+            self.tuning_records = [best.serialize()]
             return best.sch.mod
-        self.pass_context = best.config.pass_context
         return None
 
     def apply_fast_tuning_with_dynamic_range(
@@ -179,27 +190,67 @@ class Operator(ABC):
         target: Target,
         topk: int = 20,
         dynamic_range: Dict[str, List[int]] = None,
+        options: Optional[TuningOptions] = None,
     ):
-        optimized_mod = fast_tune_with_dynamic_range(
-            func, target, topk=topk, parallel_build=True, dynamic_range=dynamic_range)
-        if optimized_mod is not None:
-            return optimized_mod
-        return None
+        func, best_results = tune_dynamic_range_buckets(
+            func,
+            target,
+            topk=topk,
+            parallel_build=True,
+            dynamic_range=dynamic_range,
+            options=options)
+        if best_results is None:
+            return None
+        self.tuning_records = [best.serialize() for best in best_results]
+        return create_dispatch_mod(func.attrs["global_symbol"], func,
+                                   [best.sch.mod["main"] for best in best_results])
+
+    def apply_tuning_records(self, tuning_records: List[Dict], target: Target = None) -> bool:
+        """
+        Rebuild the operator from recorded schedule hints, skipping tuning and profiling.
+
+        Returns True if the runtime module was rebuilt.
+        """
+        if target is None:
+            target = self.target
+        hints = [Hint().deserialize(record["hint"], self.arch) for record in tuning_records]
+        func = self.prim_func
+        if self.dynamic_range is not None:
+            func = func.with_attr("opt_shapes", self.dynamic_range)
+        try:
+            with target:
+                optimized_func = apply_tuned_hints(func, hints)
+        except Exception as e:
+            logger.debug("Failed to apply tuning records: {}".format(e))
+            return False
+        if optimized_func is None:
+            return False
+        self.optimized_func = optimized_func
+        self.pass_context = hints[0].pass_context or {}
+        self.tuning_records = tuning_records
+        return self._build_runtime_module(target) is not None
 
     def hardware_aware_finetune(self,
                                 topk: int = 20,
                                 target: tvm.target.Target = None,
-                                parallel_build=True):
+                                parallel_build=True,
+                                options: Optional[TuningOptions] = None):
+        """
+        Tune the operator for the target. ``options`` (see
+        ``bitblas.base.tuning_options``) set the build pool, the seed hints,
+        the budget, the measurement policy, the journal and the cost model of
+        the search.
+        """
         if target is None:
             target = self.target
         dynamic_range = self.dynamic_range
         func = self.prim_func
         if dynamic_range is not None:
             self.optimized_func = self.apply_fast_tuning_with_dynamic_range(
-                func, target, topk, dynamic_range)
+                func, target, topk, dynamic_range, options=options)
         else:
             self.optimized_func = self.apply_fast_tuning(
-                func, target, topk, parallel_build=parallel_build)
+                func, target, topk, parallel_build=parallel_build, options=options)
         self._build_runtime_module(self.target)
 
     def get_profile_tensors(self, dynamic_symbolic_constrains: Optional[Dict] = None):
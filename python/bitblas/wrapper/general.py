@@ -4,6 +4,7 @@ import tvm
 from typing import Optional, List, Dict, Union
 from tvm import IRModule
 from bitblas import TileDevice
+from bitblas.base.dispatch import get_dispatch_table, get_dispatch_tree
 from tvm.runtime import ndarray
 from bitblas.utils import match_global_kernel
 import re
@@ -195,13 +196,14 @@ class CUDASourceWrapper(object):
                         self.grid_info["xyz".index(tag[-1])] = extent
 
     def get_dynamic_symbolic_set(self, prim_func):
-        # Determine the set of dynamic symbols used in the function
-        dynamic_symbolic_set = set()
+        # Determine the set of dynamic symbols used in the function, in order of
+        # appearance to match the order of the dynamic arguments of the kernels
+        dynamic_symbolic_set = []
         for param in prim_func.params:
             buffer = prim_func.buffer_map[param]
             for dim in buffer.shape:
-                if isinstance(dim, tvm.tir.Var):
-                    dynamic_symbolic_set.add(dim.name)
+                if isinstance(dim, tvm.tir.Var) and dim.name not in dynamic_symbolic_set:
+                    dynamic_symbolic_set.append(dim.name)
         return dynamic_symbolic_set
 
     def get_cuda_init_func(self):
@@ -338,8 +340,6 @@ extern "C" void init() {{
         # Analyze the function declaration to prepare for argument extraction
         dummy_declaration = code[index:].split(";")[0]
 
-        function_name = self.function_name
-
         # Identify the start of the function body to insert arguments
         index = code.index("{", index)
         function_args = []
@@ -383,10 +383,7 @@ extern "C" void init() {{
                 p = int(p)
             return str(p).replace("//", "/")
 
-        last_range = 0
-        num_items = len(function_informations)
-        _call_str = """"""
-        for function_name, info in function_informations.items():
+        def kernel_call_str(function_name, info):
             # Prepare block and grid configurations for kernel launches
             block_info, grid_info = info["block_info"], info["grid_info"]
             block_str = "dim3({}, {}, {})".format(
@@ -401,36 +398,42 @@ extern "C" void init() {{
             )
             # Handle dynamic shared memory specification
             smem_str = (0 if info["dynamic_smem_buf"] is None else info["dynamic_smem_buf"])
-            opt_shapes = info["opt_shapes"]
-            # Generate conditional kernel launch code based on dynamic symbolic ranges
-            (symbolic,) = list(dynamic_symbolic_set)
-            range_str = opt_shapes[symbolic]
-            if last_range == 0:
-                call_str = "if ({} <= {}) {{\n\t\t\t {}<<<{}, {}, {}, stream>>>({}); \n\t\t}}\n".format(
-                    symbolic,
-                    range_str,
-                    function_name,
-                    grid_str,
-                    block_str,
-                    smem_str,
-                    call_args,
-                )
-            else:
-                call_str = "\t\telse if ({} <= {}) {{\n\t\t\t {}<<<{}, {}, {}, stream>>>({}); \n\t\t}}\n".format(
-                    symbolic,
-                    range_str,
-                    function_name,
-                    grid_str,
-                    block_str,
-                    smem_str,
-                    call_args,
-                )
-            if last_range == num_items - 1:
-                call_str += (
-                    "\t\telse {{\n\t\t\t {}<<<{}, {}, {}, stream>>>({}); \n\t\t}}\n".format(
-                        function_name, grid_str, block_str, smem_str, call_args))
-            last_range += 1
-            _call_str += call_str
+            return "{}<<<{}, {}, {}, stream>>>({});".format(function_name, grid_str, block_str,
+                                                            smem_str, call_args)
+
+        # Map every point of the grid of the dynamic symbols to a kernel, the
+        # same way as the dispatch function of the module does
+        grid = (
+            self.prim_func.attrs["opt_shapes"]
+            if self.prim_func.attrs is not None and "opt_shapes" in self.prim_func.attrs else None)
+        axes, table = get_dispatch_table(
+            dynamic_symbolic_set,
+            [(function_name, info["opt_shapes"])
+             for function_name, info in function_informations.items()],
+            grid,
+        )
+
+        def dispatch_str(depth, point, indent):
+            # Generate the kernel launch code, one binary search per dynamic symbol
+            # so that the number of branches grows with the log of the buckets
+            if depth == len(dynamic_symbolic_set):
+                function_name = table[point]
+                return indent + kernel_call_str(function_name,
+                                                function_informations[function_name]) + "\n"
+            return search_str(depth, point, get_dispatch_tree(axes[depth]), indent)
+
+        def search_str(depth, point, tree, indent):
+            if isinstance(tree, int):
+                return dispatch_str(depth + 1, point + (axes[depth][tree],), indent)
+            bound, lhs, rhs = tree
+            dispatch = "{}if ({} <= {}) {{\n".format(indent, dynamic_symbolic_set[depth], bound)
+            dispatch += search_str(depth, point, lhs, indent + "\t")
+            dispatch += "{}}} else {{\n".format(indent)
+            dispatch += search_str(depth, point, rhs, indent + "\t")
+            dispatch += "{}}}\n".format(indent)
+            return dispatch
+
+        _call_str = dispatch_str(0, (), "\t\t")
 
         # Wrap the kernel dispatch logic in an external C function
         host_func = """
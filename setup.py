@@ -293,6 +293,9 @@ setup(
     ],
     package_data=package_data,
     include_package_data=True,
+    entry_points={
+        "console_scripts": ["bitblas=bitblas.cli:main"],
+    },
     data_files=[
         "requirements.txt",
     ],
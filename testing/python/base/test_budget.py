@@ -0,0 +1,100 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+import bitblas
+from bitblas import tvm
+from bitblas.base import TuningBudget, TuningOptions
+from bitblas.base import utils
+
+
+def test_max_builds():
+    budget = TuningBudget(max_builds=2)
+    budget.start()
+    assert budget.reserve_build()
+    assert budget.reserve_build()
+    assert not budget.reserve_build()
+    assert budget.exhausted()
+    # the first build of a tuning call is always granted
+    assert budget.reserve_build(force=True)
+    assert budget.builds == 3
+
+
+def test_deadline():
+    budget = TuningBudget(max_seconds=0.05)
+    assert not budget.time_exhausted()
+    budget.start()
+    deadline = budget.deadline
+    time.sleep(0.1)
+    budget.start()
+    assert budget.deadline == deadline
+    assert budget.time_exhausted()
+    assert not budget.reserve_build()
+
+
+def test_is_promising():
+    budget = TuningBudget(priority_ratio=1.5)
+    # nothing measured yet
+    assert budget.is_promising(100.0, None, None)
+    # 1 ms measured for a priority of 100
+    assert budget.is_promising(140.0, 0.01, 1.0)
+    assert not budget.is_promising(200.0, 0.01, 1.0)
+    # seeds have no priority
+    assert budget.is_promising(None, 0.01, 1.0)
+    assert TuningBudget().is_promising(1e6, 0.01, 1.0)
+
+
+class _OutOfOrderBuilder:
+    """Completes the builds in ``order`` once all of them are submitted."""
+
+    def __init__(self, order):
+        self.order = order
+        self.futures = {}
+
+    def submit(self, _, context):
+        idx = context[0]
+        self.futures[idx] = Future()
+        if len(self.futures) == len(self.order):
+            threading.Thread(target=self._complete).start()
+        return self.futures[idx]
+
+    def _complete(self):
+        for idx in self.order:
+            time.sleep(0.05)
+            self.futures[idx].set_result((idx, "", f"mod{idx}"))
+
+
+def test_out_of_order_builds(monkeypatch):
+    # config 2 has a poor priority, config 1 is the best one
+    latencies = [1.0, 0.5, 5.0]
+    configs = [SimpleNamespace(pass_context={}, priority=p) for p in [1.0, 1.2, 100.0]]
+
+    def _load_module(path):
+        latency = latencies[int(path[len("mod"):])]
+        evaluator = lambda *_: SimpleNamespace(mean=latency / 1e3)  # noqa: E731
+        return SimpleNamespace(entry_name="main", time_evaluator=lambda *_, **__: evaluator)
+
+    monkeypatch.setattr(utils, "_apply_config",
+                        lambda _, config: SimpleNamespace(mod=f"mod{configs.index(config)}"))
+    monkeypatch.setattr(utils, "get_compile_key", lambda mod, *_: mod)
+    monkeypatch.setattr(utils, "get_compile_cache_dir", lambda: None)
+    monkeypatch.setattr(utils, "get_dummy_input_arrays", lambda *_, **__: [])
+    monkeypatch.setattr(tvm.runtime, "load_module", _load_module)
+    arch = SimpleNamespace(target="cuda", device=SimpleNamespace(exist=True))
+
+    # config 2 completes before config 1 and is not promising, which must
+    # not cancel the build of config 1
+    cpresults, best = utils.apply_and_build_parallel(
+        None,
+        configs,
+        arch,
+        options=TuningOptions(
+            builder=_OutOfOrderBuilder([0, 2, 1]), budget=TuningBudget(priority_ratio=1.5)))
+    assert [cpresult.config for cpresult in cpresults] == [configs[0], configs[1]]
+    assert best.config is configs[1]
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,57 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import os
+import bitblas
+from bitblas.base import compile_cache
+from bitblas.base.compile_cache import lookup_compiled, store_compiled, clear_compile_cache
+from bitblas.base.disk_cache import cache_size_in_bytes, trim_cache
+
+ENTRY_BYTES = 1 << 10
+
+
+def _store(cache_dir, tmp_path, key, max_bytes=None):
+    artifact_path = os.path.join(str(tmp_path), f"{key}.tar")
+    with open(artifact_path, "wb") as f:
+        f.write(b"x" * ENTRY_BYTES)
+    return store_compiled(cache_dir, key, "code", artifact_path, max_bytes)
+
+
+def _set_mtime(cache_dir, key, mtime):
+    os.utime(os.path.join(cache_dir, key[:2], key), (mtime, mtime))
+
+
+def test_trim_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    keys = [f"{i:02d}" * 32 for i in range(4)]
+    for mtime, key in enumerate(keys):
+        _store(cache_dir, tmp_path, key)
+        _set_mtime(cache_dir, key, mtime)
+    # a lookup marks the oldest entry as the most recently used
+    assert lookup_compiled(cache_dir, keys[0]) is not None
+
+    entry_bytes = cache_size_in_bytes(cache_dir) // len(keys)
+    assert trim_cache(cache_dir, 2 * entry_bytes) == 2 * entry_bytes
+    cached = [lookup_compiled(cache_dir, key) is not None for key in keys]
+    assert cached == [True, False, False, True]
+    # no retired entry is left behind
+    assert sorted(os.listdir(os.path.join(cache_dir, keys[0][:2]))) == [keys[0]]
+
+
+def test_store_trims(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(compile_cache, "_stores", 0)
+    _store(cache_dir, tmp_path, "aa" * 32)
+    _store(cache_dir, tmp_path, "bb" * 32, max_bytes=0)
+    # the first store of a process trims the cache, before publishing its entry
+    monkeypatch.setattr(compile_cache, "_stores", 0)
+    _store(cache_dir, tmp_path, "cc" * 32, max_bytes=0)
+    assert lookup_compiled(cache_dir, "aa" * 32) is None
+    assert lookup_compiled(cache_dir, "bb" * 32) is None
+    assert lookup_compiled(cache_dir, "cc" * 32) is not None
+
+    clear_compile_cache(cache_dir)
+    assert cache_size_in_bytes(cache_dir) == 0
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
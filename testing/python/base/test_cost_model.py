@@ -0,0 +1,136 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import math
+import numpy as np
+import bitblas
+from bitblas import tvm
+from bitblas.base import MeasurementLog
+from bitblas.base.roller import CUDA, DefaultPolicy, Hint, RidgeCostModel, RooflineCostModel
+from bitblas.ops.impl.matmul_impl import matmul_nt
+
+
+def _arch():
+    return CUDA(tvm.target.Target("cuda -arch=sm_80"), profile="sm_80")
+
+
+def _hint(**features):
+    hint = Hint()
+    hint.features = {
+        "flops": 2.0 * 1024 * 1024 * 1024,
+        "global_bytes": 64.0 * 1024 * 1024,
+        "block_bytes": 256.0 * 1024,
+        "unique_bytes": 6.0 * 1024 * 1024,
+        "smem_bytes": 32.0 * 1024,
+        "reg_usage": 8192.0,
+        "grid_size": 256.0,
+        "block_per_SM": 2.0,
+        "num_wave": 2.0,
+        "threads": 128.0,
+        "pipeline_stage": 2.0,
+        "use_async": 1.0,
+        "use_tc": 1.0,
+        "vector_bytes": 16.0,
+        "rasterization": 0.0,
+        "bits": 16.0,
+        **features,
+    }
+    return hint
+
+
+def test_roofline_predictions():
+    model = RooflineCostModel(_arch())
+    base = model.predict([_hint()])[0]
+    assert 0 < base < math.inf
+    # less traffic, wider accesses and a rasterized grid are not slower
+    assert model.predict([_hint(global_bytes=32.0 * 1024 * 1024)])[0] <= base
+    assert model.predict([_hint(vector_bytes=2.0)])[0] >= base
+    assert model.predict([_hint(rasterization=8.0)])[0] <= base
+    # a grid leaving most SMs idle in its last wave
+    tail = model.predict([_hint(grid_size=120.0, block_per_SM=1.0)])[0]
+    assert tail > model.predict([_hint(grid_size=108.0, block_per_SM=1.0)])[0]
+    # the same work without tensor cores
+    assert model.predict([_hint(use_tc=0.0)])[0] > base
+
+
+def test_rank():
+    model = RooflineCostModel(_arch())
+    fast, slow, seed = _hint(rasterization=8.0), _hint(vector_bytes=2.0), Hint()
+    assert model.predict([seed]) == [math.inf]
+    assert model.rank([seed, slow, fast]) == [fast, slow, seed]
+    assert model.rank([seed, slow, fast], topk=1) == [fast]
+
+
+def test_policy_features():
+    arch = _arch()
+    func = matmul_nt(1024, 1024, 1024)["main"]
+    configs = DefaultPolicy(func=func, arch=arch).emit_config(8)
+    assert configs
+    for config in configs:
+        assert config.features["flops"] == 2.0 * 1024**3
+        assert config.features["grid_size"] >= 1
+        # the features survive the serialization of the hint
+        assert Hint().deserialize(config.serialize()).features == config.features
+    ranked = RooflineCostModel(arch).rank(configs)
+    assert sorted(map(id, ranked)) == sorted(map(id, configs))
+
+
+def _random_hints(rng, count):
+    return [
+        _hint(
+            global_bytes=float(rng.uniform(8, 128)) * 1024 * 1024,
+            grid_size=float(rng.integers(64, 1024)),
+            threads=float(rng.choice([64, 128, 256])),
+            vector_bytes=float(rng.choice([2, 4, 8, 16])),
+            rasterization=float(rng.choice([0, 8]))) for _ in range(count)
+    ]
+
+
+def test_ridge_cost_model():
+    arch = _arch()
+    rng = np.random.default_rng(0)
+    # the device runs twice as slow as the roofline, plus noise
+    hints = _random_hints(rng, 64)
+    latencies = [
+        2 * latency * float(rng.uniform(0.95, 1.05))
+        for latency in RooflineCostModel(arch).predict(hints)
+    ]
+
+    model = RidgeCostModel(arch, min_samples=16)
+    # untrained, it ranks with the roofline model
+    assert model.predict(hints[:4]) == RooflineCostModel(arch).predict(hints[:4])
+    model.update(hints[:8], latencies[:8])
+    assert not model.trained
+    model.update(hints[8:], latencies[8:])
+    assert model.trained and model.num_samples == 64
+
+    test_hints = _random_hints(rng, 16)
+    expected = [2 * latency for latency in RooflineCostModel(arch).predict(test_hints)]
+    for prediction, latency in zip(model.predict(test_hints), expected):
+        assert abs(prediction / latency - 1) < 0.1
+    assert model.predict([Hint()]) == [math.inf]
+
+
+def test_train_from_log(tmp_path):
+    arch = _arch()
+    rng = np.random.default_rng(1)
+    hints = _random_hints(rng, 32)
+    log = MeasurementLog(str(tmp_path / "measurements.jsonl"))
+    for hint, latency in zip(hints, RooflineCostModel(arch).predict(hints)):
+        log.record("sm_80", "func", {"m": 16}, {"hint": hint.serialize(), "latency": latency})
+    # predictions and other architectures are not trained on
+    log.record("sm_80", "func", {}, {
+        "hint": hints[0].serialize(),
+        "latency": 1.0,
+        "stats": {
+            "predicted": True
+        }
+    })
+    log.record("sm_90", "func", {}, {"hint": hints[0].serialize(), "latency": 1.0})
+    assert len(log) == 34
+
+    model = RidgeCostModel(arch).fit_log(MeasurementLog(log.path))
+    assert model.trained and model.num_samples == 32
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
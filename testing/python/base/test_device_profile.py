@@ -0,0 +1,56 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import json
+import bitblas
+from bitblas import tvm
+from bitblas.base.roller.arch import (
+    CUDA,
+    get_device_profile,
+    load_device_profiles,
+    register_device_profile,
+)
+
+
+def test_builtin_profiles():
+    for arch in ["sm_70", "sm_75", "sm_80", "sm_86", "sm_89", "sm_90"]:
+        profile = get_device_profile(arch)
+        assert profile["compute_max_core"] > 0
+        assert profile["smem_cap"] > 0
+        assert profile["l2_cache_size_bytes"] > 0
+    assert get_device_profile("sm_1000") is None
+
+
+def test_load_device_profiles(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    with open(path, "w") as f:
+        json.dump({"sm_87": {"name": "Jetson Orin", "compute_max_core": 16}}, f)
+    load_device_profiles(path)
+    profile = get_device_profile("sm_87")
+    assert profile["compute_max_core"] == 16
+    # the missing attributes are the common ones
+    assert profile["warp_size"] == 32
+
+    # registered attributes override the builtin ones
+    register_device_profile("sm_80", {"compute_max_core": 100})
+    assert get_device_profile("sm_80")["compute_max_core"] == 100
+    assert get_device_profile("sm_80")["name"] == "A100"
+    register_device_profile("sm_80", {})
+
+
+def test_cuda_from_profile():
+    arch = CUDA(tvm.target.Target("cuda -arch=sm_80"), profile="sm_80")
+    assert arch.profile is not None
+    assert arch.compute_max_core == 108
+    assert arch.compute_capability == "80"
+    assert arch.max_smem_usage == 2 * arch.smem_cap
+
+    arch = CUDA(
+        tvm.target.Target("cuda -arch=sm_80"),
+        profile={
+            **get_device_profile("sm_80"), "compute_max_core": 64
+        })
+    assert arch.compute_max_core == 64
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
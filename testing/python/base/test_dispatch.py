@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+import tvm
+from tvm.script import tir as T
+from bitblas.base.dispatch import (
+    ShapeTrace,
+    get_dispatch_table,
+    get_dispatch_tree,
+    select_dynamic_buckets,
+    select_grid_points,
+)
+from bitblas.base.utils import create_dispatch_mod
+
+
+@T.prim_func
+def copy(a: T.handle, b: T.handle):
+    m = T.int32()
+    n = T.int32()
+    A = T.match_buffer(a, (m, n), "float16")
+    B = T.match_buffer(b, (m, n), "float16")
+    for i, j in T.grid(m, n):
+        with T.block("B"):
+            vi, vj = T.axis.remap("SS", [i, j])
+            B[vi, vj] = A[vi, vj]
+
+
+def _search(tree, value):
+    while not isinstance(tree, int):
+        bound, lhs, rhs = tree
+        tree = lhs if value <= bound else rhs
+    return tree
+
+
+def test_get_dispatch_tree():
+    assert get_dispatch_tree([1]) == 0
+    values = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192]
+    tree = get_dispatch_tree(values)
+    for value in range(0, 10000, 7):
+        # the smallest bucket covering the value, the last one beyond the range
+        expected = next((i for i, v in enumerate(values) if value <= v), len(values) - 1)
+        assert _search(tree, value) == expected
+
+    def depth(tree):
+        return 0 if isinstance(tree, int) else 1 + max(depth(tree[1]), depth(tree[2]))
+
+    assert depth(tree) == 4
+
+
+def test_select_grid_points():
+    grid = {"m": [1, 16, 256, 4096], "n": [128, 1024, 8192]}
+    assert len(select_grid_points(grid)) == 12
+    points = select_grid_points(grid, max_points=4)
+    assert len(points) == 4
+    # the extreme corners are always tuned
+    assert {"m": 1, "n": 128} in points
+    assert {"m": 4096, "n": 8192} in points
+
+
+def test_get_dispatch_table_nearest():
+    specialized = [("k_1_128", {"m": 1, "n": 128}), ("k_4096_8192", {"m": 4096, "n": 8192})]
+    grid = {"m": [1, 16, 4096], "n": [128, 8192]}
+    axes, table = get_dispatch_table(["m", "n"], specialized, grid)
+    assert axes == [[1, 16, 4096], [128, 8192]]
+    assert table[(1, 128)] == "k_1_128"
+    assert table[(16, 128)] == "k_1_128"
+    assert table[(4096, 8192)] == "k_4096_8192"
+    assert table[(4096, 128)] in ("k_1_128", "k_4096_8192")
+
+
+def test_select_dynamic_buckets():
+    # decoding dominates, prefill is rare
+    histogram = {1: 10000, 2: 50, 16: 300, 17: 200, 512: 10, 4096: 1}
+    # more buckets than candidates: a 32 bucket would cost 17 more than the
+    # overflow of the larger values does on the 16 bucket
+    assert select_dynamic_buckets(histogram, 8) == [1, 2, 16]
+    buckets = select_dynamic_buckets(histogram, 3)
+    assert len(buckets) == 3 and buckets[0] == 1
+    # the raw values work as well
+    assert select_dynamic_buckets([1, 1, 1, 16, 16], 1) == [1]
+    assert select_dynamic_buckets([4, 4, 4, 64], 2, candidates=[4, 64, 128]) == [4, 64]
+    # the values overflowing the last bucket run on it, 149 costs less on
+    # 144 than 142 does on 160
+    assert select_dynamic_buckets({142: 26, 149: 22}, 3) == [144]
+
+
+def test_shape_trace(tmp_path):
+    trace = ShapeTrace()
+    for m in [1, 1, 1, 16]:
+        trace.record(m)
+    path = str(tmp_path / "trace.json")
+    trace.save(path)
+    loaded = ShapeTrace.load(path)
+    assert loaded.histogram == {1: 3, 16: 1}
+    assert select_dynamic_buckets(loaded, 2) == [1, 16]
+
+
+def test_create_dispatch_mod_multiple_symbols():
+    func = copy.with_attr("opt_shapes", {"m": [1, 16], "n": [128, 1024]})
+    specialized = [
+        copy.with_attr("opt_shapes", {
+            "m": m,
+            "n": n
+        }) for m, n in [(1, 128), (16, 128), (16, 1024)]
+    ]
+    mod = create_dispatch_mod("copy", func, specialized)
+    assert len(mod.functions) == 4
+    calls = []
+    tvm.tir.stmt_functor.post_order_visit(
+        mod["copy"].body, lambda node: calls.append(node)
+        if isinstance(node, tvm.tir.Evaluate) else None)
+    # (1, 1024) was not specialized and reuses the kernel of a neighbour
+    assert len(calls) == 4
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
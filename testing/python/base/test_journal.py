@@ -0,0 +1,32 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+from bitblas.base import TuningJournal
+
+
+def test_journal_resume(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    journal = TuningJournal(path)
+    record = {"hint": {"block": [16, 128]}, "latency": 0.1}
+    journal.record_candidate("func", {"m": 16}, record)
+    journal.record_candidate("func", {"m": 16}, {**record, "latency": 0.2})
+    journal.record_best("func", {"m": 16}, record)
+    journal.record_candidate("func", {"m": 32}, record)
+    assert journal.lookup_best("func", {"m": 16}) == record
+    assert journal.lookup_best("func", {"m": 32}) is None
+
+    # an interrupted write leaves a partial line behind
+    with open(path, "a") as f:
+        f.write('{"type": "best", "func": "func", "po')
+
+    resumed = TuningJournal(path)
+    assert len(resumed) == 1
+    assert resumed.num_candidates == 3
+    assert resumed.lookup_best("func", {"m": 16}) == record
+    assert resumed.lookup_best("func", {"m": 32}) is None
+    resumed.record_best("func", {"m": 32}, record)
+    assert TuningJournal(path).lookup_best("func", {"m": 32}) == record
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,57 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+from bitblas.base import MeasurementPolicy
+from bitblas.base.measure import latency_stats
+
+
+class _Result:
+
+    def __init__(self, results):
+        self.results = results
+
+
+class _FakeModule:
+    """Returns the given per-sample latencies (in seconds), one batch per timed call."""
+    entry_name = "main"
+
+    def __init__(self, batches, warmup):
+        self.batches = list(batches)
+        self.warmup = warmup
+        self.warmups = 0
+
+    def time_evaluator(self, name, device, number=1, repeat=1):
+
+        def evaluate(*args):
+            if number == self.warmup:
+                self.warmups += 1
+                return _Result([0.0])
+            return _Result(self.batches.pop(0)[:repeat])
+
+        return evaluate
+
+
+def test_latency_stats():
+    stats = latency_stats([1.0, 1.0, 1.0, 1.0, 10.0], "median")
+    assert stats["latency"] == 1.0
+    assert stats["max"] == 10.0
+    assert stats["cv"] > 1.0
+    stats = latency_stats([1.0, 2.0, 3.0, 4.0, 100.0], "trimmed_mean", trim_ratio=0.2)
+    assert stats["latency"] == 3.0
+    assert latency_stats([1.0, 3.0], "mean")["latency"] == 2.0
+
+
+def test_measure_remeasures_noisy_samples():
+    noisy = [1e-3, 5e-3, 1e-3, 9e-3, 1e-3]
+    steady = [1e-3] * 5
+    module = _FakeModule([noisy, steady], warmup=2)
+    policy = MeasurementPolicy(warmup=2, number=3, repeat=5, max_cv=0.05, max_remeasure=2)
+    stats = policy.measure(module, None, [])
+    assert stats["remeasured"] == 1
+    assert stats["cv"] == 0.0
+    assert abs(stats["latency"] - 1.0) < 1e-9
+    assert module.warmups == 2
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import os
+import bitblas
+from bitblas import tvm
+from bitblas.base import set_policy_cache_dir, get_policy_cache_dir
+from bitblas.base import policy_cache
+from bitblas.base.policy_cache import (
+    emit_config_cached,
+    lookup_policy_result,
+    store_policy_result,
+    clear_policy_cache,
+)
+from bitblas.base.disk_cache import cache_size_in_bytes
+from bitblas.base.roller import CUDA, DefaultPolicy
+from bitblas.base.roller.arch import get_device_profile
+from bitblas.ops.impl.matmul_impl import matmul_nt
+
+
+class CountingPolicy(DefaultPolicy):
+    calls = 0
+
+    def emit_config(self, topk):
+        CountingPolicy.calls += 1
+        return super().emit_config(topk)
+
+
+def test_emit_config_cached(tmp_path):
+    previous = get_policy_cache_dir()
+    set_policy_cache_dir(str(tmp_path))
+    try:
+        arch = CUDA(tvm.target.Target("cuda -arch=sm_80"), profile="sm_80")
+        CountingPolicy.calls = 0
+        cold = emit_config_cached(CountingPolicy, matmul_nt(256, 512, 1024)["main"], arch, 8)
+        # an identical function on the same device skips the policy
+        warm = emit_config_cached(CountingPolicy, matmul_nt(256, 512, 1024)["main"], arch, 8)
+        assert CountingPolicy.calls == 1
+        assert [hint.serialize() for hint in warm] == [hint.serialize() for hint in cold]
+        assert [hint.priority for hint in warm] == [hint.priority for hint in cold]
+        assert all(hint.arch is arch for hint in warm)
+
+        # another topk, shape or device misses
+        emit_config_cached(CountingPolicy, matmul_nt(256, 512, 1024)["main"], arch, 4)
+        emit_config_cached(CountingPolicy, matmul_nt(256, 512, 2048)["main"], arch, 8)
+        other_arch = CUDA(
+            tvm.target.Target("cuda -arch=sm_80"),
+            profile={
+                **get_device_profile("sm_80"), "compute_max_core": 64
+            })
+        emit_config_cached(CountingPolicy, matmul_nt(256, 512, 1024)["main"], other_arch, 8)
+        assert CountingPolicy.calls == 4
+
+        # a disabled cache always runs the policy
+        set_policy_cache_dir(None)
+        emit_config_cached(CountingPolicy, matmul_nt(256, 512, 1024)["main"], arch, 8)
+        assert CountingPolicy.calls == 5
+    finally:
+        set_policy_cache_dir(previous)
+
+
+def test_store_trims(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    arch = CUDA(tvm.target.Target("cuda -arch=sm_80"), profile="sm_80")
+    keys = [f"{i:02d}" * 32 for i in range(3)]
+    for mtime, key in enumerate(keys[:2]):
+        store_policy_result(cache_dir, key, [])
+        entry_path = os.path.join(cache_dir, key[:2], key + ".json")
+        os.utime(entry_path, (mtime, mtime))
+    # a lookup marks the oldest entry as the most recently used
+    assert lookup_policy_result(cache_dir, keys[0], arch) == []
+
+    # the first store of a process trims the cache, before publishing its entry
+    monkeypatch.setattr(policy_cache, "_stores", 0)
+    store_policy_result(cache_dir, keys[2], [], max_bytes=cache_size_in_bytes(cache_dir) // 2)
+    cached = [lookup_policy_result(cache_dir, key, arch) is not None for key in keys]
+    assert cached == [True, False, True]
+
+    clear_policy_cache(cache_dir)
+    assert cache_size_in_bytes(cache_dir) == 0
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
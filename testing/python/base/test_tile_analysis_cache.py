@@ -0,0 +1,118 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+from bitblas import tvm
+from tvm.script import tir as T
+from bitblas.base.roller import CUDA, DefaultPolicy, PrimFuncNode, clear_tile_analysis_cache
+from bitblas.base.roller.arch import get_device_profile
+from bitblas.ops.impl.matmul_impl import matmul_nt
+
+
+def _arch():
+    return CUDA(tvm.target.Target("cuda -arch=sm_80"), profile="sm_80")
+
+
+def _emit(func, topk=8):
+    configs = DefaultPolicy(func=func, arch=_arch()).emit_config(topk)
+    return [config.serialize() for config in configs]
+
+
+def test_memoized_configs_match():
+    func = matmul_nt(256, 512, 1024)["main"]
+    clear_tile_analysis_cache()
+    cold = _emit(func)
+    # a new policy over an identical function reuses the memoized analyses
+    warm = _emit(matmul_nt(256, 512, 1024)["main"])
+    assert cold == warm
+
+
+def test_shared_between_nodes():
+    clear_tile_analysis_cache()
+    lhs = PrimFuncNode(matmul_nt(256, 512, 1024)["main"])
+    rhs = PrimFuncNode(matmul_nt(256, 512, 1024)["main"])
+    other = PrimFuncNode(matmul_nt(256, 512, 2048)["main"])
+    calls = []
+
+    def _compute():
+        calls.append(1)
+        return len(calls)
+
+    assert lhs.memoize("test", 0, _compute) == 1
+    assert rhs.memoize("test", 0, _compute) == 1
+    assert other.memoize("test", 0, _compute) == 2
+
+    shapes, _ = lhs.propagate([16, 16], {"k": 32})
+    # the memoized shapes are not modified through the returned copies
+    for shape in shapes.values():
+        shape.append(0)
+    assert rhs.propagate([16, 16], {"k": 32})[0] != shapes
+
+
+@T.prim_func
+def matmul_abc(a: T.handle, b: T.handle, c: T.handle):
+    A = T.match_buffer(a, (128, 128), "float16")
+    B = T.match_buffer(b, (128, 128), "float16")
+    C = T.match_buffer(c, (128, 128), "float16")
+    for i, j, k in T.grid(128, 128, 128):
+        with T.block("matmul"):
+            vi, vj, vk = T.axis.remap("SSR", [i, j, k])
+            with T.init():
+                C[vi, vj] = T.float16(0)
+            C[vi, vj] = C[vi, vj] + A[vi, vk] * B[vj, vk]
+
+
+@T.prim_func
+def matmul_xwy(x: T.handle, w: T.handle, y: T.handle):
+    X = T.match_buffer(x, (128, 128), "float16")
+    W = T.match_buffer(w, (128, 128), "float16")
+    Y = T.match_buffer(y, (128, 128), "float16")
+    for i, j, k in T.grid(128, 128, 128):
+        with T.block("matmul"):
+            vi, vj, vk = T.axis.remap("SSR", [i, j, k])
+            with T.init():
+                Y[vi, vj] = T.float16(0)
+            Y[vi, vj] = Y[vi, vj] + X[vi, vk] * W[vj, vk]
+
+
+def test_buffer_names():
+    # structural equality ignores the buffer names the analyses are keyed by
+    assert tvm.ir.structural_equal(matmul_abc, matmul_xwy)
+    clear_tile_analysis_cache()
+    abc, xwy = PrimFuncNode(matmul_abc), PrimFuncNode(matmul_xwy)
+    rstep = {axis.var.name: 32 for axis in abc.raxis}
+    abc_shapes, _ = abc.propagate([16, 16], rstep)
+    xwy_shapes, _ = xwy.propagate([16, 16], rstep)
+    assert {"A", "B"} <= set(abc_shapes) and not {"X", "W"} & set(abc_shapes)
+    assert {"X", "W"} <= set(xwy_shapes) and not {"A", "B"} & set(xwy_shapes)
+
+
+class CountingPolicy(DefaultPolicy):
+    calls = 0
+
+    def compute_node_stride_map(self, node, td):
+        CountingPolicy.calls += 1
+        return super().compute_node_stride_map(node, td)
+
+
+def test_stride_map_key():
+    func = matmul_nt(256, 512, 1024)["main"]
+    clear_tile_analysis_cache()
+    CountingPolicy.calls = 0
+    CountingPolicy(func=func, arch=_arch()).emit_config(8)
+    cold_calls = CountingPolicy.calls
+    assert cold_calls > 0
+    CountingPolicy(func=func, arch=_arch()).emit_config(8)
+    assert CountingPolicy.calls == cold_calls
+    # another device or other tags do not reuse the stride maps
+    other_arch = CUDA(
+        tvm.target.Target("cuda -arch=sm_80"),
+        profile={
+            **get_device_profile("sm_80"), "warp_size": 64
+        })
+    CountingPolicy(func=func, arch=other_arch).emit_config(8)
+    assert CountingPolicy.calls > cold_calls
+    assert PrimFuncNode(func, {"pipeline_stage": 2}).tags_key() != PrimFuncNode(func).tags_key()
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,115 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import json
+import multiprocessing
+import os
+import bitblas
+from bitblas.cache.database import DirectoryDatabase
+
+ARCH_STR = "cuda-sm_80"
+HASH_STR = "0" * 64
+PAYLOAD_FILES = ["source.cu", "kernel.tar"]
+PAYLOAD_BYTES = 1 << 20
+
+
+def _payload(version: int) -> str:
+    # a file cut short does not end with its marker
+    return f"{version}:" + "x" * PAYLOAD_BYTES + ":end"
+
+
+def _record(version: int):
+    return {
+        "config_type": "MatmulConfig",
+        "operator_type": "Matmul",
+        "config": {
+            "M": 1
+        },
+        "version": version,
+    }
+
+
+def _save(database_path: str, staging_root: str, version: int, overwrite: bool = False):
+    artifact_dir = os.path.join(staging_root, f"artifacts_{version}")
+    os.makedirs(artifact_dir, exist_ok=True)
+    for file in PAYLOAD_FILES:
+        with open(os.path.join(artifact_dir, file), "w") as f:
+            f.write(_payload(version))
+    DirectoryDatabase(database_path, ARCH_STR).save(
+        HASH_STR, _record(version), artifact_dir, overwrite=overwrite)
+
+
+def _writer(database_path, staging_root, version, barrier):
+    barrier.wait()
+    _save(database_path, staging_root, version)
+
+
+def _rewriter(database_path, staging_root, versions):
+    for version in range(versions):
+        _save(database_path, staging_root, version, overwrite=True)
+
+
+def _read_entry(database_path: str):
+    """The version of the published entry, None if there is none right now."""
+    database = DirectoryDatabase(database_path, ARCH_STR)
+    if database.lookup(HASH_STR) is None:
+        return None
+    try:
+        artifacts = database.load_artifacts(HASH_STR)
+        # an entry is complete: all its files, each written to the end
+        assert set(PAYLOAD_FILES + ["mapping.json", "MatmulConfig.json"]) <= set(artifacts)
+        with open(artifacts["mapping.json"]) as f:
+            version = json.load(f)["version"]
+        for file in PAYLOAD_FILES:
+            with open(artifacts[file]) as f:
+                content = f.read()
+            assert content == _payload(int(content.split(":", 1)[0]))
+    except FileNotFoundError:
+        # replaced by the writer while being read
+        return None
+    return version
+
+
+def _published_names(database_path: str):
+    arch_path = os.path.join(database_path, ARCH_STR)
+    return sorted(name for name in os.listdir(arch_path) if name != DirectoryDatabase.LOCK_FILE)
+
+
+def test_concurrent_writers(tmp_path):
+    database_path = str(tmp_path / "database")
+    num_writers = 8
+    barrier = multiprocessing.Barrier(num_writers)
+    writers = [
+        multiprocessing.Process(
+            target=_writer, args=(database_path, str(tmp_path), version, barrier))
+        for version in range(num_writers)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert all(writer.exitcode == 0 for writer in writers)
+
+    # a single entry is published and no staging directory is left behind
+    assert _published_names(database_path) == [HASH_STR, "index.json"]
+    version = _read_entry(database_path)
+    assert version in range(num_writers)
+    assert DirectoryDatabase(database_path, ARCH_STR).entries()[HASH_STR]["version"] == version
+
+
+def test_reader_racing_writer(tmp_path):
+    database_path = str(tmp_path / "database")
+    versions = 20
+    writer = multiprocessing.Process(
+        target=_rewriter, args=(database_path, str(tmp_path), versions))
+    writer.start()
+    while writer.is_alive():
+        # asserts that the entry read is complete
+        _read_entry(database_path)
+    writer.join()
+    assert writer.exitcode == 0
+    assert _read_entry(database_path) == versions - 1
+    assert _published_names(database_path) == [HASH_STR, "index.json"]
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
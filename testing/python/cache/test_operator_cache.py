@@ -254,7 +254,7 @@ def test_global_cache_save_to_database(
     assert os.path.exists(database_path)
     global_operator_cache.clear()
     assert global_operator_cache.size() == 0
-    global_operator_cache.load_from_database(database_path, target=target)
+    global_operator_cache.load_from_database(database_path, target=target, lazy=False)
     assert global_operator_cache.size() > 0
 
     matmul = global_operator_cache.get(matmul.config)
@@ -285,6 +285,231 @@ def test_global_cache_save_to_database(
     torch.testing.assert_close(permuted_inputs[-1], ref_result, rtol=1e-2, atol=1e-2)
 
 
+@pytest.mark.parametrize(
+    "M,N,K,A_dtype,out_dtype,accum_dtype,with_bias,propagate_a,propagate_b,layout,database_path",
+    [
+        (1, 1024, 1024, "float16", "float16", "float16", False, False, False, "nt",
+         "debug/test_database"),
+        ([1, 32], 1024, 1024, "float16", "float16", "float16", False, False, False, "nt",
+         "debug/test_database"),
+        # single file sqlite backend
+        (1, 1024, 1024, "float16", "float16", "float16", False, False, False, "nt",
+         "debug/test_database.db"),
+        ([1, 32], 1024, 1024, "float16", "float16", "float16", False, False, False, "nt",
+         "debug/test_database.db"),
+    ],
+)
+def test_global_cache_lazy_load_from_database(
+    M,
+    N,
+    K,
+    A_dtype,
+    out_dtype,
+    accum_dtype,
+    with_bias,
+    propagate_a,
+    propagate_b,
+    layout,
+    database_path,
+):
+    matmul_config = bitblas.MatmulConfig(
+        M=M,
+        N=N,
+        K=K,
+        A_dtype=A_dtype,
+        W_dtype=A_dtype,
+        out_dtype=out_dtype,
+        accum_dtype=accum_dtype,
+        with_bias=with_bias,
+        propagate_a=propagate_a,
+        propagate_b=propagate_b,
+        layout=layout,
+    )
+    matmul = bitblas.Matmul(
+        config=matmul_config,
+        target=target,
+    )
+    global_operator_cache.clear()
+    global_operator_cache.add(matmul.config, matmul)
+    global_operator_cache.save_into_database(database_path, target=target)
+    global_operator_cache.clear()
+
+    # attaching the database only reads the index
+    global_operator_cache.load_from_database(database_path, target=target)
+    assert global_operator_cache.size() == 0
+    assert global_operator_cache.exists(matmul.config)
+
+    # the requested operator is loaded on the first lookup
+    matmul = global_operator_cache.get(matmul.config)
+    assert matmul is not None
+    assert global_operator_cache.size() == 1
+
+
+def test_global_cache_eviction():
+    database_path = "debug/test_database_eviction"
+    configs = [
+        bitblas.MatmulConfig(M=1, N=N, K=1024, A_dtype="float16", W_dtype="float16")
+        for N in [1024, 2048]
+    ]
+    global_operator_cache.clear()
+    for config in configs:
+        global_operator_cache.add(config, bitblas.Matmul(config=config, target=target))
+    global_operator_cache.save_into_database(database_path, target=target)
+    global_operator_cache.clear()
+    global_operator_cache.load_from_database(database_path, target=target)
+    global_operator_cache.set_capacity(max_entries=1)
+
+    assert global_operator_cache.get(configs[0]) is not None
+    assert global_operator_cache.get(configs[1]) is not None
+    assert global_operator_cache.size() == 1
+    # evicted operators are re-loaded from the database
+    assert global_operator_cache.get(configs[0]) is not None
+    assert global_operator_cache.size() == 1
+
+    # pinned operators are never evicted
+    global_operator_cache.pin(configs[0])
+    assert global_operator_cache.get(configs[1]) is not None
+    assert configs[0] in global_operator_cache.cache
+    global_operator_cache.set_capacity()
+    global_operator_cache.clear()
+
+
+def test_cache_size_estimate(monkeypatch):
+    from types import SimpleNamespace
+    from bitblas.cache import operator as operator_cache
+
+    sources = []
+
+    def _operator(source):
+
+        def get_source():
+            sources.append(source)
+            return source
+
+        kernel = SimpleNamespace(get_source=get_source)
+        return SimpleNamespace(rt_mod=SimpleNamespace(imported_modules=[kernel]))
+
+    warnings = []
+    monkeypatch.setattr(operator_cache.logger, "warning", warnings.append)
+    configs = [
+        bitblas.MatmulConfig(M=1, N=N, K=1024, A_dtype="float16", W_dtype="float16")
+        for N in [1024, 2048, 4096]
+    ]
+    cache = operator_cache.OperatorCache(max_bytes=8)
+    op_inst = _operator("a" * 6)
+    cache.add(configs[0], op_inst)
+    cache.add(configs[0], op_inst)
+    # the size of an operator is estimated once
+    assert cache.size_in_bytes() == 6
+    assert sources == ["a" * 6]
+
+    # without a database nothing can be evicted, which is warned about once
+    cache.add(configs[1], _operator("b" * 6))
+    cache.add(configs[2], _operator("c" * 6))
+    assert cache.size() == 3
+    assert len(warnings) == 1
+
+
+@pytest.mark.parametrize("M", [1, [1, 32]])
+def test_global_cache_rebuild_from_tuning_records(M):
+    database_path = "debug/test_database_rebuild"
+    config = bitblas.MatmulConfig(M=M, N=1024, K=1024, A_dtype="float16", W_dtype="float16")
+    matmul = bitblas.Matmul(config=config, target=target, enable_tuning=True)
+    assert matmul.tuning_records is not None
+    global_operator_cache.clear()
+    global_operator_cache.add(config, matmul)
+    global_operator_cache.save_into_database(database_path, target=target)
+    global_operator_cache.clear()
+
+    # recompiles the stored hints, without tuning
+    assert global_operator_cache.rebuild_database(database_path, target=target) >= 1
+    global_operator_cache.load_from_database(database_path, target=target)
+    rebuilt = global_operator_cache.get(config)
+    assert rebuilt is not None
+    assert rebuilt.tuning_records == matmul.tuning_records
+    global_operator_cache.clear()
+
+
+def test_global_cache_build_from_nearest():
+    database_path = "debug/test_database_nearest"
+    config = bitblas.MatmulConfig(M=1, N=1024, K=1024, A_dtype="float16", W_dtype="float16")
+    global_operator_cache.clear()
+    global_operator_cache.add(config,
+                              bitblas.Matmul(config=config, target=target, enable_tuning=True))
+    global_operator_cache.save_into_database(database_path, target=target)
+    global_operator_cache.clear()
+    global_operator_cache.load_from_database(database_path, target=target)
+
+    # the dtypes must match
+    other_dtype = bitblas.MatmulConfig(M=1, N=1024, K=1024, A_dtype="float16", W_dtype="int4")
+    assert global_operator_cache.find_nearest(other_dtype) is None
+    # too far away
+    far = bitblas.MatmulConfig(M=1, N=16384, K=1024, A_dtype="float16", W_dtype="float16")
+    assert global_operator_cache.find_nearest(far) is None
+
+    near = bitblas.MatmulConfig(M=1, N=1536, K=1024, A_dtype="float16", W_dtype="float16")
+    hash_str, _, distance = global_operator_cache.find_nearest(near)
+    assert hash_str == bitblas.cache.operator.get_config_hash(config)
+    assert distance > 0
+    matmul = global_operator_cache.build_from_nearest(near, target=target)
+    assert matmul is not None
+    assert global_operator_cache.get(near) is matmul
+    global_operator_cache.clear()
+
+
+def test_global_cache_stats(tmp_path):
+    config = bitblas.MatmulConfig(M=1, N=1024, K=1024, A_dtype="float16", W_dtype="float16")
+    global_operator_cache.clear()
+    global_operator_cache.stats.reset()
+    assert global_operator_cache.get(config) is None
+    global_operator_cache.add(config, bitblas.Matmul(config=config, target=target))
+    assert global_operator_cache.get(config) is not None
+
+    stats = global_operator_cache.stats.to_dict()
+    assert stats["counters"]["miss"] == 1
+    assert stats["counters"]["hit"] == 1
+    (hash_str, entry), = global_operator_cache.stats.top("miss")
+    assert entry["counters"] == {"miss": 1, "hit": 1}
+    global_operator_cache.stats.dump(str(tmp_path / "stats.json"))
+    assert (tmp_path / "stats.json").exists()
+    global_operator_cache.clear()
+
+
+@pytest.mark.parametrize("database_path", ["debug/test_database_gc", "debug/test_database_gc.db"])
+def test_global_cache_gc(database_path, tmp_path):
+    from dataclasses import asdict
+    from bitblas.cache import open_database, get_manifest
+    from bitblas.cache.operator import get_config_hash
+
+    arch_str = "cuda-sm_80"
+    database = open_database(database_path, arch_str)
+    database.remove(database.entries().keys())
+    config = bitblas.MatmulConfig(M=1, N=1024, K=1024, A_dtype="float16", W_dtype="float16")
+    record = {
+        "config_type": "MatmulConfig",
+        "operator_type": "Matmul",
+        "config": asdict(config),
+        "manifest": get_manifest(),
+    }
+    (tmp_path / "source.cu").write_text("// kernel")
+    hash_str = get_config_hash(config)
+    database.save(hash_str, record, str(tmp_path))
+    database.save("0" * 64, record, str(tmp_path))
+    stale = {**record, "manifest": {**record["manifest"], "schema": -1}}
+    stale_config = bitblas.MatmulConfig(M=1, N=2048, K=1024, A_dtype="float16", W_dtype="float16")
+    stale["config"] = asdict(stale_config)
+    database.save(get_config_hash(stale_config), stale, str(tmp_path))
+
+    global_operator_cache.clear()
+    report = global_operator_cache.gc(database_path, target=arch_str)
+    assert report["removed"] == {
+        f"{arch_str}/{'0' * 64}": "duplicate",
+        f"{arch_str}/{get_config_hash(stale_config)}": "incompatible: schema -1 != 1",
+    }
+    assert report["bytes_reclaimed"] >= 0
+    assert list(open_database(database_path, arch_str).entries()) == [hash_str]
+
+
 @pytest.mark.parametrize(
     "M,N,K,in_dtype,out_dtype,accum_dtype,bit,storage_dtype,source_format,with_scaling,with_zeros,group_size,fast_decoding,with_bias,propagate_a,propagate_b,layout",
     [
@@ -480,7 +705,7 @@ def test_matmul_dequantize_save_into_database(
     assert os.path.exists(database_path)
     global_operator_cache.clear()
     assert global_operator_cache.size() == 0
-    global_operator_cache.load_from_database(database_path, target=target)
+    global_operator_cache.load_from_database(database_path, target=target, lazy=False)
     assert global_operator_cache.size() > 0
 
 
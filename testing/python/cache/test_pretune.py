@@ -0,0 +1,53 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import os
+import bitblas
+from bitblas.cache import pretune, get_model_matmul_configs
+
+target = bitblas.utils.auto_detect_nvidia_target()
+
+
+def test_get_model_matmul_configs():
+    configs = get_model_matmul_configs(
+        hidden_size=4096,
+        intermediate_size=11008,
+        num_attention_heads=32,
+        num_key_value_heads=8,
+        W_dtype="int4",
+        group_size=128,
+        with_scaling=True,
+    )
+    assert [(config.N, config.K) for config in configs] == [
+        (4096, 4096),
+        (1024, 4096),
+        (11008, 4096),
+        (4096, 11008),
+    ]
+    assert all(tuple(bitblas.Linear.opt_M) == config.M for config in configs)
+
+
+def test_pretune_resume(tmp_path):
+    database_path = str(tmp_path / "database")
+    progress_path = str(tmp_path / "progress.json")
+    config = bitblas.MatmulConfig(M=1, N=1024, K=1024, A_dtype="float16", W_dtype="float16")
+
+    # duplicated configs are tuned once
+    result = pretune([config, config],
+                     database_path=database_path,
+                     target=target,
+                     topk=4,
+                     progress_path=progress_path)
+    assert result["tuned"] == [config]
+    assert os.path.exists(progress_path)
+
+    # configs already in the database are skipped
+    result = pretune([config],
+                     database_path=database_path,
+                     target=target,
+                     topk=4,
+                     progress_path=progress_path)
+    assert result["skipped"] == [config]
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()